@@ -1,276 +1,8 @@
-from diagrams import Diagram, Cluster, Edge, Node
-from diagrams.aws.compute import Lambda
-from diagrams.aws.storage import S3
-from diagrams.aws.database import Dynamodb
-from diagrams.aws.security import SecretsManager
-from diagrams.aws.integration import Eventbridge
-from diagrams.aws.network import APIGateway, VPC
-from diagrams.aws.ml import Polly, Rekognition
-from diagrams.onprem.client import User, Users
-from diagrams.onprem.compute import Server
-from diagrams.programming.framework import React
-from diagrams.onprem.network import Nginx
-import os
-import graphviz
-
-# Path where the diagram will be saved
-output_path = "/Users/skrinak/Development/Noggin/Documents/Images/noggin_architecture_final_readable"
-
-# Custom colors to match the sample diagram
-COLORS = {
-    "border": "#000000",
-    "cluster_bg": "#FFFFFF",
-    "cluster_border": "#DDDDDD",
-    "aws_orange": "#FF9900",
-    "lambda_orange": "#FF9900",
-    "edge_color": "#333333",
-    "api_gateway_purple": "#A152AD",
-    "data_green": "#3F8624",
-    "agent_blue": "#2496ED",
-    "aws_cloud_bg": "#F8F8F8", 
-    "vpc_bg": "#E9F1F6",
-    "vpc_border": "#7AA3B5",
-    "llm_bg": "#E8F0F7",
-}
-
-# Create a custom class for AWS Transcribe since it's not in the standard library
-class Transcribe(Rekognition):
-    _icon = "rekognition.png"
-    
-    def __init__(self, label="Transcribe"):
-        super().__init__(label)
-
-# Global graph attributes - Optimize for landscape
-graph_attrs = {
-    "fontsize": "18",
-    "fontname": "Arial",
-    "bgcolor": "white",
-    "rankdir": "LR",  # Landscape mode (left to right)
-    "pad": "0.5",
-    "splines": "ortho",
-    "nodesep": "1.2",  # Increased for better spacing
-    "ranksep": "1.5",  # Increased for better spacing
-    "ratio": "fill",   # Fill available space
-    "size": "11,8.5",  # Landscape dimensions (11×8.5 inches)
-    "concentrate": "false",
-    "compound": "true",  # Allow edges between clusters
-}
-
-# Node attributes
-node_attrs = {
-    "shape": "box",
-    "style": "filled",
-    "fillcolor": "white",
-    "fontname": "Arial",
-    "fontsize": "14",
-    "fontcolor": "#000000",
-    "height": "1.2",
-    "width": "2.0",
-    "penwidth": "1.5",
-    "labelloc": "c",  # Center label on nodes
-}
-
-# Edge attributes for numbered edges
-numbered_edge_attrs = {
-    "color": COLORS["edge_color"],
-    "penwidth": "2.0",
-    "fontname": "Arial Black",  # Use bold font
-    "fontsize": "15",  # Large font size
-    "fontcolor": "#000000",
-    "labeldistance": "2.0",  # Adjust label distance from edge
-    "labelangle": "45",  # Angle for label placement
-    "minlen": "2",  # Minimum length to prevent overlap
-}
-
-# Regular edge attributes
-edge_attrs = {
-    "color": COLORS["edge_color"],
-    "penwidth": "1.2",
-    "fontname": "Arial",
-    "fontsize": "12",
-    "labeldistance": "2.0",
-}
-
-# AWS Cloud cluster attributes
-aws_cloud_attrs = {
-    "style": "filled",
-    "fillcolor": COLORS["aws_cloud_bg"],
-    "color": COLORS["cluster_border"],
-    "fontname": "Arial",
-    "fontsize": "20",
-    "fontweight": "bold",
-    "penwidth": "1.5",
-    "margin": "20",
-    "label": "AWS Cloud",
-    "labeljust": "l",  # Left-justify the label
-    "labelloc": "t",   # Place label at top
-}
-
-# VPC cluster attributes
-vpc_attrs = {
-    "style": "filled",
-    "fillcolor": COLORS["vpc_bg"],
-    "color": COLORS["vpc_border"],
-    "fontname": "Arial",
-    "fontsize": "16",
-    "fontweight": "bold",
-    "penwidth": "1.5",
-    "margin": "15",
-    "label": "VPC",
-    "labeljust": "l",  # Left-justify the label
-    "labelloc": "t",   # Place label at top
-}
-
-# Regular cluster attributes
-cluster_attrs = {
-    "style": "rounded,filled",
-    "fillcolor": COLORS["cluster_bg"],
-    "color": COLORS["cluster_border"],
-    "fontname": "Arial",
-    "fontsize": "15",
-    "fontcolor": "#000000",
-    "penwidth": "1.0",
-    "margin": "12",
-    "labeljust": "l",  # Left-justify the label
-    "labelloc": "t",   # Place label at top
-}
-
-# LLM cluster attributes
-llm_attrs = {
-    "style": "filled,rounded",
-    "fillcolor": COLORS["llm_bg"],
-    "color": "#5B9BD5",
-    "fontname": "Arial",
-    "fontsize": "16",
-    "fontweight": "bold",
-    "penwidth": "2.0",
-    "margin": "15",
-    "label": "Language Model",
-    "labeljust": "l",  # Left-justify the label
-    "labelloc": "t",   # Place label at top
-}
-
-# Create the diagram with custom attributes
-with Diagram("Noggin mTBI Management Architecture", 
-             filename=output_path,
-             show=False,
-             direction="LR",  # Landscape mode (left to right)
-             graph_attr=graph_attrs,
-             node_attr=node_attrs,
-             edge_attr=edge_attrs):
-    
-    # AWS Cloud boundary
-    with Cluster("", graph_attr=aws_cloud_attrs):
-        
-        # AWS VPC boundary
-        with Cluster("", graph_attr=vpc_attrs):
-            # Client Applications
-            with Cluster("Client Applications", graph_attr=cluster_attrs):
-                mobile = React("Mobile Apps")
-                web = React("Web Dashboard")
-                messaging = Nginx("Messaging\n(WhatsApp/SMS)")
-            
-            # AWS Services - API Layer
-            with Cluster("API Layer", graph_attr=cluster_attrs):
-                api = APIGateway("API Gateway")
-                event_bridge = Eventbridge("EventBridge")
-            
-            # AWS Services - Compute Layer
-            with Cluster("Compute Layer", graph_attr=cluster_attrs):
-                with Cluster("Serverless Functions", graph_attr=cluster_attrs):
-                    intake_lambda = Lambda("Intake Service")
-                    monitoring_lambda = Lambda("Monitoring Service")
-                    intervention_lambda = Lambda("Intervention Service")
-                    escalation_lambda = Lambda("Escalation Service")
-                    notification_lambda = Lambda("Notification Service")
-            
-            # LLM Layer
-            with Cluster("", graph_attr=llm_attrs):
-                claude = Server("Claude Sonnet 4.5")
-            
-            # AWS Services - AI Layer
-            with Cluster("AI Layer", graph_attr=cluster_attrs):
-                with Cluster("AWS Bedrock", graph_attr=cluster_attrs):
-                    bedrock = Server("AWS Bedrock AgentCore")
-                    
-                    with Cluster("Agents", graph_attr=cluster_attrs):
-                        intake_agent = Server("Intake Agent")
-                        monitoring_agent = Server("Monitoring Agent")
-                        intervention_agent = Server("Intervention Agent")
-                        escalation_agent = Server("Escalation Agent")
-                
-                # Voice Interface Services
-                transcribe = Transcribe("AWS Transcribe\nMedical")
-                polly = Polly("AWS Polly")
-            
-            # AWS Services - Data Layer
-            with Cluster("Data Layer", graph_attr=cluster_attrs):
-                dynamodb = Dynamodb("Patient Data")
-                s3 = S3("Media Storage")
-                secrets = SecretsManager("Secrets Manager")
-    
-    # External Users - outside AWS Cloud
-    with Cluster("Users", graph_attr=cluster_attrs):
-        patients = Users("Patients")
-        clinicians = User("Clinicians")
-    
-    # Add numbered flow connections with bold labels using numbered_edge_attrs
-    # 1. Patient interaction starts
-    patients >> Edge(label="1. Initial contact", **numbered_edge_attrs) >> messaging
-    patients >> Edge(label="1. Alternative channels", **numbered_edge_attrs) >> mobile
-    
-    # 2. Client apps to API Gateway
-    messaging >> Edge(label="2. Forward interaction", **numbered_edge_attrs) >> api
-    mobile >> Edge(label="2. Send data", **numbered_edge_attrs) >> api
-    
-    # 3. API Gateway routes to intake service
-    api >> Edge(label="3. Route request", **numbered_edge_attrs) >> intake_lambda
-    
-    # 4. Intake service uses Bedrock agents
-    intake_lambda >> Edge(label="4. Process assessment", **numbered_edge_attrs) >> bedrock
-    bedrock >> Edge(**edge_attrs) >> intake_agent
-    
-    # Connect agents to LLM
-    intake_agent >> Edge(label="Agent-LLM interaction", **edge_attrs) >> claude
-    monitoring_agent >> Edge(**edge_attrs) >> claude
-    intervention_agent >> Edge(**edge_attrs) >> claude
-    escalation_agent >> Edge(**edge_attrs) >> claude
-    
-    # 5. Voice processing if needed
-    intake_lambda >> Edge(label="5a. Speech to text", **numbered_edge_attrs) >> transcribe
-    transcribe >> Edge(label="5b. Return transcript", **numbered_edge_attrs) >> intake_lambda
-    
-    # 6. Store patient data
-    intake_lambda >> Edge(label="6. Store data", **numbered_edge_attrs) >> dynamodb
-    
-    # 7. Event triggered for monitoring
-    intake_lambda >> Edge(label="7. Trigger monitoring", **numbered_edge_attrs) >> event_bridge
-    event_bridge >> Edge(**edge_attrs) >> monitoring_lambda
-    
-    # 8. Monitoring process
-    monitoring_lambda >> Edge(label="8. Analyze symptoms", **numbered_edge_attrs) >> bedrock
-    bedrock >> Edge(**edge_attrs) >> monitoring_agent
-    
-    # 9. Intervention recommendation
-    monitoring_lambda >> Edge(label="9. Generate plan", **numbered_edge_attrs) >> intervention_lambda
-    intervention_lambda >> Edge(**edge_attrs) >> bedrock
-    bedrock >> Edge(**edge_attrs) >> intervention_agent
-    
-    # 10. Response generation
-    intervention_lambda >> Edge(label="10a. Generate response", **numbered_edge_attrs) >> polly
-    polly >> Edge(label="10b. Audio response", **numbered_edge_attrs) >> messaging
-    intervention_lambda >> Edge(label="10c. Update mobile app", **numbered_edge_attrs) >> mobile
-    
-    # 11. Clinical escalation if needed
-    monitoring_lambda >> Edge(label="11. Escalate if needed", **numbered_edge_attrs) >> escalation_lambda
-    escalation_lambda >> Edge(**edge_attrs) >> bedrock
-    bedrock >> Edge(**edge_attrs) >> escalation_agent
-    
-    # 12. Clinician notification
-    escalation_lambda >> Edge(label="12. Alert clinician", **numbered_edge_attrs) >> notification_lambda
-    notification_lambda >> Edge(**edge_attrs) >> clinicians
-    
-    # 13. Clinician access to dashboard
-    clinicians >> Edge(label="13. View patient data", **numbered_edge_attrs) >> web
-    web >> Edge(label="14. Retrieve data", **numbered_edge_attrs) >> api
-    api >> Edge(label="15. Access records", **numbered_edge_attrs) >> dynamodb
\ No newline at end of file
+# Render Documents/Images/noggin_architecture_final_readable.png
+#
+# The topology lives in diagram_spec.py and the styling in the "final_readable"
+# entry of diagram_variants.py. Use diagram_render.py to regenerate every
+# variant in one go.
+from diagram_render import render_variant
+
+render_variant("final_readable")
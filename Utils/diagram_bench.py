@@ -0,0 +1,218 @@
+# Benchmark graphviz layout cost across diagram variants and attributes.
+#
+# Runs every variant under dot with each spline mode and cluster depth (plus
+# any extra attribute axes), recording wall time, peak RSS of the graphviz
+# process and output size, and writes a JSON report. --max-seconds and
+# --baseline turn it into a guard against committing a 30-second diagram.
+#
+#   python Utils/diagram_bench.py
+#   python Utils/diagram_bench.py final_readable --splines=ortho,spline
+#   python Utils/diagram_bench.py --attr=concentrate=true,false --max-seconds=10
+#   python Utils/diagram_bench.py --baseline=bench.json --output=bench-new.json
+
+import argparse
+import copy
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from diagram_cache import graphviz_version
+from diagram_render import build, resolve
+from diagram_variants import VARIANTS
+
+SPLINES = ("ortho", "spline", "polyline", "line")
+
+# "full" keeps every cluster; 0 drops them all
+DEPTHS = ("full", 0, 2, 4)
+
+# A run slower than its baseline by this factor is a regression
+REGRESSION_FACTOR = 1.5
+
+
+def cluster_depth(entries):
+    depths = [1 + cluster_depth(e["children"]) for e in entries if not isinstance(e, str)]
+    return max(depths, default=0)
+
+
+def flatten(model, depth):
+    """Copy of model with clusters nested deeper than depth dissolved into their parents."""
+    model = copy.deepcopy(model)
+
+    def walk(entries, level):
+        result = []
+        for entry in entries:
+            if isinstance(entry, str):
+                result.append(entry)
+            elif level >= depth:
+                result.extend(walk(entry["children"], level + 1))
+            else:
+                entry["children"] = walk(entry["children"], level + 1)
+                result.append(entry)
+        return result
+
+    model["clusters"] = walk(model["clusters"], 0)
+    return model
+
+
+def configure(name, splines, depth, attrs):
+    model = resolve(name)
+    if depth != "full":
+        model = flatten(model, depth)
+    model["graph_attrs"].update(splines=splines, **attrs)
+    return model
+
+
+def measure(dot_source, fmt="png", timeout=120):
+    """Lay out and render once; returns status, seconds, peak RSS (KiB) and output bytes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path = os.path.join(tmp, "graph.gv")
+        path = os.path.join(tmp, f"out.{fmt}")
+        with open(source_path, "w") as f:
+            f.write(dot_source)
+
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            ["dot", f"-T{fmt}", "-o", path, source_path], stdin=subprocess.DEVNULL
+        )
+        killer = threading.Timer(timeout, process.kill)
+        killer.start()
+        try:
+            # wait4 reaps the child and reports its own rusage, unlike
+            # RUSAGE_CHILDREN which accumulates over every run
+            _, status, usage = os.wait4(process.pid, 0)
+        finally:
+            killer.cancel()
+        seconds = time.perf_counter() - started
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        if seconds >= timeout:
+            result = "timeout"
+        elif process.returncode:
+            result = f"exit {process.returncode}"
+        else:
+            result = "ok"
+        return {
+            "status": result,
+            "seconds": round(seconds, 4),
+            # ru_maxrss is KiB on Linux and bytes on macOS
+            "peak_rss_kib": usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss,
+            "output_bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+        }
+
+
+def run(names, splines=SPLINES, depths=DEPTHS, axes=None, repeat=1, fmt="png", timeout=120):
+    """Benchmark every combination; returns the report dict."""
+    axes = axes or {}
+    axis_names = sorted(axes)
+    runs = []
+    for name in names:
+        max_depth = cluster_depth(resolve(name)["clusters"])
+        for mode, depth in itertools.product(splines, depths):
+            # Depths at or beyond the variant's nesting are the same as "full"
+            if depth != "full" and depth >= max_depth:
+                continue
+            for values in itertools.product(*(axes[a] for a in axis_names)):
+                attrs = dict(zip(axis_names, values))
+                dot_source = build(configure(name, mode, depth, attrs)).source
+                samples = [measure(dot_source, fmt, timeout) for _ in range(repeat)]
+                best = min(samples, key=lambda sample: sample["seconds"])
+                runs.append({
+                    "variant": name,
+                    "splines": mode,
+                    "cluster_depth": depth,
+                    "attrs": attrs,
+                    **best,
+                    "peak_rss_kib": max(sample["peak_rss_kib"] for sample in samples),
+                })
+                print(_describe(runs[-1]), flush=True)
+    return {
+        "graphviz": graphviz_version(),
+        "format": fmt,
+        "repeat": repeat,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "runs": runs,
+    }
+
+
+def _run_id(run):
+    attrs = ",".join(f"{k}={v}" for k, v in sorted(run["attrs"].items()))
+    return f"{run['variant']} splines={run['splines']} depth={run['cluster_depth']} {attrs}".strip()
+
+
+def _describe(run):
+    return (
+        f"{_run_id(run):<60} {run['status']:<8} {run['seconds']:8.3f}s "
+        f"{run['peak_rss_kib'] / 1024:8.1f} MiB {run['output_bytes'] / 1024:9.1f} KiB"
+    )
+
+
+def regressions(report, baseline=None, max_seconds=None):
+    """Runs that exceed max_seconds, fail, or got REGRESSION_FACTOR slower than baseline."""
+    previous = {_run_id(run): run for run in (baseline or {}).get("runs", [])}
+    problems = []
+    for run in report["runs"]:
+        if run["status"] != "ok":
+            problems.append(f"{_run_id(run)}: {run['status']}")
+        elif max_seconds is not None and run["seconds"] > max_seconds:
+            problems.append(f"{_run_id(run)}: {run['seconds']:.2f}s > {max_seconds}s")
+        before = previous.get(_run_id(run))
+        if before and before["status"] == "ok" and run["seconds"] > before["seconds"] * REGRESSION_FACTOR:
+            problems.append(
+                f"{_run_id(run)}: {before['seconds']:.2f}s -> {run['seconds']:.2f}s"
+            )
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="noggin-diagrams bench",
+                                     description="Benchmark graphviz layout cost across diagram variants and attributes.")
+    parser.add_argument("variants", nargs="*", help="variants to run (default: all)")
+    parser.add_argument("--splines", default=",".join(SPLINES))
+    parser.add_argument("--depths", default=",".join(str(d) for d in DEPTHS),
+                        help='cluster depths to keep; "full" keeps every cluster')
+    parser.add_argument("--attr", action="append", default=[], metavar="NAME=V1,V2",
+                        help="extra graph attribute axis, e.g. concentrate=true,false")
+    parser.add_argument("--repeat", type=int, default=1, help="keep the fastest of N runs")
+    parser.add_argument("--format", default="png")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", default="diagram-bench.json")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--max-seconds", type=float, help="fail if any run is slower")
+    args = parser.parse_args(argv)
+
+    axes = {}
+    for axis in args.attr:
+        key, values = axis.split("=", 1)
+        axes[key] = values.split(",")
+    depths = [d if d == "full" else int(d) for d in args.depths.split(",")]
+
+    report = run(
+        args.variants or list(VARIANTS),
+        splines=args.splines.split(","),
+        depths=depths,
+        axes=axes,
+        repeat=args.repeat,
+        fmt=args.format,
+        timeout=args.timeout,
+    )
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output} ({len(report['runs'])} runs)")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    problems = regressions(report, baseline, args.max_seconds)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# Content-hashed cache of rendered diagrams.
+#
+# The key covers everything that can change the picture: the DOT source
+# (graph structure and graph/node/edge attributes), the bytes of every icon
+# the graph references, the output format and the graphviz version. A hit
+# copies the stored artifact into place without running a layout at all.
+#
+# The cache lives in .diagram_cache/ at the repository root. manifest.json
+# records every stored artifact, running hit/miss totals and the outcome of
+# each lookup in the most recent run.
+
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import time
+from functools import lru_cache
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = ROOT / ".diagram_cache"
+
+# image="/path/to/icon.png" (or an unquoted path) in the DOT source
+IMAGE_ATTR = re.compile(r'\bimage=(?:"([^"]*)"|([^\s\]]+))')
+
+
+@lru_cache(maxsize=None)
+def graphviz_version(engine="dot"):
+    """Version banner of the graphviz engine, e.g. 'dot - graphviz version 9.0.0'."""
+    result = subprocess.run(
+        [engine, "-V"], stdin=subprocess.DEVNULL, capture_output=True, text=True, check=True
+    )
+    return (result.stderr or result.stdout).strip()
+
+
+def file_digest(path):
+    stat = Path(path).stat()
+    return _digest(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=None)
+def _digest(path, mtime_ns, size):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def icon_paths(dot_source):
+    return sorted({quoted or bare for quoted, bare in IMAGE_ATTR.findall(dot_source)})
+
+
+def cache_key(dot_source, fmt, engine="dot"):
+    """Hash of the DOT source, referenced icon bytes, format and graphviz version."""
+    digest = hashlib.sha256()
+    digest.update(graphviz_version(engine).encode())
+    digest.update(f"\0{engine}\0{fmt}\0".encode())
+    digest.update(dot_source.encode())
+    for path in icon_paths(dot_source):
+        digest.update(f"\0{path}\0{file_digest(path)}".encode())
+    return digest.hexdigest()
+
+
+class RenderCache:
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = Path(directory)
+        self.artifacts = self.directory / "artifacts"
+        self.manifest_path = self.directory / "manifest.json"
+        self.manifest = self._load_manifest()
+        self.run = []
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"artifacts": {}, "hits": 0, "misses": 0, "last_run": []}
+
+    def artifact_path(self, key, fmt):
+        return self.artifacts / f"{key}.{fmt}"
+
+    def fetch(self, key, fmt, destination, variant=""):
+        """Copy a cached artifact to destination. Returns False on a miss."""
+        artifact = self.artifact_path(key, fmt)
+        hit = artifact.exists()
+        self._record(variant, fmt, key, hit)
+        if hit:
+            destination = Path(destination)
+            if not _same_file(artifact, destination):
+                shutil.copyfile(artifact, destination)
+        return hit
+
+    def store(self, key, fmt, produced, variant=""):
+        """Keep a freshly rendered file under its key."""
+        self.artifacts.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(produced, self.artifact_path(key, fmt))
+        self.manifest["artifacts"][key] = {
+            "variant": variant,
+            "format": fmt,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+    def _record(self, variant, fmt, key, hit):
+        self.manifest["hits" if hit else "misses"] += 1
+        self.run.append({
+            "variant": variant,
+            "format": fmt,
+            "key": key,
+            "result": "hit" if hit else "miss",
+        })
+
+    def save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest["last_run"] = self.run
+        with open(self.manifest_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+
+
+def _same_file(a, b):
+    if not b.exists() or a.stat().st_size != b.stat().st_size:
+        return False
+    return file_digest(a) == file_digest(b)
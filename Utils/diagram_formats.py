@@ -0,0 +1,68 @@
+# Output formats emitted from a single diagram layout.
+#
+# The layout pass produces a positioned graph once; every format below is
+# then a neato -n2 emission from those fixed positions, which costs a small
+# fraction of the layout itself. PNG outputs are recompressed with Pillow
+# when it is installed (palette reduction for the web copy, lossless for
+# the full-size image).
+
+import subprocess
+import time
+
+# Format name -> graphviz format, output suffix and post-processing
+FORMATS = {
+    "png": {"format": "png", "suffix": ".png", "optimize": "lossless"},
+    # README
+    "svg": {"format": "svg", "suffix": ".svg"},
+    # MHRA/IRAS submission pack
+    "pdf": {"format": "pdf", "suffix": ".pdf"},
+    # Smaller PNG for the dashboard mockups
+    "web": {"format": "png", "suffix": ".web.png", "dpi": "48", "optimize": "palette"},
+}
+
+DEFAULT_FORMATS = ("png", "svg", "pdf", "web")
+
+
+def emit(laid_out, name, path):
+    """Render a positioned graph to one format without laying it out again."""
+    spec = FORMATS[name]
+    args = ["neato", "-n2", f"-T{spec['format']}", "-o", str(path)]
+    if "dpi" in spec:
+        args.insert(2, f"-Gdpi={spec['dpi']}")
+
+    started = time.perf_counter()
+    subprocess.run(args, input=laid_out.encode(), check=True)
+    raw_bytes = path.stat().st_size
+    if spec.get("optimize"):
+        optimize_png(path, palette=spec["optimize"] == "palette")
+    return {
+        "seconds": time.perf_counter() - started,
+        "bytes": path.stat().st_size,
+        "raw_bytes": raw_bytes,
+    }
+
+
+def optimize_png(path, palette=False):
+    """Recompress a PNG in place, keeping the result only if it is smaller.
+
+    palette=True also reduces the image to a 256-colour palette, which is
+    visually lossless for flat diagrams. Returns False without Pillow.
+    """
+    # Imported here rather than at the top: Pillow is optional and slow to load
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+
+    with Image.open(path) as image:
+        image.load()
+    if palette and image.mode != "P":
+        image = image.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+
+    optimized = path.with_suffix(".opt" + path.suffix)
+    image.save(optimized, format="PNG", optimize=True)
+    if optimized.stat().st_size < path.stat().st_size:
+        optimized.replace(path)
+    else:
+        optimized.unlink()
+    return True
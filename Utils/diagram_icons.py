@@ -0,0 +1,103 @@
+# Shared icon registry for the architecture diagrams.
+#
+# Logical icon names resolve once to a source image. Every icon node is
+# then handed a copy pre-scaled to the node box in node_attrs, cached by
+# (source hash, size) in .diagram_cache/icons. Nodes sharing an icon point
+# graphviz at the same small file: it loads it once instead of decoding
+# and scaling the full-size image per node, and SVG/PDF outputs embed the
+# small copy. Without Pillow the source image is used as is.
+
+import os
+from pathlib import Path
+
+from diagram_cache import CACHE_DIR, file_digest
+
+ROOT = Path(__file__).resolve().parent.parent
+IMAGES_DIR = ROOT / "Documents" / "Images"
+ICON_DIR = CACHE_DIR / "icons"
+
+# Logical icon name -> image file, or "diagrams:<path>" inside the diagrams
+# package resources
+ICONS = {
+    "agentcore": IMAGES_DIR / "AgentCoreLogo.png",
+    # AWS Transcribe has no icon of its own in diagrams
+    "transcribe": "diagrams:aws/ml/rekognition.png",
+}
+
+# Graphviz node defaults that diagrams applies to icon nodes
+DEFAULT_WIDTH = 1.4
+ICON_HEIGHT = 1.9
+DEFAULT_DPI = 96
+
+_sources = {}
+_scaled = {}
+
+
+def icon_source(name):
+    """Source image for a logical icon name, resolved once."""
+    if name not in _sources:
+        source = ICONS[name]
+        if isinstance(source, str) and source.startswith("diagrams:"):
+            import diagrams
+
+            resources = Path(diagrams.__file__).resolve().parent.parent / "resources"
+            source = resources / source[len("diagrams:"):]
+        _sources[name] = Path(source)
+    return _sources[name]
+
+
+def source_files():
+    """Icon files on disk that the registry reads from."""
+    return [icon_source(name) for name in ICONS]
+
+
+def icon_node_attrs(node_attrs, attrs, label):
+    """The attributes graphviz ends up with for an icon node.
+
+    The variant's node_attrs are graph defaults; diagrams sets its own
+    height on every icon node (padded per extra label line), and the node's
+    own attrs override both.
+    """
+    padding = 0.4 * label.count("\n")
+    return {**node_attrs, "height": str(ICON_HEIGHT + padding), **attrs}
+
+
+def box_pixels(node_attrs, graph_attrs):
+    """Pixel size of an icon node's box (its effective attributes) at the graph's resolution."""
+    dpi = float(graph_attrs.get("dpi", DEFAULT_DPI))
+    width = float(node_attrs.get("width", DEFAULT_WIDTH))
+    height = float(node_attrs.get("height", ICON_HEIGHT))
+    return round(width * dpi), round(height * dpi)
+
+
+def scaled(source, box):
+    """Path of a copy of source scaled to fit box (width, height) in pixels.
+
+    Never upscales. Copies are cached by (source hash, size), so identical
+    images share one file and a changed source gets a new one.
+    """
+    source = str(source)
+    digest = file_digest(source)
+    key = (digest, box)
+    if key in _scaled:
+        return _scaled[key]
+
+    path = ICON_DIR / f"{digest[:16]}-{box[0]}x{box[1]}.png"
+    if not path.exists():
+        try:
+            from PIL import Image
+        except ImportError:
+            _scaled[key] = source
+            return source
+
+        with Image.open(source) as image:
+            image.load()
+        image.thumbnail(box, Image.Resampling.LANCZOS)
+        ICON_DIR.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a concurrent render never reads half a file
+        partial = path.with_suffix(f".{os.getpid()}.tmp")
+        image.save(partial, format="PNG", optimize=True)
+        partial.replace(path)
+
+    _scaled[key] = str(path)
+    return _scaled[key]
@@ -0,0 +1,155 @@
+# Reuse graphviz node and edge positions across style-only edits.
+#
+# Most edits to a variant only restyle it (COLORS, font sizes, penwidths,
+# edge label formatting) and don't move anything, yet each one would pay
+# for a full ortho layout. A full layout also writes -Tjson next to the
+# image; the positions are kept under a key that ignores presentation
+# attributes. When only those change, the positions are pinned into the
+# new graph and neato -n2 re-emits it without laying it out again.
+
+import copy
+import hashlib
+import json
+from pathlib import Path
+
+from diagram_cache import CACHE_DIR, graphviz_version
+
+LAYOUT_DIR = CACHE_DIR / "layouts"
+
+# Attributes that change how things are drawn but not where they go. Edge
+# label text counts too: labels keep their stored position (lp).
+PRESENTATION_ATTRS = {
+    "bgcolor",
+    "color",
+    "fillcolor",
+    "fontcolor",
+    "fontname",
+    "fontsize",
+    "fontweight",
+    "labelangle",
+    "labeldistance",
+    "pencolor",
+    "penwidth",
+    "style",
+}
+
+
+def _geometry(attrs):
+    return {k: v for k, v in sorted(attrs.items()) if k not in PRESENTATION_ATTRS}
+
+
+def structure_key(model, engine="dot"):
+    """Hash of everything in a model that can move a node or an edge."""
+
+    def clusters(entries):
+        return [
+            entry if isinstance(entry, str) else {
+                "label": entry["label"],
+                "attrs": _geometry(entry["attrs"]),
+                "children": clusters(entry["children"]),
+            }
+            for entry in entries
+        ]
+
+    structure = {
+        "graphviz": graphviz_version(engine),
+        "direction": model["direction"],
+        "graph_attrs": _geometry(model["graph_attrs"]),
+        "node_attrs": _geometry(model["node_attrs"]),
+        "edge_attrs": _geometry(model["edge_attrs"]),
+        "clusters": clusters(model["clusters"]),
+        "nodes": model["nodes"],
+        "edges": [
+            [edge["src"], edge["dst"], bool(edge["label"]), _geometry(edge["attrs"])]
+            for edge in model["edges"]
+        ],
+    }
+    encoded = json.dumps(structure, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def extract_positions(layout_json):
+    """Pull graph, cluster, node and edge coordinates out of dot -Tjson output."""
+    layout = json.loads(layout_json)
+    objects = layout.get("objects", [])
+    names = {obj["_gvid"]: obj["name"] for obj in objects if "_gvid" in obj}
+
+    positions = {
+        "graph": _pick(layout, "bb", "lp"),
+        "clusters": {},
+        "nodes": {},
+        "edges": {},
+    }
+    for obj in objects:
+        if obj["name"].startswith("cluster"):
+            positions["clusters"][obj["name"]] = _pick(obj, "bb", "lp")
+        elif "pos" in obj:
+            positions["nodes"][obj["name"]] = _pick(obj, "pos")
+
+    seen = {}
+    for edge in layout.get("edges", []):
+        pair = (names[edge["tail"]], names[edge["head"]])
+        index = seen[pair] = seen.get(pair, -1) + 1
+        positions["edges"][_edge_id(*pair, index)] = _pick(edge, "pos", "lp")
+    return positions
+
+
+def _pick(obj, *keys):
+    return {key: obj[key] for key in keys if key in obj}
+
+
+def _edge_id(src, dst, index):
+    return f"{src}->{dst}#{index}"
+
+
+def positioned(model, positions):
+    """Copy of model with every coordinate pinned, or None if any is missing.
+
+    Edges merged by concentrate=true, for example, have no stored position
+    of their own; those variants fall back to a full layout.
+    """
+    model = copy.deepcopy(model)
+    model["graph_attrs"].update(positions["graph"])
+
+    for node_id, node in model["nodes"].items():
+        if node_id not in positions["nodes"]:
+            return None
+        node["attrs"] = {**node.get("attrs", {}), **positions["nodes"][node_id]}
+
+    def clusters(entries):
+        for entry in entries:
+            if not isinstance(entry, str):
+                entry["attrs"].update(positions["clusters"].get("cluster_" + entry["label"], {}))
+                clusters(entry["children"])
+
+    clusters(model["clusters"])
+
+    seen = {}
+    for edge in model["edges"]:
+        pair = (edge["src"], edge["dst"])
+        index = seen[pair] = seen.get(pair, -1) + 1
+        stored = positions["edges"].get(_edge_id(*pair, index))
+        if not stored or "pos" not in stored:
+            return None
+        edge["attrs"] = {**edge["attrs"], **stored}
+    return model
+
+
+class LayoutCache:
+    def __init__(self, directory=LAYOUT_DIR):
+        self.directory = Path(directory)
+
+    def path(self, key):
+        return self.directory / f"{key}.json"
+
+    def get(self, key):
+        try:
+            with open(self.path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, positions):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.path(key), "w") as f:
+            json.dump(positions, f)
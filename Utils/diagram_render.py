@@ -0,0 +1,353 @@
+# Render the Noggin architecture diagram variants.
+#
+# Every variant is built from the topology in diagram_spec.py plus its style
+# overlay in diagram_variants.py. The Python side (building the graph with
+# diagrams) is cheap; the graphviz layout is what takes seconds, so
+# render_all() builds every variant in this process and fans the layout
+# runs out over a process pool. Unchanged variants come straight from the
+# render cache (diagram_cache.py), restyled ones reuse their previous node
+# positions (diagram_layout.py), and each variant is laid out once for all
+# of its output formats (diagram_formats.py).
+#
+#   python Utils/diagram_render.py                  # every variant
+#   python Utils/diagram_render.py final_readable   # just one
+#   python Utils/diagram_render.py --no-cache       # force every layout
+#   python Utils/diagram_render.py --formats=png,svg
+
+import importlib
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from diagram_cache import RenderCache, cache_key
+from diagram_formats import DEFAULT_FORMATS, FORMATS, emit
+from diagram_icons import box_pixels, icon_node_attrs, icon_source, scaled
+from diagram_layout import LayoutCache, extract_positions, positioned, structure_key
+from diagram_spec import CLUSTERS, FLOWS, NODES, layout
+from diagram_variants import VARIANTS
+
+ROOT = Path(__file__).resolve().parent.parent
+IMAGES_DIR = ROOT / "Documents" / "Images"
+
+TITLE = "Noggin mTBI Management Architecture"
+
+# Node kind -> diagrams class name, unless a variant overrides it
+DEFAULT_KINDS = {
+    "users": "Users",
+    "user": "User",
+    "react": "React",
+    "nginx": "Nginx",
+    "api_gateway": "APIGateway",
+    "eventbridge": "Eventbridge",
+    "lambda": "Lambda",
+    "llm": "Server",
+    "agentcore": "Server",
+    "agent": "Server",
+    # Logical icon from diagram_icons.ICONS
+    "transcribe": "icon:transcribe",
+    "polly": "Polly",
+    "dynamodb": "Dynamodb",
+    "s3": "S3",
+    "secrets_manager": "SecretsManager",
+}
+
+# diagrams class name -> provider module. Providers are imported lazily:
+# loading every diagrams.aws/onprem/programming module up front costs more
+# than building a graph.
+NODE_CLASSES = {
+    "Users": "diagrams.onprem.client",
+    "User": "diagrams.onprem.client",
+    "React": "diagrams.programming.framework",
+    "Nginx": "diagrams.onprem.network",
+    "APIGateway": "diagrams.aws.network",
+    "Eventbridge": "diagrams.aws.integration",
+    "Lambda": "diagrams.aws.compute",
+    "Server": "diagrams.onprem.compute",
+    "Rekognition": "diagrams.aws.ml",
+    "Polly": "diagrams.aws.ml",
+    "Dynamodb": "diagrams.aws.database",
+    "S3": "diagrams.aws.storage",
+    "SecretsManager": "diagrams.aws.security",
+    "Custom": "diagrams.custom",
+}
+
+# Cluster ids with their own styling role; everything else is "cluster"
+CLUSTER_ROLES = {"cloud": "cloud", "vpc": "vpc", "llm": "llm"}
+
+
+def resolve(name):
+    """Resolve a variant into a plain model: attributes, cluster tree, nodes and edges."""
+    variant = VARIANTS[name]
+    tree = layout(variant["nested"], variant["llm"])
+    kinds = {**DEFAULT_KINDS, **variant.get("kinds", {})}
+    labels = variant.get("labels", {})
+    cluster_styles = variant.get("clusters", {})
+
+    nodes = {}
+
+    def walk(entries):
+        result = []
+        for entry in entries:
+            if isinstance(entry, str):
+                kind, label = NODES[entry]
+                nodes[entry] = {"kind": kinds[kind], "label": labels.get(entry, label)}
+                result.append(entry)
+            else:
+                cluster_id, children = entry
+                role = CLUSTER_ROLES.get(cluster_id, "cluster")
+                attrs = cluster_styles.get(role, cluster_styles.get("cluster", {}))
+                result.append({
+                    "id": cluster_id,
+                    "label": CLUSTERS[cluster_id],
+                    "attrs": dict(attrs),
+                    "children": walk(children),
+                })
+        return result
+
+    clusters = walk(tree)
+
+    edges = []
+    numbered_label = variant.get("numbered_label", "{}")
+    for src, dst, label in FLOWS:
+        if src not in nodes or dst not in nodes:
+            continue
+        if label and label[0].isdigit():
+            attrs = dict(variant.get("numbered_edge", {}))
+            label = numbered_label.format(label)
+        elif label:
+            attrs = {**variant.get("edge", {}), **variant.get("annotation_edge", {})}
+        else:
+            attrs = dict(variant.get("edge", {}))
+        edges.append({"src": src, "dst": dst, "label": label or "", "attrs": attrs})
+
+    return {
+        "name": name,
+        "filename": variant["filename"],
+        "direction": variant.get("direction", "LR"),
+        "graph_attrs": dict(variant.get("graph_attrs", {})),
+        "node_attrs": dict(variant.get("node_attrs", {})),
+        "edge_attrs": dict(variant.get("edge_attrs", {})),
+        "clusters": clusters,
+        "nodes": nodes,
+        "edges": edges,
+    }
+
+
+# provider module -> ms spent importing it lazily. -X importtime doesn't
+# see imports made through importlib, so node_class times them itself.
+PROVIDER_IMPORT_MS = {}
+
+
+def node_class(name):
+    """Import a node class on first use, so a variant only loads the providers it draws."""
+    module = NODE_CLASSES[name]
+    if module not in sys.modules:
+        started = time.perf_counter()
+        importlib.import_module(module)
+        PROVIDER_IMPORT_MS[module] = (time.perf_counter() - started) * 1000
+    return getattr(sys.modules[module], name)
+
+
+def build(model):
+    """Build the graphviz Digraph for a model without rendering it."""
+    import diagrams
+    from diagrams import Cluster, Diagram, Edge
+
+    diagram = Diagram(
+        TITLE,
+        filename=str(IMAGES_DIR / model["filename"]),
+        show=False,
+        direction=model["direction"],
+        graph_attr=model["graph_attrs"],
+        node_attr=model["node_attrs"],
+        edge_attr=model["edge_attrs"],
+    )
+
+    def add(entries):
+        for entry in entries:
+            if isinstance(entry, str):
+                node = model["nodes"][entry]
+                attrs = dict(node.get("attrs", {}))
+                kind = node["kind"]
+                if kind.startswith("icon:"):
+                    icon = icon_source(kind[len("icon:"):])
+                    cls, args = node_class("Custom"), (node["label"], str(icon))
+                else:
+                    cls, args = node_class(kind), (node["label"],)
+                    icon = cls._load_icon(cls) if cls._icon else None
+                if icon and "image" not in attrs:
+                    # Hand graphviz a copy already scaled to the node box
+                    box = box_pixels(icon_node_attrs(model["node_attrs"], attrs, node["label"]),
+                                     model["graph_attrs"])
+                    attrs["image"] = scaled(icon, box)
+                # Fixed node ids keep the DOT source stable between runs
+                cls(*args, nodeid=entry, **attrs)
+            else:
+                with Cluster(entry["label"], graph_attr=entry["attrs"]):
+                    add(entry["children"])
+
+    # Enter the diagram context by hand: Diagram.__exit__ would render
+    diagrams.setdiagram(diagram)
+    try:
+        add(model["clusters"])
+        for edge in model["edges"]:
+            diagram.connect(
+                _Ref(edge["src"]),
+                _Ref(edge["dst"]),
+                Edge(forward=True, label=edge["label"], **edge["attrs"]),
+            )
+    finally:
+        diagrams.setdiagram(None)
+    return diagram.dot
+
+
+class _Ref:
+    # Diagram.connect only needs the node ids
+    def __init__(self, nodeid):
+        self.nodeid = nodeid
+
+
+def source(name):
+    """DOT source for a variant."""
+    return build(resolve(name)).source
+
+
+def output_path(name, fmt="png"):
+    return IMAGES_DIR / (VARIANTS[name]["filename"] + FORMATS[fmt]["suffix"])
+
+
+def _render_job(dot_source, pinned, outputs, layout_file):
+    # Runs in a pool worker: at most one layout, then one cheap emission
+    # per requested format from the positioned graph.
+    started = time.perf_counter()
+    if pinned:
+        laid_out = dot_source
+    else:
+        # -Tjson goes to layout_file (stored positions), -Tdot to stdout
+        laid_out = subprocess.run(
+            ["dot", "-Tjson", "-o", str(layout_file), "-Tdot"],
+            input=dot_source.encode(),
+            capture_output=True,
+            check=True,
+        ).stdout.decode()
+    layout_seconds = time.perf_counter() - started
+    return {
+        "layout_seconds": layout_seconds,
+        "formats": {fmt: emit(laid_out, fmt, path) for fmt, path in outputs},
+    }
+
+
+def render_variant(name, formats=("png",), use_cache=True):
+    """Render a single variant to Documents/Images."""
+    result = render_all([name], formats, workers=1, use_cache=use_cache)[name]
+    return result["formats"][formats[0]]["path"]
+
+
+def render_all(names=None, formats=DEFAULT_FORMATS, workers=None, use_cache=True):
+    """Render several variants (default: all) in one process.
+
+    The graphs are built here and only the graphviz runs happen in the
+    pool, so full regeneration takes about as long as the slowest variant.
+    Each variant is laid out at most once and every format is emitted from
+    that one layout. Formats whose cache key is unchanged are copied from
+    the render cache; variants whose structure is unchanged reuse their
+    stored positions and skip the layout.
+
+    Returns {name: {"layout", "layout_seconds", "formats"}} where layout is
+    "cached", "reused" or "full" and formats maps each format to its path,
+    emit seconds, size in bytes and whether it came from the cache.
+    """
+    names = list(names or VARIANTS)
+    cache = RenderCache() if use_cache else None
+    layouts = LayoutCache() if use_cache else None
+    results = {}
+    jobs = {}
+
+    for name in names:
+        model = resolve(name)
+        dot_source = build(model).source
+        result = results[name] = {"layout": "cached", "layout_seconds": 0.0, "formats": {}}
+        keys = {}
+        outputs = []
+        for fmt in formats:
+            path = output_path(name, fmt)
+            key = keys[fmt] = cache_key(dot_source, _format_id(fmt)) if cache else None
+            if cache and cache.fetch(key, fmt, path, variant=name):
+                result["formats"][fmt] = {
+                    "path": path,
+                    "seconds": 0.0,
+                    "bytes": path.stat().st_size,
+                    "cached": True,
+                }
+            else:
+                outputs.append((fmt, path))
+        if not outputs:
+            continue
+
+        layout_key = structure_key(model) if layouts else None
+        stored = layouts.get(layout_key) if layouts else None
+        pinned = positioned(model, stored) if stored else None
+        if pinned:
+            jobs[name] = (build(pinned).source, True, outputs, None, keys, layout_key)
+        else:
+            layout_file = IMAGES_DIR / (VARIANTS[name]["filename"] + ".layout.json")
+            jobs[name] = (dot_source, False, outputs, layout_file, keys, layout_key)
+
+    if jobs:
+        # Only needed on a cache miss; importing it costs as much as a graph build
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = workers or min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                name: pool.submit(_render_job, *job[:4])
+                for name, job in jobs.items()
+            }
+            for name, future in futures.items():
+                job_source, pinned, outputs, layout_file, keys, layout_key = jobs[name]
+                done = future.result()
+                result = results[name]
+                result["layout"] = "reused" if pinned else "full"
+                result["layout_seconds"] = done["layout_seconds"]
+                for fmt, path in outputs:
+                    result["formats"][fmt] = {"path": path, "cached": False, **done["formats"][fmt]}
+                    if cache:
+                        cache.store(keys[fmt], fmt, path, variant=name)
+                if layout_file:
+                    if layouts:
+                        layouts.put(layout_key, extract_positions(layout_file.read_text()))
+                    layout_file.unlink()
+
+    if cache:
+        cache.save()
+    return {name: results[name] for name in names}
+
+
+def _format_id(fmt):
+    # Cache keys cover the format's options (dpi, optimisation), not just its name
+    return fmt + ":" + ",".join(f"{k}={v}" for k, v in sorted(FORMATS[fmt].items()))
+
+
+def main(argv=None):
+    args = argv if argv is not None else sys.argv[1:]
+    use_cache = "--no-cache" not in args
+    formats = DEFAULT_FORMATS
+    for arg in args:
+        if arg.startswith("--formats="):
+            formats = tuple(arg.split("=", 1)[1].split(","))
+    names = [arg for arg in args if not arg.startswith("--")] or None
+
+    started = time.perf_counter()
+    results = render_all(names, formats, use_cache=use_cache)
+    for name, result in results.items():
+        print(f"{name:<28} layout {result['layout']:<7} {result['layout_seconds']:6.2f}s")
+        for fmt, out in result["formats"].items():
+            status = "cached" if out["cached"] else f"{out['seconds']:5.2f}s"
+            print(f"  {fmt:<6} {status:>7} {out['bytes'] / 1024:9.1f} KiB  {out['path'].name}")
+    print(f"{'total':<28} {time.perf_counter() - started:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
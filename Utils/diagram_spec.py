@@ -0,0 +1,170 @@
+# Noggin architecture topology, shared by every diagram variant.
+#
+# This module is data only: no diagrams/graphviz imports. Variants in
+# diagram_variants.py decide how the topology is styled and which optional
+# parts (AWS Cloud/VPC nesting, the language model node) are drawn.
+
+# Node id -> (kind, label). Kinds are logical; each variant maps them to a
+# diagrams class or an icon (see "kinds" in diagram_variants.py).
+NODES = {
+    "patients": ("users", "Patients"),
+    "clinicians": ("user", "Clinicians"),
+    "mobile": ("react", "Mobile Apps"),
+    "web": ("react", "Web Dashboard"),
+    "messaging": ("nginx", "Messaging (WhatsApp/SMS)"),
+    "api": ("api_gateway", "API Gateway"),
+    "event_bridge": ("eventbridge", "EventBridge"),
+    "intake_lambda": ("lambda", "Intake Service"),
+    "monitoring_lambda": ("lambda", "Monitoring Service"),
+    "intervention_lambda": ("lambda", "Intervention Service"),
+    "escalation_lambda": ("lambda", "Escalation Service"),
+    "notification_lambda": ("lambda", "Notification Service"),
+    "claude": ("llm", "Claude Sonnet 4.5"),
+    "bedrock": ("agentcore", "AWS Bedrock AgentCore"),
+    "intake_agent": ("agent", "Intake Agent"),
+    "monitoring_agent": ("agent", "Monitoring Agent"),
+    "intervention_agent": ("agent", "Intervention Agent"),
+    "escalation_agent": ("agent", "Escalation Agent"),
+    "transcribe": ("transcribe", "AWS Transcribe Medical"),
+    "polly": ("polly", "AWS Polly"),
+    "dynamodb": ("dynamodb", "Patient Data"),
+    "s3": ("s3", "Media Storage"),
+    "secrets": ("secrets_manager", "Secrets Manager"),
+}
+
+# Cluster id -> label
+CLUSTERS = {
+    "cloud": "AWS Cloud",
+    "vpc": "VPC",
+    "users": "Users",
+    "clients": "Client Applications",
+    "api_layer": "API Layer",
+    "compute": "Compute Layer",
+    "functions": "Serverless Functions",
+    "llm": "Language Model",
+    "ai": "AI Layer",
+    "bedrock": "AWS Bedrock",
+    "agents": "Agents",
+    "data": "Data Layer",
+}
+
+# Layer clusters in drawing order. Each entry is (cluster id, children) where
+# children are node ids or nested (cluster id, children) entries.
+CLIENTS = ("clients", ["mobile", "web", "messaging"])
+API_LAYER = ("api_layer", ["api", "event_bridge"])
+COMPUTE = ("compute", [
+    ("functions", [
+        "intake_lambda",
+        "monitoring_lambda",
+        "intervention_lambda",
+        "escalation_lambda",
+        "notification_lambda",
+    ]),
+])
+AI = ("ai", [
+    ("bedrock", [
+        "bedrock",
+        ("agents", [
+            "intake_agent",
+            "monitoring_agent",
+            "intervention_agent",
+            "escalation_agent",
+        ]),
+    ]),
+    "transcribe",
+    "polly",
+])
+DATA = ("data", ["dynamodb", "s3", "secrets"])
+USERS = ("users", ["patients", "clinicians"])
+
+# Numbered architecture flow plus the unlabelled connectors between steps.
+# Labels starting with a step number are drawn as numbered edges, other
+# labels as annotations. Edges touching a node a variant does not draw
+# (e.g. claude) are dropped for that variant.
+FLOWS = [
+    # 1. Patient interaction starts
+    ("patients", "messaging", "1. Initial contact"),
+    ("patients", "mobile", "1. Alternative channels"),
+
+    # 2. Client apps to API Gateway
+    ("messaging", "api", "2. Forward interaction"),
+    ("mobile", "api", "2. Send data"),
+
+    # 3. API Gateway routes to intake service
+    ("api", "intake_lambda", "3. Route request"),
+
+    # 4. Intake service uses Bedrock agents
+    ("intake_lambda", "bedrock", "4. Process assessment"),
+    ("bedrock", "intake_agent", None),
+
+    # Connect agents to LLM
+    ("intake_agent", "claude", "Agent-LLM interaction"),
+    ("monitoring_agent", "claude", None),
+    ("intervention_agent", "claude", None),
+    ("escalation_agent", "claude", None),
+
+    # 5. Voice processing if needed
+    ("intake_lambda", "transcribe", "5a. Speech to text"),
+    ("transcribe", "intake_lambda", "5b. Return transcript"),
+
+    # 6. Store patient data
+    ("intake_lambda", "dynamodb", "6. Store data"),
+
+    # 7. Event triggered for monitoring
+    ("intake_lambda", "event_bridge", "7. Trigger monitoring"),
+    ("event_bridge", "monitoring_lambda", None),
+
+    # 8. Monitoring process
+    ("monitoring_lambda", "bedrock", "8. Analyze symptoms"),
+    ("bedrock", "monitoring_agent", None),
+
+    # 9. Intervention recommendation
+    ("monitoring_lambda", "intervention_lambda", "9. Generate plan"),
+    ("intervention_lambda", "bedrock", None),
+    ("bedrock", "intervention_agent", None),
+
+    # 10. Response generation
+    ("intervention_lambda", "polly", "10a. Generate response"),
+    ("polly", "messaging", "10b. Audio response"),
+    ("intervention_lambda", "mobile", "10c. Update mobile app"),
+
+    # 11. Clinical escalation if needed
+    ("monitoring_lambda", "escalation_lambda", "11. Escalate if needed"),
+    ("escalation_lambda", "bedrock", None),
+    ("bedrock", "escalation_agent", None),
+
+    # 12. Clinician notification
+    ("escalation_lambda", "notification_lambda", "12. Alert clinician"),
+    ("notification_lambda", "clinicians", None),
+
+    # 13. Clinician access to dashboard
+    ("clinicians", "web", "13. View patient data"),
+    ("web", "api", "14. Retrieve data"),
+    ("api", "dynamodb", "15. Access records"),
+]
+
+# Numbered steps every variant must draw, in flow order. Step 5 is the voice
+# round trip and step 10 fans out to the response channels.
+STEPS = (
+    "1", "2", "3", "4", "5a", "5b", "6", "7", "8", "9",
+    "10a", "10b", "10c", "11", "12", "13", "14", "15",
+)
+
+
+def layout(nested, llm):
+    """Cluster tree for a variant.
+
+    nested wraps the service layers in AWS Cloud > VPC with Users outside;
+    otherwise every layer sits at the top level after Users. llm is None,
+    "node" (bare claude node) or "cluster" (claude in a Language Model box).
+    """
+    layers = [CLIENTS, API_LAYER, COMPUTE]
+    if llm == "node":
+        layers.append("claude")
+    elif llm == "cluster":
+        layers.append(("llm", ["claude"]))
+    layers += [AI, DATA]
+
+    if nested:
+        return [("cloud", [("vpc", layers)]), USERS]
+    return [USERS] + layers
@@ -0,0 +1,245 @@
+# Latency-annotated architecture diagrams from recorded traces.
+#
+# Reads a JSONL trace file (one span per line) where each span carries the
+# flow step it belongs to, and redraws a variant with every numbered edge
+# recoloured and relabelled with the measured p50/p95 latency and call
+# volume for its step. Hot steps turn red and thicken; steps with no spans
+# are greyed out.
+#
+# The trace is streamed line by line into one fixed-size log-bucket
+# histogram per step, so memory stays bounded however many millions of
+# spans the file holds. Percentiles are accurate to the bucket width (5%).
+#
+# Accepted span shapes:
+#   {"step": "3", "duration_ms": 41.2}
+#   {"attributes": {"noggin.step": "10a"},
+#    "start_time_unix_nano": 1700000000000000000, "end_time_unix_nano": ...}
+#
+#   python Utils/noggin_diagrams.py latency traces.jsonl
+#   python Utils/noggin_diagrams.py latency traces.jsonl --variant=final --formats=png,svg
+
+import copy
+import json
+import math
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from diagram_formats import FORMATS, emit
+from diagram_render import build, resolve
+from diagram_validate import step_of
+
+STEP_ATTRIBUTE = "noggin.step"
+
+# Histogram buckets: bucket i holds durations in [MIN_MS * GROWTH**i,
+# MIN_MS * GROWTH**(i+1)); everything under MIN_MS lands in bucket 0 and
+# everything past the last bucket (about 20 minutes) in the last one.
+MIN_MS = 0.01
+GROWTH = 1.05
+BUCKETS = 400
+
+# p95 relative to the slowest step -> edge colour
+HEAT = [
+    (0.75, "#D63031"),
+    (0.40, "#E17055"),
+    (0.15, "#FDCB6E"),
+    (0.0, "#00B894"),
+]
+NO_DATA = {"color": "#B2BEC3", "fontcolor": "#636E72", "style": "dashed"}
+
+
+class Histogram:
+    """Fixed-size log-bucket histogram of durations in milliseconds."""
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        if ms > MIN_MS:
+            index = min(int(math.log(ms / MIN_MS, GROWTH)), BUCKETS - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q):
+        """Duration at quantile q (0-1): the geometric middle of its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank and bucket:
+                return min(MIN_MS * GROWTH ** (index + 0.5), self.max)
+        return self.max
+
+
+def span_step(span):
+    step = span.get("step")
+    if step is None:
+        step = span.get("attributes", {}).get(STEP_ATTRIBUTE)
+    return str(step) if step is not None else None
+
+
+def span_ms(span):
+    if "duration_ms" in span:
+        return float(span["duration_ms"])
+    return (span["end_time_unix_nano"] - span["start_time_unix_nano"]) / 1e6
+
+
+def aggregate(lines):
+    """Stream spans into per-step histograms.
+
+    Returns ({step: Histogram}, skipped) where skipped counts lines that
+    were blank, malformed or carried no step.
+    """
+    histograms = {}
+    skipped = 0
+    for line in lines:
+        try:
+            span = json.loads(line)
+            step = span_step(span)
+            ms = span_ms(span)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            skipped += 1
+            continue
+        if step is None:
+            skipped += 1
+            continue
+        if step not in histograms:
+            histograms[step] = Histogram()
+        histograms[step].add(ms)
+    return histograms, skipped
+
+
+def summarize(histograms):
+    """{step: {"count", "p50", "p95", "mean"}} in milliseconds."""
+    return {
+        step: {
+            "count": histogram.count,
+            "p50": histogram.quantile(0.50),
+            "p95": histogram.quantile(0.95),
+            "mean": histogram.total / histogram.count,
+        }
+        for step, histogram in histograms.items()
+    }
+
+
+def _duration(ms):
+    if ms >= 1000:
+        return f"{ms / 1000:.2f} s"
+    if ms >= 10:
+        return f"{ms:.0f} ms"
+    return f"{ms:.1f} ms"
+
+
+def _volume(count):
+    for scale, suffix in ((1e6, "M"), (1e3, "k")):
+        if count >= scale:
+            return f"{count / scale:.1f}{suffix}"
+    return str(count)
+
+
+def _relabel(label, line):
+    # HTML labels (<<b>3. Route request</b>>) take a <br/>, plain ones a newline
+    if label.startswith("<") and label.endswith(">"):
+        return f'{label[:-1]}<br/><font point-size="10">{line}</font>>'
+    return f"{label}\n{line}"
+
+
+def annotate(model, stats):
+    """Copy of a model with numbered edges recoloured and relabelled from stats."""
+    model = copy.deepcopy(model)
+    model["filename"] += "_latency"
+    slowest = max((s["p95"] for s in stats.values()), default=0) or 1
+    busiest = max((s["count"] for s in stats.values()), default=0) or 1
+
+    for edge in model["edges"]:
+        step = step_of(edge["label"])
+        if step is None:
+            continue
+        measured = stats.get(step)
+        if measured is None:
+            edge["attrs"].update(NO_DATA)
+            edge["label"] = _relabel(edge["label"], "no data")
+            continue
+        heat = measured["p95"] / slowest
+        color = next(color for threshold, color in HEAT if heat >= threshold)
+        edge["attrs"].update({
+            "color": color,
+            "fontcolor": color,
+            "penwidth": f"{1.5 + 4.5 * measured['count'] / busiest:.1f}",
+        })
+        edge["label"] = _relabel(
+            edge["label"],
+            f"p50 {_duration(measured['p50'])} / p95 {_duration(measured['p95'])}"
+            f" / {_volume(measured['count'])} calls",
+        )
+    return model
+
+
+def render_latency(trace, name="final_readable", formats=("png",), out_dir="."):
+    """Aggregate a trace file and render the annotated variant into out_dir."""
+    started = time.perf_counter()
+    with open(trace, encoding="utf-8") as lines:
+        histograms, skipped = aggregate(lines)
+    stats = summarize(histograms)
+    aggregate_seconds = time.perf_counter() - started
+
+    model = annotate(resolve(name), stats)
+    laid_out = subprocess.run(
+        ["dot", "-Tdot"],
+        input=build(model).source.encode(),
+        capture_output=True,
+        check=True,
+    ).stdout.decode()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for fmt in formats:
+        paths[fmt] = out_dir / (model["filename"] + FORMATS[fmt]["suffix"])
+        emit(laid_out, fmt, paths[fmt])
+    return {
+        "stats": stats,
+        "skipped": skipped,
+        "aggregate_seconds": aggregate_seconds,
+        "paths": paths,
+    }
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else list(argv)
+    options = dict(arg[2:].split("=", 1) for arg in args if arg.startswith("--") and "=" in arg)
+    traces = [arg for arg in args if not arg.startswith("--")]
+    if len(traces) != 1:
+        print("usage: diagram_traces.py TRACE.jsonl [--variant=NAME] [--formats=png,svg] "
+              "[--output-dir=DIR]", file=sys.stderr)
+        return 2
+
+    result = render_latency(
+        traces[0],
+        name=options.get("variant", "final_readable"),
+        formats=tuple(options.get("formats", "png").split(",")),
+        out_dir=options.get("output-dir", "."),
+    )
+    stats = result["stats"]
+    spans = sum(s["count"] for s in stats.values())
+    print(f"{spans} spans over {len(stats)} steps aggregated in "
+          f"{result['aggregate_seconds']:.2f}s ({result['skipped']} skipped)")
+    print(f"{'step':<6} {'calls':>10} {'p50':>10} {'p95':>10}")
+    for step, s in sorted(stats.items(), key=lambda item: -item[1]["p95"]):
+        print(f"{step:<6} {s['count']:>10} {_duration(s['p50']):>10} {_duration(s['p95']):>10}")
+    for path in result["paths"].values():
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
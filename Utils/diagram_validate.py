@@ -0,0 +1,189 @@
+# Check the diagram topology and variants without rendering anything.
+#
+# Works on the same resolved models the renderer builds from (see
+# diagram_render.resolve), so no diagrams or graphviz import is needed and a
+# full run over every variant takes milliseconds. Reports:
+#
+#   errors    numbered steps from diagram_spec.STEPS that are missing or
+#             unknown, duplicate edges, nodes drawn twice, flows or overlays
+#             referring to nodes, kinds or icons that don't exist, and
+#             variants whose numbered flow drifted from the others
+#   warnings  dangling nodes (drawn but not connected) and node labels that
+#             drifted between variants; --strict turns these into errors
+#
+#   python Utils/noggin_diagrams.py validate
+#   python Utils/noggin_diagrams.py validate final_readable --strict
+
+import re
+import sys
+import time
+from collections import Counter
+
+from diagram_icons import ICONS
+from diagram_render import DEFAULT_KINDS, NODE_CLASSES, resolve
+from diagram_spec import FLOWS, NODES, STEPS
+from diagram_variants import VARIANTS
+
+# "10a. Generate response" -> "10a"
+STEP_LABEL = re.compile(r"(\d+[a-z]?)\.\s")
+HTML_TAG = re.compile(r"<[^>]*>")
+
+
+def step_of(label):
+    """Step number of an edge label, or None for annotations and connectors."""
+    # Readable variants wrap the label in HTML: <<b>3. Route request</b>>
+    text = HTML_TAG.sub("", label).strip("<> ")
+    match = STEP_LABEL.match(text)
+    return match.group(1) if match else None
+
+
+def _normalize(label):
+    return " ".join(label.split())
+
+
+def check_spec():
+    """Problems in the shared topology itself."""
+    issues = []
+    for src, dst, label in FLOWS:
+        for node in (src, dst):
+            if node not in NODES:
+                issues.append(("error", "spec", f"flow {src} -> {dst} uses unknown node {node!r}"))
+    declared = Counter(STEPS)
+    for step, count in declared.items():
+        if count > 1:
+            issues.append(("error", "spec", f"step {step} listed {count} times in STEPS"))
+    for src, dst, label in FLOWS:
+        step = step_of(label) if label else None
+        if step and step not in declared:
+            issues.append(("error", "spec", f"flow {src} -> {dst} has undeclared step {step}"))
+    return issues
+
+
+def check_variant(name, model):
+    """Problems in one resolved variant."""
+    issues = []
+    variant = VARIANTS[name]
+
+    kinds = {kind for kind, _ in NODES.values()}
+    for kind in variant.get("kinds", {}):
+        if kind not in kinds:
+            issues.append(("error", name, f"kinds maps unknown kind {kind!r}"))
+    for kind, target in {**DEFAULT_KINDS, **variant.get("kinds", {})}.items():
+        if target.startswith("icon:"):
+            if target[len("icon:"):] not in ICONS:
+                issues.append(("error", name, f"kind {kind!r} uses unknown icon {target!r}"))
+        elif target not in NODE_CLASSES:
+            issues.append(("error", name, f"kind {kind!r} uses unknown class {target!r}"))
+    for node in variant.get("labels", {}):
+        if node not in NODES:
+            issues.append(("error", name, f"labels override unknown node {node!r}"))
+
+    drawn = Counter()
+
+    def walk(entries):
+        for entry in entries:
+            if isinstance(entry, str):
+                drawn[entry] += 1
+            else:
+                walk(entry["children"])
+
+    walk(model["clusters"])
+    for node, count in drawn.items():
+        if count > 1:
+            issues.append(("error", name, f"node {node!r} drawn {count} times"))
+
+    pairs = Counter((edge["src"], edge["dst"]) for edge in model["edges"])
+    for (src, dst), count in pairs.items():
+        if count > 1:
+            issues.append(("error", name, f"duplicate edge {src} -> {dst} ({count}x)"))
+
+    steps = {step_of(edge["label"]) for edge in model["edges"]} - {None}
+    for step in STEPS:
+        if step not in steps:
+            issues.append(("error", name, f"step {step} is missing"))
+    for step in sorted(steps - set(STEPS)):
+        issues.append(("error", name, f"step {step} is not in STEPS"))
+
+    connected = {node for pair in pairs for node in pair}
+    for node in drawn:
+        if node not in connected:
+            issues.append(("warning", name, f"node {node!r} is not connected to anything"))
+    return issues
+
+
+def check_drift(models):
+    """Differences between variants over the nodes they all draw."""
+    issues = []
+    if len(models) < 2:
+        return issues
+    shared = set.intersection(*(set(model["nodes"]) for model in models.values()))
+
+    def flow(model):
+        # (src, dst) -> step number, or None for unnumbered edges
+        return {
+            (edge["src"], edge["dst"]): step_of(edge["label"])
+            for edge in model["edges"]
+            if edge["src"] in shared and edge["dst"] in shared
+        }
+
+    reference_name, *others = models
+    reference = models[reference_name]
+    expected = flow(reference)
+    for name in others:
+        model = models[name]
+        actual = flow(model)
+        for src, dst in sorted(expected.keys() - actual.keys()):
+            issues.append(("error", name, f"drifted from {reference_name}: no {src} -> {dst}"))
+        for src, dst in sorted(actual.keys() - expected.keys()):
+            issues.append(("error", name, f"drifted from {reference_name}: extra {src} -> {dst}"))
+        for pair in sorted(expected.keys() & actual.keys()):
+            if expected[pair] != actual[pair]:
+                issues.append(("error", name,
+                               f"drifted from {reference_name}: {pair[0]} -> {pair[1]} is step "
+                               f"{actual[pair]}, not {expected[pair]}"))
+        for node in sorted(shared):
+            ours = _normalize(model["nodes"][node]["label"])
+            theirs = _normalize(reference["nodes"][node]["label"])
+            if ours != theirs:
+                issues.append(("warning", name,
+                               f"label of {node!r} drifted from {reference_name}: "
+                               f"{ours!r} vs {theirs!r}"))
+    return issues
+
+
+def validate(names=None, strict=False):
+    """Validate the spec and the given variants (default: all).
+
+    Returns a list of (severity, where, message); with strict, warnings are
+    reported as errors.
+    """
+    names = list(names or VARIANTS)
+    issues = check_spec()
+    if not any(severity == "error" for severity, _, _ in issues):
+        models = {name: resolve(name) for name in names}
+        for name, model in models.items():
+            issues += check_variant(name, model)
+        issues += check_drift(models)
+    if strict:
+        issues = [("error", where, message) for _, where, message in issues]
+    return issues
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else list(argv)
+    strict = "--strict" in args
+    names = [arg for arg in args if not arg.startswith("--")] or None
+
+    started = time.perf_counter()
+    issues = validate(names, strict)
+    elapsed = time.perf_counter() - started
+    for severity, where, message in issues:
+        print(f"{severity:<8} {where:<24} {message}")
+    errors = sum(severity == "error" for severity, _, _ in issues)
+    print(f"{len(names or VARIANTS)} variants checked in {elapsed * 1000:.1f} ms: "
+          f"{errors} errors, {len(issues) - errors} warnings")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+# Style overlays for each architecture diagram variant.
+#
+# A variant only says how the shared topology in diagram_spec.py is drawn:
+# output filename, graphviz attributes, cluster styling per role, which
+# diagrams class or icon each node kind uses, and how edges are styled.
+#
+# Keys:
+#   filename         output name under Documents/Images (no extension)
+#   direction        Diagram direction
+#   nested           wrap the service layers in AWS Cloud > VPC
+#   llm              None, "node" or "cluster" (see diagram_spec.layout)
+#   kinds            node kind -> diagrams class name or "icon:<name>"
+#   labels           node id -> label override
+#   graph_attrs, node_attrs, edge_attrs
+#                    Diagram-level graphviz attributes
+#   clusters         cluster role ("cloud", "vpc", "llm", "cluster") -> attrs
+#   numbered_edge    attributes for "N. ..." flow edges
+#   numbered_label   format string applied to numbered edge labels
+#   edge             attributes for unlabelled connectors
+#   annotation_edge  extra attributes for non-numbered labelled edges
+
+# Custom colors to match the sample diagram
+COLORS = {
+    "border": "#000000",
+    "cluster_bg": "#FFFFFF",
+    "cluster_border": "#DDDDDD",
+    "aws_orange": "#FF9900",
+    "lambda_orange": "#FF9900",
+    "edge_color": "#333333",
+    "api_gateway_purple": "#A152AD",
+    "data_green": "#3F8624",
+    "agent_blue": "#2496ED",
+    "aws_cloud_bg": "#F8F8F8",
+    "vpc_bg": "#E9F1F6",
+    "vpc_border": "#7AA3B5",
+    "llm_bg": "#E8F0F7",
+}
+
+# Bedrock, the agents and the LLM drawn with the AgentCore logo
+AGENTCORE_ICONS = {
+    "agentcore": "icon:agentcore",
+    "agent": "icon:agentcore",
+    "llm": "icon:agentcore",
+}
+
+# Node attributes shared by the improved/final variants
+BOX_NODE_ATTRS = {
+    "shape": "box",
+    "style": "filled",
+    "fillcolor": "white",
+    "fontname": "Arial",
+    "fontsize": "13",
+    "height": "1.3",
+    "width": "2.2",
+    "penwidth": "1.5",
+}
+
+# Normal edge attributes shared by the improved/final variants
+EDGE_ATTRS = {
+    "color": COLORS["edge_color"],
+    "penwidth": "1.2",
+    "fontname": "Arial",
+    "fontsize": "11",
+}
+
+# AWS Cloud cluster attributes
+AWS_CLOUD_ATTRS = {
+    "style": "filled",
+    "fillcolor": COLORS["aws_cloud_bg"],
+    "color": COLORS["cluster_border"],
+    "fontname": "Arial",
+    "fontsize": "20",
+    "fontweight": "bold",
+    "penwidth": "1.5",
+    "margin": "30",
+}
+
+# VPC cluster attributes
+VPC_ATTRS = {
+    "style": "filled",
+    "fillcolor": COLORS["vpc_bg"],
+    "color": COLORS["vpc_border"],
+    "fontname": "Arial",
+    "fontsize": "16",
+    "penwidth": "1.5",
+    "margin": "20",
+}
+
+# Regular cluster attributes
+CLUSTER_ATTRS = {
+    "style": "rounded,filled",
+    "fillcolor": COLORS["cluster_bg"],
+    "color": COLORS["cluster_border"],
+    "fontname": "Arial",
+    "fontsize": "14",
+    "penwidth": "1.0",
+    "margin": "12",
+}
+
+# LLM cluster attributes
+LLM_ATTRS = {
+    "style": "filled,rounded",
+    "fillcolor": COLORS["llm_bg"],
+    "color": "#5B9BD5",
+    "fontname": "Arial",
+    "fontsize": "16",
+    "fontweight": "bold",
+    "penwidth": "2.0",
+    "margin": "15",
+}
+
+# Readable variants: landscape, larger fonts, labels pinned to the top left
+READABLE_GRAPH_ATTRS = {
+    "fontsize": "18",
+    "fontname": "Arial",
+    "bgcolor": "white",
+    "rankdir": "LR",
+    "pad": "0.5",
+    "splines": "ortho",
+    "nodesep": "0.9",
+    "ranksep": "1.0",
+    "concentrate": "true",
+}
+
+READABLE_NODE_ATTRS = {
+    "shape": "box",
+    "style": "filled",
+    "fillcolor": "white",
+    "fontname": "Arial",
+    "fontsize": "14",
+    "fontcolor": "#000000",
+    "height": "1.3",
+    "width": "2.2",
+    "penwidth": "1.5",
+}
+
+READABLE_CLUSTERS = {
+    "cloud": {**AWS_CLOUD_ATTRS},
+    "vpc": {**VPC_ATTRS, "fontweight": "bold"},
+    "cluster": {**CLUSTER_ATTRS, "fontcolor": "#000000", "margin": "15"},
+    "llm": {**LLM_ATTRS},
+}
+
+# Pin cluster labels to the top left
+TOP_LEFT = {"labeljust": "l", "labelloc": "t"}
+
+
+VARIANTS = {
+    # First cut: default diagrams styling, Bedrock borrows the Rekognition icon
+    "architecture": {
+        "filename": "noggin_architecture",
+        "direction": "LR",
+        "nested": False,
+        "llm": None,
+        "kinds": {"agentcore": "Rekognition"},
+    },
+
+    # The original layout with AgentCore icons and the LLM node added
+    "original_with_agentcore": {
+        "filename": "noggin_architecture_original_with_agentcore",
+        "direction": "LR",
+        "nested": False,
+        "llm": "node",
+        "kinds": AGENTCORE_ICONS,
+    },
+
+    "updated": {
+        "filename": "noggin_architecture_updated",
+        "direction": "TB",
+        "nested": False,
+        "llm": None,
+        "kinds": {"agentcore": "icon:agentcore", "agent": "icon:agentcore"},
+        "graph_attrs": {
+            "fontsize": "16",
+            "fontname": "Arial",
+            "bgcolor": "white",
+            "rankdir": "LR",
+            "splines": "ortho",
+            "nodesep": "0.8",
+            "ranksep": "1.0",
+            "fontcolor": "#2D3436",
+            "pad": "0.5",
+            "style": "filled",
+            "fillcolor": "white",
+            "center": "true",
+        },
+        "node_attrs": {**BOX_NODE_ATTRS, "fontcolor": "#2D3436", "penwidth": "2.0"},
+        "edge_attrs": {**EDGE_ATTRS, "penwidth": "1.5", "fontcolor": "#444444"},
+        "clusters": {
+            "cluster": {
+                **CLUSTER_ATTRS,
+                "style": "filled,rounded",
+                "fillcolor": "#F8F8F8",
+                "fontcolor": "#2D3436",
+                "penwidth": "2.0",
+                "margin": "15",
+            },
+        },
+        "numbered_edge": {"color": COLORS["edge_color"], "penwidth": "1.5"},
+        "edge": {"color": COLORS["edge_color"], "penwidth": "1.5"},
+    },
+
+    # Adds the AWS Cloud and VPC boundaries
+    "improved": {
+        "filename": "noggin_architecture_improved",
+        "direction": "TB",
+        "nested": True,
+        "llm": None,
+        "kinds": {"agentcore": "icon:agentcore", "agent": "icon:agentcore"},
+        "graph_attrs": {
+            "fontsize": "18",
+            "fontname": "Arial",
+            "bgcolor": "white",
+            "rankdir": "TB",
+            "pad": "0.5",
+            "splines": "ortho",
+            "nodesep": "0.8",
+            "ranksep": "1.0",
+        },
+        "node_attrs": BOX_NODE_ATTRS,
+        "edge_attrs": EDGE_ATTRS,
+        "clusters": {
+            "cloud": AWS_CLOUD_ATTRS,
+            "vpc": VPC_ATTRS,
+            "cluster": CLUSTER_ATTRS,
+        },
+    },
+
+    # Adds the Language Model cluster and bold numbered edges
+    "final": {
+        "filename": "noggin_architecture_final",
+        "direction": "TB",
+        "nested": True,
+        "llm": "cluster",
+        "kinds": AGENTCORE_ICONS,
+        "graph_attrs": {
+            "fontsize": "18",
+            "fontname": "Arial",
+            "bgcolor": "white",
+            "rankdir": "TB",
+            "pad": "0.5",
+            "splines": "ortho",
+            "nodesep": "0.9",
+            "ranksep": "1.2",
+        },
+        "node_attrs": BOX_NODE_ATTRS,
+        "edge_attrs": EDGE_ATTRS,
+        "clusters": {
+            "cloud": AWS_CLOUD_ATTRS,
+            "vpc": VPC_ATTRS,
+            "cluster": CLUSTER_ATTRS,
+            "llm": LLM_ATTRS,
+        },
+        "numbered_edge": {
+            "color": COLORS["edge_color"],
+            "penwidth": "2.0",
+            "fontname": "Arial",
+            "fontsize": "13",
+            "fontcolor": "#000000",
+            "fontweight": "bold",
+        },
+        "edge": EDGE_ATTRS,
+    },
+
+    # Server boxes instead of icons so labels stay legible, HTML bold labels
+    "readable": {
+        "filename": "noggin_architecture_readable",
+        "direction": "LR",
+        "nested": True,
+        "llm": "cluster",
+        "labels": {"messaging": "Messaging\n(WhatsApp/SMS)"},
+        "graph_attrs": READABLE_GRAPH_ATTRS,
+        "node_attrs": READABLE_NODE_ATTRS,
+        "clusters": READABLE_CLUSTERS,
+        "numbered_edge": {"fontsize": "14", "penwidth": "2.0"},
+        "numbered_label": "<<b>{}</b>>",
+        "edge": {"penwidth": "1.5"},
+        "annotation_edge": {"fontsize": "13"},
+    },
+
+    # Landscape 11x8.5 sheet with wider spacing and Arial Black step labels
+    "final_readable": {
+        "filename": "noggin_architecture_final_readable",
+        "direction": "LR",
+        "nested": True,
+        "llm": "cluster",
+        "labels": {
+            "messaging": "Messaging\n(WhatsApp/SMS)",
+            "transcribe": "AWS Transcribe\nMedical",
+        },
+        "graph_attrs": {
+            **READABLE_GRAPH_ATTRS,
+            "nodesep": "1.2",
+            "ranksep": "1.5",
+            "ratio": "fill",
+            "size": "11,8.5",
+            "concentrate": "false",
+            "compound": "true",
+        },
+        "node_attrs": {**READABLE_NODE_ATTRS, "height": "1.2", "width": "2.0", "labelloc": "c"},
+        "edge_attrs": {
+            "color": COLORS["edge_color"],
+            "penwidth": "1.2",
+            "fontname": "Arial",
+            "fontsize": "12",
+            "labeldistance": "2.0",
+        },
+        "clusters": {
+            "cloud": {**AWS_CLOUD_ATTRS, "margin": "20", **TOP_LEFT},
+            "vpc": {**VPC_ATTRS, "fontweight": "bold", "margin": "15", **TOP_LEFT},
+            "cluster": {**CLUSTER_ATTRS, "fontsize": "15", "fontcolor": "#000000", **TOP_LEFT},
+            "llm": {**LLM_ATTRS, **TOP_LEFT},
+        },
+        "numbered_edge": {
+            "color": COLORS["edge_color"],
+            "penwidth": "2.0",
+            "fontname": "Arial Black",
+            "fontsize": "15",
+            "fontcolor": "#000000",
+            "labeldistance": "2.0",
+            "labelangle": "45",
+            "minlen": "2",
+        },
+        "edge": {
+            "color": COLORS["edge_color"],
+            "penwidth": "1.2",
+            "fontname": "Arial",
+            "fontsize": "12",
+            "labeldistance": "2.0",
+        },
+    },
+}
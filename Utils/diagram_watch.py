@@ -0,0 +1,154 @@
+# Watch the diagram inputs and re-render only the variants they affect.
+#
+# Watched: the topology (diagram_spec.py), the style overlays
+# (diagram_variants.py) and the icon sources in diagram_icons.ICONS. The
+# main thread polls for changes and debounces bursts of saves; a single
+# background worker reloads the modules, fingerprints every variant (its
+# DOT source plus the bytes of the icons it references) and renders the
+# ones whose fingerprint moved. A style edit to one variant re-renders that
+# variant only; an edit to the shared topology re-renders them all.
+#
+#   python Utils/noggin_diagrams.py watch
+#   python Utils/noggin_diagrams.py watch final_readable --formats=png
+
+import hashlib
+import importlib
+import queue
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+import diagram_icons
+import diagram_render
+import diagram_spec
+import diagram_variants
+from diagram_cache import file_digest, icon_paths
+
+# Reloaded in this order when their source changes; diagram_render last so
+# it picks up the new NODES/FLOWS/VARIANTS it imported by name.
+MODULES = (diagram_spec, diagram_variants, diagram_render)
+
+
+def fingerprint(name):
+    """Hash of a variant's DOT source and the bytes of every icon it uses."""
+    dot_source = diagram_render.source(name)
+    digest = hashlib.sha256(dot_source.encode())
+    for path in icon_paths(dot_source):
+        digest.update(f"\0{path}\0{file_digest(path)}".encode())
+    return digest.hexdigest()
+
+
+class Watcher:
+    def __init__(self, names=None, formats=None, debounce=0.5, interval=0.2):
+        self.names = list(names) if names else None
+        self.formats = formats
+        self.debounce = debounce
+        self.interval = interval
+        self.fingerprints = {}
+        self.changes = queue.Queue()
+        self.worker = threading.Thread(target=self._work, name="diagram-watch", daemon=True)
+
+    def watched_files(self):
+        files = [Path(diagram_spec.__file__), Path(diagram_variants.__file__)]
+        files += diagram_icons.source_files()
+        return files
+
+    def _snapshot(self):
+        snapshot = {}
+        for path in self.watched_files():
+            try:
+                stat = path.stat()
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                snapshot[path] = None
+        return snapshot
+
+    def run(self):
+        """Watch until interrupted."""
+        self.worker.start()
+        # Bring everything up to date first; unchanged variants are cache hits
+        self.changes.put(set(self.watched_files()))
+        print("watching " + ", ".join(str(p.name) for p in self.watched_files()), flush=True)
+
+        previous = self._snapshot()
+        pending = set()
+        last_change = 0.0
+        try:
+            while True:
+                time.sleep(self.interval)
+                current = self._snapshot()
+                changed = {p for p in current.keys() | previous.keys()
+                           if current.get(p) != previous.get(p)}
+                previous = current
+                if changed:
+                    pending |= changed
+                    last_change = time.monotonic()
+                elif pending and time.monotonic() - last_change >= self.debounce:
+                    self.changes.put(pending)
+                    pending = set()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.changes.put(None)
+            self.worker.join()
+
+    def _work(self):
+        while True:
+            changed = self.changes.get()
+            if changed is None:
+                return
+            # Coalesce anything that queued up while the last render ran
+            while True:
+                try:
+                    more = self.changes.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    return
+                changed |= more
+            try:
+                self._rebuild(changed)
+            except Exception:
+                # A half-saved spec shouldn't kill the watcher
+                traceback.print_exc()
+
+    def _rebuild(self, changed):
+        module_files = {Path(module.__file__): module for module in MODULES}
+        if changed & module_files.keys():
+            for module in MODULES:
+                importlib.reload(module)
+
+        names = self.names or list(diagram_variants.VARIANTS)
+        stale = {}
+        for name in names:
+            current = fingerprint(name)
+            if self.fingerprints.get(name) != current:
+                stale[name] = current
+        if not stale:
+            print("no variant affected", flush=True)
+            return
+
+        started = time.perf_counter()
+        kwargs = {"formats": self.formats} if self.formats else {}
+        results = diagram_render.render_all(list(stale), **kwargs)
+        # Only now: a render that raised is retried on the next change
+        self.fingerprints.update(stale)
+        summary = ", ".join(f"{name} ({result['layout']})" for name, result in results.items())
+        print(f"rendered {summary} in {time.perf_counter() - started:.2f}s", flush=True)
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else list(argv)
+    formats = None
+    for arg in args:
+        if arg.startswith("--formats="):
+            formats = tuple(arg.split("=", 1)[1].split(","))
+    names = [arg for arg in args if not arg.startswith("--")]
+    Watcher(names, formats).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
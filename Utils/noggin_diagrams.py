@@ -0,0 +1,192 @@
+# noggin-diagrams: command line entry point for the architecture diagrams.
+#
+# Kept cheap to start: only the standard library is imported up front, and
+# the diagrams providers are loaded lazily for the variants being drawn
+# (see NODE_CLASSES in diagram_render.py).
+#
+#   python Utils/noggin_diagrams.py list
+#   python Utils/noggin_diagrams.py render final_readable --formats=png,svg
+#   python Utils/noggin_diagrams.py source final > final.gv
+#   python Utils/noggin_diagrams.py validate --strict
+#   python Utils/noggin_diagrams.py watch --formats=png,svg
+#   python Utils/noggin_diagrams.py latency traces.jsonl --variant=final_readable
+#   python Utils/noggin_diagrams.py bench final_readable --splines=ortho
+#   python Utils/noggin_diagrams.py --importtime render architecture
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# "import time:       123 |        456 |     diagrams.aws.compute"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+# Lazy provider imports, reported by the child on stderr:
+# "provider import: diagrams.aws.compute 41.2"
+PROVIDER_LINE = re.compile(r"provider import: (\S+) ([\d.]+)")
+PROVIDER_TIMES = "NOGGIN_PROVIDER_TIMES"
+
+
+def cmd_list(args):
+    from diagram_variants import VARIANTS
+
+    for name, variant in VARIANTS.items():
+        print(f"{name:<28} {variant['filename']}")
+    return 0
+
+
+def cmd_render(args):
+    from diagram_formats import DEFAULT_FORMATS
+    from diagram_render import main as render_main
+
+    argv = list(args.variants)
+    argv.append("--formats=" + (args.formats or ",".join(DEFAULT_FORMATS)))
+    if args.no_cache:
+        argv.append("--no-cache")
+    render_main(argv)
+    return 0
+
+
+def cmd_source(args):
+    from diagram_render import source
+
+    sys.stdout.write(source(args.variant))
+    return 0
+
+
+def cmd_validate(args):
+    from diagram_validate import main as validate_main
+
+    return validate_main([*args.variants, *(["--strict"] if args.strict else [])])
+
+
+def cmd_watch(args):
+    from diagram_watch import Watcher
+
+    formats = tuple(args.formats.split(",")) if args.formats else None
+    Watcher(args.variants, formats, debounce=args.debounce).run()
+    return 0
+
+
+def cmd_latency(args):
+    from diagram_traces import main as latency_main
+
+    argv = [args.trace, f"--variant={args.variant}", f"--output-dir={args.output_dir}"]
+    if args.formats:
+        argv.append(f"--formats={args.formats}")
+    return latency_main(argv)
+
+
+def cmd_bench(argv):
+    from diagram_bench import main as bench_main
+
+    return bench_main(argv)
+
+
+def importtime_report(argv, top=15):
+    """Re-run this command under python -X importtime and summarise where startup goes."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(Path(__file__).resolve()), *argv],
+        capture_output=True,
+        text=True,
+        env={**os.environ, PROVIDER_TIMES: "1"},
+    )
+    wall = time.perf_counter() - started
+
+    imports = []
+    providers = {}
+    for line in result.stderr.splitlines():
+        match = PROVIDER_LINE.match(line)
+        if match:
+            providers[match.group(1)] = float(match.group(2))
+            continue
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            # Nesting in -X importtime output is two spaces per level
+            depth = (len(indent) - 1) // 2
+            imports.append((module, int(self_us), int(cumulative_us), depth))
+
+    total_us = sum(cumulative for _, _, cumulative, depth in imports if depth == 0)
+
+    sys.stdout.write(result.stdout)
+    print()
+    print(f"startup report: {wall * 1000:.0f} ms wall, {total_us / 1000:.0f} ms in imports, "
+          f"{len(imports)} modules")
+    print(f"{'self [ms]':>10} {'cumulative [ms]':>16}  module")
+    for module, self_us, cumulative_us, depth in sorted(imports, key=lambda i: -i[2])[:top]:
+        print(f"{self_us / 1000:10.1f} {cumulative_us / 1000:16.1f}  {'  ' * depth}{module}")
+    if providers:
+        print()
+        print("diagrams providers loaded lazily:")
+        for provider, ms in sorted(providers.items(), key=lambda p: -p[1]):
+            print(f"{ms:10.1f} ms  {provider}")
+    return result.returncode
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if "--importtime" in argv:
+        argv.remove("--importtime")
+        return importtime_report(argv)
+    if argv[:1] == ["bench"]:
+        # diagram_bench.py has its own argument parser
+        return cmd_bench(argv[1:])
+
+    parser = argparse.ArgumentParser(prog="noggin-diagrams")
+    parser.add_argument("--importtime", action="store_true",
+                        help="report interpreter startup and import time for the command")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list diagram variants").set_defaults(func=cmd_list)
+
+    render = commands.add_parser("render", help="render variants to Documents/Images")
+    render.add_argument("variants", nargs="*")
+    render.add_argument("--formats", help="comma separated, e.g. png,svg,pdf,web")
+    render.add_argument("--no-cache", action="store_true")
+    render.set_defaults(func=cmd_render)
+
+    dot = commands.add_parser("source", help="print the DOT source of a variant")
+    dot.add_argument("variant")
+    dot.set_defaults(func=cmd_source)
+
+    validate = commands.add_parser("validate", help="check flow steps and wiring without rendering")
+    validate.add_argument("variants", nargs="*")
+    validate.add_argument("--strict", action="store_true", help="treat warnings as errors")
+    validate.set_defaults(func=cmd_validate)
+
+    watch = commands.add_parser("watch", help="re-render variants as their inputs change")
+    watch.add_argument("variants", nargs="*")
+    watch.add_argument("--formats", help="comma separated, e.g. png,svg")
+    watch.add_argument("--debounce", type=float, default=0.5, help="seconds of quiet before rendering")
+    watch.set_defaults(func=cmd_watch)
+
+    latency = commands.add_parser("latency", help="annotate a variant with p50/p95 latency from a trace")
+    latency.add_argument("trace", help="JSONL spans tagged with their flow step")
+    latency.add_argument("--variant", default="final_readable")
+    latency.add_argument("--formats", help="comma separated, e.g. png,svg")
+    latency.add_argument("--output-dir", default=".")
+    latency.set_defaults(func=cmd_latency)
+
+    commands.add_parser("bench", help="benchmark layouts (see diagram_bench.py)")
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    finally:
+        if os.environ.get(PROVIDER_TIMES):
+            _report_provider_imports()
+
+
+def _report_provider_imports():
+    # Only loaded if a command drew something
+    render = sys.modules.get("diagram_render")
+    for module, ms in getattr(render, "PROVIDER_IMPORT_MS", {}).items():
+        print(f"provider import: {module} {ms:.1f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+# Noggin reference implementation.
+#
+# Runnable, in-process version of the architecture in Utils/diagram_spec.py
+# and Documents/patient_interaction_narrative.md, with stand-ins for the AWS
+# services so each step can be measured. Modules with a benchmark run it
+# from the repository root:
+#
+#   python -m noggin.pipeline --patients 500 --concurrency 100
@@ -0,0 +1,268 @@
+# Deadline-aware micro-batching of monitoring analyses (step 8).
+#
+# After a check-in wave (noggin.scheduler) thousands of near-identical
+# "analyze this check-in" calls reach the monitoring agent at once. Each
+# one pays the model's fixed overhead and resends the same instructions,
+# and a model's concurrency quota caps how many run together.
+# MicroBatcher packs check-ins from many patients into one request: the
+# instructions once, then one JSON line per patient, and the model answers
+# with one compact JSON object per patient_id.
+#
+# A batch is sent when it reaches max_batch, when its oldest check-in has
+# waited max_wait, or earlier if a check-in's deadline would otherwise be
+# missed (allowing for the estimated batch latency). Replies are split back
+# per patient; anyone missing from the batch reply is retried on their own,
+# so a malformed reply never loses a check-in.
+#
+#   python -m noggin.batching --checkins 5000
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+
+from .router import MODELS, SLO_MS, nearest_rank
+from .services import AGENTS
+
+# Decode time grows with the batch: a full batch of 8 (~1.8 s on Haiku)
+# leaves room inside the monitoring SLO, where 32 (~6 s) can't meet it
+MAX_BATCH = 8
+MAX_WAIT = 0.05
+
+INSTRUCTIONS = (
+    "You are Noggin's monitoring agent. For each check-in line below, compare the symptoms "
+    "with the patient's baseline severity and reply with one JSON object per line: "
+    '{"patient_id": ..., "severity": <int>, "trend": "improving"|"persisting"|"worsening"}.'
+)
+# Reply tokens per check-in: the same compact JSON object whether it is
+# asked for alone or as one line of a batch
+OUTPUT_TOKENS = 30
+
+
+class MonitoringModel:
+    """Monitoring model stand-in with a concurrency quota and token-based latency."""
+
+    def __init__(self, model=MODELS["haiku"], scale=0.01, drop_rate=0.01, seed=0):
+        self.model = model
+        self.scale = scale
+        self.drop_rate = drop_rate
+        self.rng = random.Random(seed)
+        self.slots = asyncio.Semaphore(model.capacity)
+        self.calls = 0
+        self.input_tokens = 0
+
+    async def _generate(self, prompt, output_tokens):
+        self.calls += 1
+        self.input_tokens += len(prompt) // 4
+        async with self.slots:
+            ms = self.model.ttft_ms + self.model.ms_per_output_token * output_tokens
+            await asyncio.sleep(ms * self.scale / 1000)
+
+    async def analyze(self, checkin):
+        await self._generate(INSTRUCTIONS + "\n" + json.dumps(checkin), OUTPUT_TOKENS)
+        return AGENTS["monitoring_agent"](checkin)
+
+    async def analyze_batch(self, checkins):
+        """One request for many check-ins; returns the raw reply text."""
+        prompt = INSTRUCTIONS + "\n" + "\n".join(json.dumps(c) for c in checkins)
+        await self._generate(prompt, OUTPUT_TOKENS * len(checkins))
+        lines = []
+        for checkin in checkins:
+            if self.rng.random() < self.drop_rate:
+                # Models occasionally skip a line
+                continue
+            lines.append(json.dumps({"patient_id": checkin["patient_id"],
+                                     **AGENTS["monitoring_agent"](checkin)}))
+        return "\n".join(lines)
+
+
+def split_reply(text):
+    """{patient_id: analysis} from a batch reply, skipping lines that don't parse."""
+    results = {}
+    for line in text.splitlines():
+        try:
+            row = json.loads(line)
+            results[row.pop("patient_id")] = row
+        except (ValueError, KeyError, AttributeError):
+            continue
+    return results
+
+
+class MicroBatcher:
+    def __init__(self, model, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.pending = []
+        self.timer = None
+        # Batches being sent; the loop only keeps weak references to tasks
+        self.sending = set()
+        self.opened = 0.0
+        self.batches = 0
+        self.retried = 0
+        # Estimated seconds for a full batch; refined from observed batches
+        self.batch_seconds = 0.0
+
+    async def analyze(self, checkin, deadline=None):
+        """Analysis for one check-in; deadline is a loop.time() by which it is needed."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((checkin, future, deadline))
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        else:
+            self._arm(loop)
+        return await future
+
+    def _arm(self, loop):
+        if len(self.pending) == 1:
+            self.opened = loop.time()
+        due = self.opened + self.max_wait
+        deadlines = [d for _, _, d in self.pending if d is not None]
+        if deadlines:
+            due = min(due, min(deadlines) - self.batch_seconds)
+        if self.timer is None or due < self.timer.when():
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = loop.call_at(max(due, loop.time()), self._flush)
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self.sending.add(task)
+            task.add_done_callback(self.sending.discard)
+        if self.pending:
+            self._arm(asyncio.get_running_loop())
+
+    async def _send(self, batch):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.batches += 1
+        try:
+            results = split_reply(await self.model.analyze_batch([c for c, _, _ in batch]))
+        except Exception as error:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        elapsed = loop.time() - started
+        self.batch_seconds = elapsed if not self.batch_seconds else 0.8 * self.batch_seconds + 0.2 * elapsed
+        missing = []
+        for checkin, future, _ in batch:
+            result = results.get(checkin["patient_id"])
+            if result is None:
+                missing.append((checkin, future))
+            elif not future.done():
+                future.set_result(result)
+        if missing:
+            self.retried += len(missing)
+            await asyncio.gather(*(self._retry(checkin, future) for checkin, future in missing))
+
+    async def _retry(self, checkin, future):
+        try:
+            result = await self.model.analyze(checkin)
+        except Exception as error:
+            if not future.done():
+                future.set_exception(error)
+            return
+        # The caller may have given up (cancelled) meanwhile
+        if not future.done():
+            future.set_result(result)
+
+
+def wave(checkins, seed=0):
+    rng = random.Random(seed)
+    for i in range(checkins):
+        yield {
+            "patient_id": f"p{i:07d}",
+            "checkin": {"headache": rng.randint(0, 6), "dizziness": rng.randint(0, 6),
+                        "fatigue_or_low_energy": rng.randint(0, 6)},
+            "baseline": {"severity": rng.randint(0, 18)},
+        }
+
+
+async def replay(checkins, batched, arrival_seconds, max_batch, max_wait, scale, seed=0):
+    """Check-ins arriving evenly over arrival_seconds; per-check-in latency in model ms.
+
+    Each check-in's deadline is the monitoring agent's latency SLO.
+    """
+    model = MonitoringModel(scale=scale, seed=seed)
+    batcher = MicroBatcher(model, max_batch, max_wait) if batched else None
+    loop = asyncio.get_running_loop()
+    latencies = []
+    slo = SLO_MS["monitoring_agent"] * scale / 1000
+    items = list(wave(checkins, seed))
+    gap = arrival_seconds / max(len(items), 1)
+
+    async def one(checkin):
+        started = loop.time()
+        if batcher:
+            await batcher.analyze(checkin, deadline=started + slo)
+        else:
+            await model.analyze(checkin)
+        latencies.append((loop.time() - started) * 1000 / scale)
+
+    started = loop.time()
+    tasks = []
+    for i, checkin in enumerate(items):
+        delay = started + i * gap - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(one(checkin)))
+    await asyncio.gather(*tasks)
+    latencies.sort()
+    return {
+        "seconds": (loop.time() - started) / scale,
+        "calls": model.calls,
+        "input_tokens": model.input_tokens,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": nearest_rank(latencies, 0.95),
+        "late": sum(ms > SLO_MS["monitoring_agent"] for ms in latencies),
+        "retried": batcher.retried if batcher else 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.batching",
+                                     description="Compare per-patient and micro-batched monitoring calls.")
+    parser.add_argument("--checkins", type=int, default=5000)
+    parser.add_argument("--arrival-seconds", type=float, default=0.5,
+                        help="real seconds over which the wave arrives")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait", type=float, default=MAX_WAIT,
+                        help="seconds of model time a check-in may wait for a batch")
+    parser.add_argument("--scale", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"monitoring model quota {MODELS['haiku'].capacity} concurrent, "
+          f"SLO {SLO_MS['monitoring_agent']} ms")
+    # The check-in wave, then a trickle where batching can only add latency
+    for name, checkins in (("wave", args.checkins), ("trickle", max(args.checkins // 50, 1))):
+        rows = []
+        for label, batched in (("per-patient", False), (f"batched <= {args.max_batch}", True)):
+            report = asyncio.run(replay(checkins, batched, args.arrival_seconds, args.max_batch,
+                                        args.max_wait * args.scale, args.scale, args.seed))
+            rows.append((label, report))
+        print(f"\n{name}: {checkins} check-ins arriving over {args.arrival_seconds / args.scale:.0f} s")
+        print(f"{'':<14} {'model calls':>11} {'input tokens':>13} {'wave s':>8} {'check-ins/s':>12} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'over SLO':>9}")
+        for label, report in rows:
+            print(f"{label:<14} {report['calls']:>11} {report['input_tokens']:>13,} "
+                  f"{report['seconds']:>8.1f} {checkins / report['seconds']:>12.1f} "
+                  f"{report['p50_ms']:>8.0f} {report['p95_ms']:>8.0f} {report['late']:>9}")
+        single, batched = rows[0][1], rows[1][1]
+        print(f"throughput x{single['seconds'] / batched['seconds']:.2f}, "
+              f"p50 {batched['p50_ms'] - single['p50_ms']:+.0f} ms, "
+              f"{batched['retried']} retried individually after a short batch reply")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
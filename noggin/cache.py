@@ -0,0 +1,209 @@
+# Response cache in front of the agent -> model calls.
+#
+# Many agent prompts repeat across patients: the intervention agent explains
+# the same rest protocol or return-to-activity stage to everyone with the
+# same trend and risk, and the monitoring agent sees the same check-ins. A
+# Policy per agent says which structured inputs the reply actually depends
+# on and how long it stays valid; the cache key is the agent, the policy's
+# template version and those inputs, normalised (severities banded like
+# noggin.scoring). Entries live in a size-bounded LRU with a per-agent TTL,
+# and concurrent misses for the same key share one model call.
+#
+# escalation_agent and intake_agent have no policy: escalation decisions and
+# the intake agent's reading of free text for red flags are never cached
+# (one word, "seizure", changes the answer while barely moving the key).
+# Per-agent hits, misses and latency are kept for the report.
+#
+#   python -m noggin.cache --patients 2000
+
+import argparse
+import asyncio
+import copy
+import json
+import statistics
+import sys
+import time
+from collections import OrderedDict
+
+from .scoring import severity_band
+
+MAX_ENTRIES = 50_000
+
+
+class Policy:
+    def __init__(self, fields, ttl, template="v1", normalize=None):
+        # Dotted paths into the payload, e.g. "baseline.severity"
+        self.fields = fields
+        self.ttl = ttl
+        # Bump when the agent's prompt changes so old replies stop matching
+        self.template = template
+        self.normalize = normalize or {}
+
+
+POLICIES = {
+    "monitoring_agent": Policy(("checkin", "baseline.severity"), ttl=3600),
+    "intervention_agent": Policy(("trend", "risk", "severity"), ttl=24 * 3600,
+                                 normalize={"severity": severity_band}),
+}
+
+
+def _field(payload, path):
+    value = payload
+    for part in path.split("."):
+        value = value[part]
+    return value
+
+
+class AgentStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.uncached = 0
+        self.hit_ms = []
+        self.miss_ms = []
+
+    def report(self):
+        lookups = self.hits + self.misses + self.shared
+        return {
+            "hits": self.hits,
+            "shared_misses": self.shared,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "hit_rate": (self.hits + self.shared) / lookups if lookups else 0.0,
+            "hit_p50_ms": statistics.median(self.hit_ms) if self.hit_ms else 0.0,
+            "miss_p50_ms": statistics.median(self.miss_ms) if self.miss_ms else 0.0,
+        }
+
+
+class ResponseCache:
+    def __init__(self, policies=POLICIES, max_entries=MAX_ENTRIES, clock=time.monotonic):
+        self.policies = policies
+        self.max_entries = max_entries
+        self.clock = clock
+        # key -> (expires, reply)
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.stats = {}
+
+    def key(self, agent, payload):
+        """Cache key for a request, or None if the agent isn't cacheable."""
+        policy = self.policies.get(agent)
+        if policy is None:
+            return None
+        inputs = {}
+        for path in policy.fields:
+            value = _field(payload, path)
+            normalize = policy.normalize.get(path)
+            inputs[path] = normalize(value) if normalize else value
+        return f"{agent}:{policy.template}:{json.dumps(inputs, sort_keys=True, separators=(',', ':'))}"
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self.clock():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        # Callers annotate replies (the pipeline adds "risk"); never hand
+        # out the cached object itself
+        return copy.deepcopy(entry[1])
+
+    def put(self, agent, key, reply):
+        self.entries[key] = (self.clock() + self.policies[agent].ttl, copy.deepcopy(reply))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def call(self, agent, payload, invoke):
+        """invoke(agent, payload) through the cache."""
+        stats = self.stats.setdefault(agent, AgentStats())
+        started = time.perf_counter()
+        key = self.key(agent, payload)
+        if key is None:
+            stats.uncached += 1
+            return await invoke(agent, payload)
+
+        reply = self.get(key)
+        if reply is not None:
+            stats.hits += 1
+            stats.hit_ms.append((time.perf_counter() - started) * 1000)
+            return reply
+
+        pending = self.inflight.get(key)
+        if pending is not None:
+            stats.shared += 1
+            reply = await asyncio.shield(pending)
+            stats.hit_ms.append((time.perf_counter() - started) * 1000)
+            return copy.deepcopy(reply)
+        pending = self.inflight[key] = asyncio.ensure_future(invoke(agent, payload))
+        try:
+            reply = await asyncio.shield(pending)
+        finally:
+            del self.inflight[key]
+        stats.misses += 1
+        stats.miss_ms.append((time.perf_counter() - started) * 1000)
+        self.put(agent, key, reply)
+        return reply
+
+    def report(self):
+        return {agent: stats.report() for agent, stats in sorted(self.stats.items())}
+
+
+class CachedBedrock:
+    """A Bedrock client whose invoke_agent goes through a ResponseCache."""
+
+    def __init__(self, bedrock, cache):
+        self.bedrock = bedrock
+        self.cache = cache
+
+    @property
+    def calls(self):
+        return self.bedrock.calls
+
+    async def invoke_agent(self, agent, payload):
+        return await self.cache.call(agent, payload, self.bedrock.invoke_agent)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.cache",
+                                     description="Compare the pipeline with and without the response cache.")
+    parser.add_argument("--patients", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--scale", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from .pipeline import Recorder, run
+    from .services import standins
+    from .synthetic import cohort
+
+    patients = list(cohort(args.patients, args.seed))
+
+    rows = []
+    for label, cache in (("uncached", None), ("cached", ResponseCache())):
+        services = standins(args.scale, args.seed)
+        if cache:
+            services.bedrock = CachedBedrock(services.bedrock, cache)
+        outcomes, end_to_end, wall = asyncio.run(run(patients, args.concurrency, services, Recorder()))
+        rows.append((label, services.bedrock.calls, args.patients / wall,
+                     statistics.median(end_to_end), cache))
+
+    print(f"{args.patients} patients, concurrency {args.concurrency}, latency x{args.scale}")
+    print(f"{'':<14} {'Bedrock calls':>13} {'patients/s':>11} {'e2e p50 ms':>11}")
+    for label, calls, throughput, p50, _ in rows:
+        print(f"{label:<14} {calls:>13} {throughput:>11.1f} {p50:>11.1f}")
+    for label, _, _, _, cache in rows[1:]:
+        print(f"\n{label}")
+        print(f"{'agent':<20} {'hit rate':>8} {'hits':>6} {'shared':>6} "
+              f"{'misses':>6} {'uncached':>8} {'hit ms':>7} {'miss ms':>8}")
+        for agent, stats in cache.report().items():
+            print(f"{agent:<20} {stats['hit_rate']:>8.1%} {stats['hits']:>6} "
+                  f"{stats['shared_misses']:>6} {stats['misses']:>6} {stats['uncached']:>8} "
+                  f"{stats['hit_p50_ms']:>7.2f} {stats['miss_p50_ms']:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+# Shared model client: pooled connections, adaptive concurrency, priorities.
+#
+# All four agents share the bedrock -> model path, and Bedrock throttles
+# per account and model. Fired at once, a check-in wave turns into 429s,
+# and naive retries make it worse. ModelClient puts every model call
+# through, per model:
+#
+#   limiter      AIMD concurrency: slow start (+1 per success) until the
+#                first throttle, then +1 per window of successful calls,
+#                cut by 10% on a throttle (at most once per observed latency),
+#                so it settles just under what the account can take
+#   lanes        calls waiting for a slot are served by priority
+#                (PRIORITIES: escalation first, routine monitoring last),
+#                so escalations (step 11) jump the monitoring queue
+#   budget       a token bucket at BUDGET_SHARE of the tokens-per-minute
+#                quota, so bursts wait locally instead of being rejected
+#   retries      throttled calls retry with full-jitter backoff, back
+#                through the limiter, up to MAX_ATTEMPTS
+#   pool         keep-alive connections reused across calls instead of a
+#                TLS handshake per request
+#
+# ThrottlingModel is the local stand-in: it answers 429 past its
+# concurrency or token quota, and charges a handshake for new connections.
+#
+#   python -m noggin.client --checkins 3000
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+from collections import deque
+
+from .context import tokens
+from .router import MODELS, OUTPUT_TOKENS, nearest_rank
+from .services import AGENTS
+
+PRIORITIES = {
+    "escalation_agent": 0,
+    "intake_agent": 1,
+    "intervention_agent": 2,
+    "monitoring_agent": 3,
+}
+MAX_ATTEMPTS = 6
+BACKOFF_MS = 200
+BUDGET_SHARE = 0.9
+POOL_SIZE = 64
+HANDSHAKE_MS = 120
+THROTTLE_MS = 60
+
+
+class Throttled(Exception):
+    """The model endpoint answered 429 / ThrottlingException."""
+
+
+class ThrottlingModel:
+    """A model endpoint with an account quota on concurrency and tokens per minute."""
+
+    def __init__(self, model, concurrency, tokens_per_minute, scale=0.01, seed=0):
+        self.model = model
+        self.concurrency = concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.active = 0
+        self.tokens = tokens_per_minute / 6
+        self.refilled = time.monotonic()
+        self.requests = 0
+        self.throttled = 0
+        self.handshakes = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        rate = self.tokens_per_minute / 60 / self.scale
+        # Burst of ten seconds' worth, like a short-window quota
+        self.tokens = min(self.tokens_per_minute / 6, self.tokens + (now - self.refilled) * rate)
+        self.refilled = now
+
+    async def sleep_ms(self, ms):
+        await asyncio.sleep(ms * self.scale / 1000)
+
+    async def invoke(self, connection, agent, payload, input_tokens, output_tokens):
+        self.requests += 1
+        if connection.fresh:
+            self.handshakes += 1
+            connection.fresh = False
+            await self.sleep_ms(HANDSHAKE_MS)
+        self._refill()
+        if self.active >= self.concurrency or self.tokens < input_tokens + output_tokens:
+            self.throttled += 1
+            await self.sleep_ms(THROTTLE_MS)
+            raise Throttled(self.model.name)
+        self.tokens -= input_tokens + output_tokens
+        self.active += 1
+        try:
+            ms = self.model.ttft_ms + self.model.ms_per_output_token * output_tokens
+            await self.sleep_ms(max(0.0, self.rng.gauss(ms, ms * 0.15)))
+        finally:
+            self.active -= 1
+        return AGENTS[agent](payload)
+
+
+class Connection:
+    ids = itertools.count()
+
+    def __init__(self):
+        self.id = next(self.ids)
+        self.fresh = True
+
+
+class ConnectionPool:
+    """Keep-alive connections, reused most-recently-released first."""
+
+    def __init__(self, size=POOL_SIZE):
+        self.size = size
+        self.idle = deque()
+        self.opened = 0
+
+    def acquire(self):
+        if self.idle:
+            return self.idle.pop()
+        self.opened += 1
+        return Connection()
+
+    def release(self, connection):
+        if len(self.idle) < self.size:
+            self.idle.append(connection)
+
+
+class AIMDLimiter:
+    """Adaptive concurrency limit with prioritised waiters."""
+
+    def __init__(self, initial=4, minimum=1, maximum=512, decrease=0.9):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.inflight = 0
+        self.waiters = []
+        self.order = itertools.count()
+        self.last_decrease = 0.0
+        self.latency = 0.0
+        self.slow_start = True
+
+    async def acquire(self, priority):
+        if self.inflight < int(self.limit) and not self.waiters:
+            self.inflight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.order), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted a slot just as the caller gave up: pass it on
+                self.abandon()
+            raise
+
+    def release(self, throttled, seconds):
+        self.inflight -= 1
+        self.latency = seconds if not self.latency else 0.9 * self.latency + 0.1 * seconds
+        now = time.monotonic()
+        if throttled:
+            # One decrease per round trip: a burst of 429s is one signal
+            self.slow_start = False
+            if now - self.last_decrease > self.latency:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self.last_decrease = now
+        else:
+            self.limit = min(self.maximum, self.limit + (1 if self.slow_start else 1 / self.limit))
+        self._wake()
+
+    def abandon(self):
+        """Give back a slot whose call was cancelled or failed: no signal either way."""
+        self.inflight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self.waiters and self.inflight < int(self.limit):
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                self.inflight += 1
+                future.set_result(None)
+
+
+class TokenBudget:
+    def __init__(self, tokens_per_minute, scale=1.0):
+        self.rate = tokens_per_minute / 60 / scale
+        self.capacity = tokens_per_minute / 6
+        self.tokens = self.capacity
+        self.refilled = time.monotonic()
+
+    async def take(self, amount):
+        if amount > self.capacity:
+            # Would wait forever: the bucket never holds that much
+            raise ValueError(f"{amount} tokens is more than the budget's burst of {self.capacity:.0f}")
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.refilled) * self.rate)
+            self.refilled = now
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class ModelClient:
+    """invoke_agent() for every agent through one pooled, rate-aware client."""
+
+    def __init__(self, backends, route=None, pool_size=POOL_SIZE, seed=0):
+        # backends: model name -> endpoint with invoke(connection, ...)
+        self.backends = backends
+        self.route = route or (lambda agent: "sonnet")
+        self.pool = ConnectionPool(pool_size)
+        self.limiters = {name: AIMDLimiter() for name in backends}
+        self.budgets = {
+            name: TokenBudget(backend.tokens_per_minute * BUDGET_SHARE, getattr(backend, "scale", 1.0))
+            for name, backend in backends.items()
+        }
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.attempts = 0
+        self.failures = 0
+
+    async def invoke_agent(self, agent, payload):
+        self.calls += 1
+        model = self.route(agent)
+        backend = self.backends[model]
+        limiter = self.limiters[model]
+        input_tokens = tokens(json.dumps(payload, default=str))
+        output_tokens = OUTPUT_TOKENS[agent]
+        for attempt in range(MAX_ATTEMPTS):
+            # Slot first, then tokens: the lanes also order who gets the budget
+            await limiter.acquire(PRIORITIES[agent])
+            connection = None
+            # "ok" or "throttled"; None if cancelled or failed otherwise
+            outcome = None
+            started = time.monotonic()
+            try:
+                await self.budgets[model].take(input_tokens + output_tokens)
+                connection = self.pool.acquire()
+                started = time.monotonic()
+                self.attempts += 1
+                reply = await backend.invoke(connection, agent, payload, input_tokens, output_tokens)
+                outcome = "ok"
+                return reply
+            except Throttled:
+                outcome = "throttled"
+            finally:
+                # A connection abandoned mid-request may still have a reply
+                # in flight; drop it rather than hand it to the next call
+                if connection is not None and outcome is not None:
+                    self.pool.release(connection)
+                if outcome is None:
+                    limiter.abandon()
+                else:
+                    limiter.release(outcome == "throttled", time.monotonic() - started)
+            # Full jitter, in the endpoint's time scale
+            delay = self.rng.uniform(0, BACKOFF_MS * 2 ** attempt)
+            await asyncio.sleep(delay * getattr(backend, "scale", 1.0) / 1000)
+        self.failures += 1
+        raise Throttled(f"{model}: gave up after {MAX_ATTEMPTS} attempts")
+
+
+class NaiveClient:
+    """The baseline: unbounded concurrency, a new connection per call, fixed retry delay."""
+
+    def __init__(self, backends, route=None):
+        self.backends = backends
+        self.route = route or (lambda agent: "sonnet")
+        self.calls = 0
+        self.attempts = 0
+        self.failures = 0
+
+    async def invoke_agent(self, agent, payload):
+        self.calls += 1
+        backend = self.backends[self.route(agent)]
+        input_tokens = tokens(json.dumps(payload, default=str))
+        for _ in range(MAX_ATTEMPTS):
+            try:
+                self.attempts += 1
+                return await backend.invoke(Connection(), agent, payload, input_tokens,
+                                            OUTPUT_TOKENS[agent])
+            except Throttled:
+                await asyncio.sleep(BACKOFF_MS * getattr(backend, "scale", 1.0) / 1000)
+        self.failures += 1
+        raise Throttled("gave up")
+
+
+def endpoints(scale=0.01, seed=0):
+    # Everything on one Claude model, as the diagrams wire it today
+    return {"sonnet": ThrottlingModel(MODELS["sonnet"], concurrency=48,
+                                      tokens_per_minute=400_000, scale=scale, seed=seed)}
+
+
+async def wave(client, checkins, escalations, spread, scale):
+    """A monitoring wave fired at once, with escalations arriving in its first spread ms."""
+    latencies = {}
+
+    async def one(agent, payload, delay=0.0):
+        await asyncio.sleep(delay)
+        started = time.monotonic()
+        try:
+            await client.invoke_agent(agent, payload)
+        except Throttled:
+            return
+        latencies.setdefault(agent, []).append((time.monotonic() - started) * 1000 / scale)
+
+    rng = random.Random(0)
+    jobs = [one("monitoring_agent", {"checkin": {"headache": rng.randint(0, 6)},
+                                     "baseline": {"severity": 3}})
+            for _ in range(checkins)]
+    jobs += [one("escalation_agent", {"trend": "worsening", "risk": "high"},
+                 delay=rng.uniform(0, spread * scale / 1000))
+             for _ in range(escalations)]
+    started = time.monotonic()
+    await asyncio.gather(*jobs)
+    return (time.monotonic() - started) / scale, latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.client",
+                                     description="Check-in wave against a throttling model stand-in.")
+    parser.add_argument("--checkins", type=int, default=3000)
+    parser.add_argument("--escalations", type=int, default=50)
+    parser.add_argument("--scale", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{args.checkins} monitoring calls fired at once, {args.escalations} escalations during the wave; "
+          f"quota {endpoints()['sonnet'].concurrency} concurrent, "
+          f"{endpoints()['sonnet'].tokens_per_minute:,} tokens/min")
+    print(f"{'client':<8} {'wave s':>7} {'attempts':>9} {'429s':>6} {'failed':>7} {'handshakes':>11} "
+          f"{'monitoring p95':>15} {'escalation p50':>15} {'escalation p95':>15}")
+    for label, make in (("naive", NaiveClient), ("pooled", ModelClient)):
+        backends = endpoints(args.scale, args.seed)
+        client = make(backends)
+        seconds, latencies = asyncio.run(wave(client, args.checkins, args.escalations, 30_000, args.scale))
+        endpoint = backends["sonnet"]
+
+        def pct(agent, q):
+            return nearest_rank(sorted(latencies.get(agent, [0.0])), q)
+
+        print(f"{label:<8} {seconds:>7.1f} {client.attempts:>9} {endpoint.throttled:>6} "
+              f"{client.failures:>7} {endpoint.handshakes:>11} {pct('monitoring_agent', 0.95):>15.0f} "
+              f"{statistics.median(latencies.get('escalation_agent', [0.0])):>15.0f} "
+              f"{pct('escalation_agent', 0.95):>15.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
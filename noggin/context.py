@@ -0,0 +1,259 @@
+# Context Manager: token-budgeted conversation context per agent.
+#
+# The monitoring agent is meant to build on previous conversations, but
+# resending the whole transcript makes every prompt (and time to first
+# token) grow with the length of the recovery. A Context keeps, per patient
+# and agent:
+#
+#   summary   a rolling summary of older turns, extended only with the
+#             turns being folded in, never rebuilt from the transcript
+#   turns     the most recent turns verbatim
+#   state     a structured patient-state header (risk, severity, trend,
+#             plan, ...) rendered the same way every time
+#
+# Prompts are laid out system prompt, summary, recent turns, state header,
+# new message. Between compactions that is append-only up to the state
+# header, so provider-side prompt caching reuses everything before it; the
+# volatile header comes last. When a prompt would exceed the agent's BUDGETS
+# the oldest turns are folded into the summary in one chunk, down to
+# COMPACT_TO of the allowance, so compaction (and the cache miss it causes)
+# is rare.
+#
+#   python -m noggin.context --patients 200 --days 14
+
+import argparse
+import math
+import random
+import statistics
+import sys
+import time
+
+SYSTEM_PROMPTS = {
+    "intake_agent": (
+        "You are Noggin's intake agent. Assess a possible mild traumatic brain injury: "
+        "Glasgow Coma Scale, SCAT5 symptoms, risk factors and history. Be calm and clear; "
+        "send anyone with red-flag symptoms to emergency care."
+    ),
+    "monitoring_agent": (
+        "You are Noggin's monitoring agent. Run the patient's check-in, compare their "
+        "symptoms with their baseline and earlier check-ins, and note persistence or "
+        "worsening. Build on what the patient told you before."
+    ),
+    "intervention_agent": (
+        "You are Noggin's intervention agent. Turn the patient's symptom trend into "
+        "NHS-aligned advice: rest, graded return to activity, screen time and headache "
+        "management."
+    ),
+    "escalation_agent": (
+        "You are Noggin's escalation agent. Decide whether the patient's trajectory needs "
+        "a clinician and summarise why."
+    ),
+}
+
+
+class Budget:
+    def __init__(self, total, summary, state=200):
+        # Prompt tokens, excluding the reply
+        self.total = total
+        self.summary = summary
+        self.state = state
+
+
+BUDGETS = {
+    "intake_agent": Budget(total=6000, summary=600),
+    "monitoring_agent": Budget(total=1500, summary=400),
+    "intervention_agent": Budget(total=3000, summary=400),
+    "escalation_agent": Budget(total=4000, summary=800),
+}
+# Share of the recent-turn allowance left after a compaction
+COMPACT_TO = 0.5
+GIST_WORDS = 14
+SUMMARY_HEADING = "Earlier conversation (summary):\n"
+# Heading and separators between the prompt's parts
+FRAMING = SUMMARY_HEADING + "\n\n" * 4 + "patient: "
+
+
+def tokens(text):
+    """Rough token count (about four characters per token for English)."""
+    return math.ceil(len(text) / 4)
+
+
+def extractive_summary(summary, turns):
+    """Extend a summary with one gist line per folded turn.
+
+    The local stand-in for asking a small model to update the summary: it
+    only ever sees the previous summary and the turns being folded in.
+    """
+    lines = [summary] if summary else []
+    for role, text, day in turns:
+        words = text.split()
+        gist = " ".join(words[:GIST_WORDS]) + (" ..." if len(words) > GIST_WORDS else "")
+        lines.append(f"- day {day} {role}: {gist}")
+    return "\n".join(lines)
+
+
+def render_state(state):
+    return "Patient state: " + "; ".join(f"{key}={state[key]}" for key in sorted(state))
+
+
+class Context:
+    def __init__(self, agent, summarize=extractive_summary, budget=None):
+        self.agent = agent
+        self.system = SYSTEM_PROMPTS[agent]
+        self.budget = budget or BUDGETS[agent]
+        self.summarize = summarize
+        self.summary = ""
+        self.turns = []
+        self.turn_tokens = 0
+        self.state = {}
+        self.compactions = 0
+
+    def update_state(self, **fields):
+        self.state.update(fields)
+
+    def add(self, role, text, day=0):
+        self.turns.append((role, text, day))
+        self.turn_tokens += tokens(f"{role}: {text}\n")
+
+    def _allowance(self, message):
+        fixed = (tokens(self.system) + self.budget.summary + self.budget.state
+                 + tokens(FRAMING) + tokens(message))
+        return self.budget.total - fixed
+
+    def compact(self, allowance):
+        """Fold the oldest turns into the summary until the rest fit in COMPACT_TO of allowance."""
+        target = allowance * COMPACT_TO
+        folded = []
+        while self.turns and self.turn_tokens > target:
+            role, text, day = self.turns.pop(0)
+            self.turn_tokens -= tokens(f"{role}: {text}\n")
+            folded.append((role, text, day))
+        if not folded:
+            return
+        self.compactions += 1
+        summary = self.summarize(self.summary, folded)
+        # Over budget: the oldest summary lines go first
+        lines = summary.split("\n")
+        while len(lines) > 1 and tokens("\n".join(lines)) > self.budget.summary:
+            lines.pop(0)
+        self.summary = "\n".join(lines)
+
+    def prompt(self, message):
+        """The prompt for a new patient message; returns (text, cacheable_prefix_length)."""
+        allowance = self._allowance(message)
+        if self.turn_tokens > allowance:
+            self.compact(allowance)
+        parts = [self.system]
+        if self.summary:
+            parts.append(SUMMARY_HEADING + self.summary)
+        if self.turns:
+            parts.append("\n".join(f"{role}: {text}" for role, text, _ in self.turns))
+        prefix = "\n\n".join(parts) + "\n\n"
+        return prefix + render_state(self.state) + f"\n\npatient: {message}", len(prefix)
+
+
+def full_transcript_prompt(agent, state, transcript, message):
+    # What the Context Manager did before: everything, every turn
+    return (SYSTEM_PROMPTS[agent] + "\n\n" + render_state(state) + "\n\n"
+            + "\n".join(f"{role}: {text}" for role, text, _ in transcript)
+            + f"\n\npatient: {message}")
+
+
+# Rough time to first token: fixed overhead plus prefill per prompt token,
+# roughly ten times cheaper for tokens served from the prompt cache
+BASE_TTFT_MS = 300
+PREFILL_MS_PER_TOKEN = 0.25
+CACHED_MS_PER_TOKEN = 0.025
+
+
+def ttft_ms(prompt, previous):
+    """Modelled TTFT given the previous prompt of the same conversation."""
+    # Longest common prefix by binary search; slices compare in C
+    low, high = 0, min(len(prompt), len(previous)) if previous else 0
+    while low < high:
+        middle = (low + high + 1) // 2
+        if prompt[:middle] == previous[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    cached = tokens(prompt[:low])
+    return BASE_TTFT_MS + CACHED_MS_PER_TOKEN * cached + PREFILL_MS_PER_TOKEN * (tokens(prompt) - cached)
+
+
+PATIENT_LINES = (
+    "headache is about {n} out of 10 today, worse in the afternoon",
+    "slept badly again, woke up a few times",
+    "the light in lectures is still bothering me a bit",
+    "dizziness only when I stand up quickly",
+    "I tried a short walk and felt okay afterwards",
+    "screen time was maybe {n} hours, I know that's a lot",
+    "feeling a bit foggy in the mornings but it clears",
+    "no vomiting, nausea is mostly gone",
+)
+AGENT_LINES = (
+    "Thanks, that's helpful. How does that compare with yesterday?",
+    "Let's keep screens under two hours and take breaks every twenty minutes.",
+    "That sounds like steady progress. Any new symptoms since we last spoke?",
+    "On a scale of 0 to 10, how is your concentration today?",
+)
+
+
+def simulate(patients=200, days=10, turns_per_day=8, seed=0):
+    """Sam's scenario for a cohort: a daily monitoring conversation per patient.
+
+    Returns per-day means of prompt tokens and modelled TTFT for the
+    compacted context and for resending the full transcript.
+    """
+    rng = random.Random(seed)
+    per_day = {day: {"compact": [], "full": [], "compact_ms": [], "full_ms": [], "build_us": []}
+               for day in range(1, days + 1)}
+    for _ in range(patients):
+        context = Context("monitoring_agent")
+        transcript = []
+        previous_compact = previous_full = None
+        for day in range(1, days + 1):
+            context.update_state(day=day, severity=rng.randint(5, 60), trend=rng.choice(
+                ("improving", "persisting", "worsening")), risk="moderate",
+                plan="relative rest, graded return")
+            for _ in range(turns_per_day):
+                message = rng.choice(PATIENT_LINES).format(n=rng.randint(1, 6))
+                started = time.perf_counter()
+                prompt, _ = context.prompt(message)
+                per_day[day]["build_us"].append((time.perf_counter() - started) * 1e6)
+                full = full_transcript_prompt("monitoring_agent", context.state, transcript, message)
+                per_day[day]["compact"].append(tokens(prompt))
+                per_day[day]["full"].append(tokens(full))
+                per_day[day]["compact_ms"].append(ttft_ms(prompt, previous_compact))
+                per_day[day]["full_ms"].append(ttft_ms(full, previous_full))
+                previous_compact, previous_full = prompt, full
+                reply = rng.choice(AGENT_LINES)
+                for entry in (("patient", message, day), ("agent", reply, day)):
+                    context.add(*entry)
+                    transcript.append(entry)
+    return {day: {name: statistics.mean(values) for name, values in stats.items()}
+            for day, stats in per_day.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.context",
+                                     description="Compare compacted context with full-transcript prompts.")
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--turns-per-day", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = simulate(args.patients, args.days, args.turns_per_day, args.seed)
+    budget = BUDGETS["monitoring_agent"].total
+    print(f"monitoring_agent, {args.patients} patients x {args.turns_per_day} turns/day, "
+          f"budget {budget} tokens")
+    print(f"{'day':>4} {'full tokens':>12} {'compact tokens':>15} {'full TTFT ms':>13} "
+          f"{'compact TTFT ms':>16} {'build us':>9}")
+    for day, stats in report.items():
+        print(f"{day:>4} {stats['full']:>12.0f} {stats['compact']:>15.0f} {stats['full_ms']:>13.0f} "
+              f"{stats['compact_ms']:>16.0f} {stats['build_us']:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
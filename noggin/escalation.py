@@ -0,0 +1,193 @@
+# Scheduled escalation sweep over every active patient (step 11).
+#
+# Evaluates the established escalation thresholds for the whole cohort in
+# one vectorised pass over the SymptomStore arrays, instead of sending each
+# patient's longitudinal data to the model on every monitoring tick:
+#
+#   red flag      a red-flag symptom at or above RED_FLAG_RATING on the
+#                 latest check-in (vomiting, confusion, drowsiness)
+#   persistent    headache and dizziness both present for PERSISTENT_DAYS
+#                 consecutive check-ins
+#   worsening     total severity rising by more than WORSENING_SLOPE per day
+#
+# A red flag, or persistence together with worsening, escalates outright.
+# Patients that meet one criterion, or come within BORDERLINE_MARGIN of
+# one, are borderline and are the only ones forwarded to escalation_agent.
+#
+#   python -m noggin.escalation --patients 200000 --days 10
+
+import argparse
+import asyncio
+import sys
+import time
+
+import numpy as np
+
+from .scoring import severity_band
+from .symptoms import INDEX, SymptomStore
+
+PERSISTENT_DAYS = 5
+PERSISTENT_SYMPTOMS = ("headache", "dizziness")
+WORSENING_SLOPE = 1.0
+RED_FLAGS = ("nausea_or_vomiting", "confusion", "drowsiness")
+RED_FLAG_RATING = 5
+# Minimum check-ins before a slope means anything
+MIN_CHECKINS = 3
+SLOPE_DECIMALS = 9
+# Fraction of a threshold at which a patient counts as borderline
+BORDERLINE_MARGIN = 0.8
+
+CLEAR, BORDERLINE, ESCALATE = 0, 1, 2
+DECISIONS = ("clear", "borderline", "escalate")
+# Reason bits
+RED_FLAG, PERSISTENT, WORSENING = 1, 2, 4
+
+
+def sweep(store):
+    """Evaluate every tracked patient; returns arrays indexed by store row.
+
+    decision holds CLEAR/BORDERLINE/ESCALATE, reasons a bitmask of
+    RED_FLAG/PERSISTENT/WORSENING, slope the total severity slope and
+    severity the latest check-in's total.
+    """
+    used = len(store.rows)
+    count = store.count[:used]
+    latest = store.history[np.arange(used), (count - 1) % store.window]
+
+    flags = latest[:, [INDEX[name] for name in RED_FLAGS]].max(axis=1)
+    streak = store.streak[:used][:, [INDEX[name] for name in PERSISTENT_SYMPTOMS]].min(axis=1)
+
+    # Total severity slope: the slope of a sum is the sum of the slopes
+    n = count.astype(np.float64)
+    sx, sxx = store.xsums[:used, 0], store.xsums[:used, 1]
+    sy = store.stats[:used, SymptomStore.SY].sum(axis=1)
+    sxy = store.stats[:used, SymptomStore.SXY].sum(axis=1)
+    denominator = n * sxx - sx * sx
+    slope = np.divide(n * sxy - sx * sy, denominator,
+                      out=np.zeros(used), where=(denominator > 0) & (count >= MIN_CHECKINS))
+    # Ratings are integers, so slopes often land exactly on a threshold;
+    # round away float noise so ties decide the same way every time
+    slope = slope.round(SLOPE_DECIMALS)
+
+    red_flag = flags >= RED_FLAG_RATING
+    persistent = streak >= PERSISTENT_DAYS
+    worsening = slope > WORSENING_SLOPE
+    reasons = (red_flag * RED_FLAG) | (persistent * PERSISTENT) | (worsening * WORSENING)
+
+    near = ((flags >= BORDERLINE_MARGIN * RED_FLAG_RATING)
+            | (streak >= BORDERLINE_MARGIN * PERSISTENT_DAYS)
+            | (slope > BORDERLINE_MARGIN * WORSENING_SLOPE))
+    decision = np.where(near | (reasons > 0), BORDERLINE, CLEAR).astype(np.int8)
+    decision[red_flag | (persistent & worsening)] = ESCALATE
+    return {"decision": decision, "reasons": reasons.astype(np.int8), "slope": slope,
+            "severity": latest.sum(axis=1, dtype=np.int32)}
+
+
+def patients(store, result, decision):
+    """Patient ids with the given decision."""
+    ids = list(store.rows)
+    return [ids[row] for row in np.flatnonzero(result["decision"] == decision)]
+
+
+async def forward_borderline(store, result, bedrock, concurrency=16):
+    """Ask escalation_agent about the borderline patients only.
+
+    Returns {patient_id: escalate?} for the forwarded patients.
+    """
+    limit = asyncio.Semaphore(concurrency)
+    rows = np.flatnonzero(result["decision"] == BORDERLINE)
+    ids = list(store.rows)
+
+    async def ask(row):
+        slope = result["slope"][row]
+        async with limit:
+            reply = await bedrock.invoke_agent("escalation_agent", {
+                # Same cut as the WORSENING criterion, so the agent isn't told
+                # a patient is worsening that the sweep found isn't
+                "trend": ("worsening" if slope > WORSENING_SLOPE
+                          else "improving" if slope < 0 else "persisting"),
+                "risk": severity_band(int(result["severity"][row])),
+                "reasons": int(result["reasons"][row]),
+                "recent": store.recent(ids[row])[1].tolist(),
+            })
+        return ids[row], reply["escalate"]
+
+    return dict(await asyncio.gather(*(ask(row) for row in rows)))
+
+
+def _reference(store):
+    # Per-patient loop over the same thresholds, for the benchmark
+    decisions = []
+    for patient_id, row in store.rows.items():
+        count = int(store.count[row])
+        latest = store.history[row, (count - 1) % store.window]
+        flags = max(int(latest[INDEX[name]]) for name in RED_FLAGS)
+        streak = min(int(store.streak[row, INDEX[name]]) for name in PERSISTENT_SYMPTOMS)
+        slope = float(store.slopes(patient_id).sum()) if count >= MIN_CHECKINS else 0.0
+        slope = round(slope, SLOPE_DECIMALS)
+        red_flag = flags >= RED_FLAG_RATING
+        persistent = streak >= PERSISTENT_DAYS
+        worsening = slope > WORSENING_SLOPE
+        if red_flag or (persistent and worsening):
+            decisions.append(ESCALATE)
+        elif (red_flag or persistent or worsening
+              or flags >= BORDERLINE_MARGIN * RED_FLAG_RATING
+              or streak >= BORDERLINE_MARGIN * PERSISTENT_DAYS
+              or slope > BORDERLINE_MARGIN * WORSENING_SLOPE):
+            decisions.append(BORDERLINE)
+        else:
+            decisions.append(CLEAR)
+    return np.array(decisions, np.int8)
+
+
+def synthetic_store(size, days, seed=0):
+    """A store of size patients with days of check-ins: mostly recovering."""
+    rng = np.random.default_rng(seed)
+    store = SymptomStore(capacity=size)
+    ids = [f"p{i:07d}" for i in range(size)]
+    baseline = np.minimum(rng.random((size, len(INDEX))) * 7 * rng.random((size, 1)), 6)
+    # Per-patient daily trend in rating points; a few patients get worse
+    trend = rng.normal(-0.25, 0.2, (size, 1))
+    store.admit_many(ids, baseline.astype(np.uint8))
+    for day in range(1, days + 1):
+        noise = rng.normal(0, 0.5, baseline.shape)
+        vectors = np.clip(np.rint(baseline + trend * day + noise), 0, 6).astype(np.uint8)
+        store.checkin_many(ids, day, vectors)
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.escalation",
+                                     description="Benchmark the vectorised escalation sweep.")
+    parser.add_argument("--patients", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--reference", type=int, default=20_000,
+                        help="patients to evaluate one at a time for comparison")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    store = synthetic_store(args.patients, args.days, args.seed)
+    started = time.perf_counter()
+    result = sweep(store)
+    seconds = time.perf_counter() - started
+
+    small = synthetic_store(min(args.reference, args.patients), args.days, args.seed)
+    started = time.perf_counter()
+    reference = _reference(small)
+    reference_seconds = time.perf_counter() - started
+    if not np.array_equal(reference, sweep(small)["decision"]):
+        print("sweep and per-patient reference disagree", file=sys.stderr)
+        return 1
+
+    counts = np.bincount(result["decision"], minlength=len(DECISIONS))
+    print(f"sweep:     {args.patients} patients in {seconds * 1000:.1f} ms "
+          f"({args.patients / seconds:,.0f} patients/s)")
+    print(f"reference: {len(small.rows)} patients in {reference_seconds * 1000:.1f} ms "
+          f"({len(small.rows) / reference_seconds:,.0f} patients/s)")
+    print("decisions: " + ", ".join(f"{name} {count}" for name, count in zip(DECISIONS, counts)))
+    print(f"escalation_agent calls: {counts[BORDERLINE]} (was {args.patients} per tick)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
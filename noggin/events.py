@@ -0,0 +1,357 @@
+# In-process EventBridge: pattern rules, batched delivery, retries.
+#
+# event_bridge carries the Intake -> Monitoring handoff (step 7) and the
+# fan-out after it. EventBus reproduces the parts of EventBridge that shape
+# how that fan-out behaves under load:
+#
+#   rules         EventBridge event patterns (exact values, prefix,
+#                 anything-but, numeric, exists) matched against the
+#                 envelope {"id", "source", "detail-type", "time", "detail"}
+#   targets       async callables taking a list of events; each rule has a
+#                 bounded queue and one worker that delivers batches of up
+#                 to batch_size events or max_wait seconds, with at most
+#                 concurrency batches in flight
+#   backpressure  publishers wait when a rule's queue is full
+#   retries       a failing batch is retried with jittered exponential
+#                 backoff, then split in half and each half retried, so
+#                 only the events that fail on their own are dead-lettered;
+#                 delivery is at-least-once
+#   idempotency   an entry's "id" is its idempotency key: a repeat put of
+#                 an id seen in the last DEDUPE_WINDOW events is dropped
+#
+# subscribe()/put_event() keep the single-handler surface the pipeline
+# uses, and put_event still returns awaitables for the handlers' results.
+#
+#   python -m noggin.events --events 200000
+
+import argparse
+import asyncio
+import itertools
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import OrderedDict
+
+QUEUE_SIZE = 10_000
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 0.01
+DEDUPE_WINDOW = 100_000
+# Concurrent invocations for subscribe() handlers, like a Lambda target
+LAMBDA_CONCURRENCY = 1000
+
+
+def compile_pattern(pattern):
+    """An EventBridge event pattern as a predicate over event dicts."""
+    tests = []
+    for key, expected in pattern.items():
+        if isinstance(expected, dict):
+            nested = compile_pattern(expected)
+            tests.append(lambda event, key=key, nested=nested:
+                         isinstance(event.get(key), dict) and nested(event[key]))
+        else:
+            tests.append(_field_test(key, [_matcher(m) for m in expected]))
+    return lambda event: all(test(event) for test in tests)
+
+
+def _field_test(key, matchers):
+    def test(event):
+        present = key in event
+        value = event.get(key)
+        values = value if isinstance(value, list) else [value]
+        return any(match(present, v) for match in matchers for v in values)
+    return test
+
+
+def _matcher(spec):
+    if not isinstance(spec, dict):
+        return lambda present, value: present and value == spec
+    (operator, argument), = spec.items()
+    if operator == "prefix":
+        return lambda present, value: isinstance(value, str) and value.startswith(argument)
+    if operator == "anything-but":
+        excluded = argument if isinstance(argument, list) else [argument]
+        return lambda present, value: present and value not in excluded
+    if operator == "exists":
+        return lambda present, value: present == argument
+    if operator == "numeric":
+        checks = list(zip(argument[::2], argument[1::2]))
+        return lambda present, value: (isinstance(value, (int, float))
+                                       and all(_COMPARE[op](value, bound) for op, bound in checks))
+    raise ValueError(f"unsupported pattern operator {operator!r}")
+
+
+_COMPARE = {
+    "=": lambda a, b: a == b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+class Rule:
+    def __init__(self, name, pattern, target, batch_size=1, max_wait=0.0, concurrency=1,
+                 max_attempts=MAX_ATTEMPTS, queue_size=QUEUE_SIZE):
+        self.name = name
+        self.pattern = pattern
+        self.matches = compile_pattern(pattern)
+        self.target = target
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_attempts = max_attempts
+        self.concurrency = concurrency
+        self.slots = asyncio.Semaphore(concurrency)
+        self.queue = asyncio.Queue(queue_size)
+        self.worker = None
+        self.delivered = 0
+        self.retries = 0
+        self.batches = 0
+
+
+class EventBus:
+    """Event bus with EventBridge-style rules and one delivery worker per rule."""
+
+    def __init__(self, latency=None, seed=0):
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.rules = {}
+        # Rules indexed by the exact detail-types they match; the rest are
+        # checked against every event
+        self.by_type = {}
+        self.wildcard = []
+        # Generated event ids: unique per bus, cheaper than a uuid4 per event
+        self.instance = uuid.uuid4().hex[:12]
+        self.counter = itertools.count()
+        self.seen = OrderedDict()
+        self.duplicates = 0
+        self.dead_letters = []
+
+    def put_rule(self, name, pattern, target, **options):
+        if name in self.rules:
+            raise ValueError(f"rule {name!r} already exists")
+        rule = self.rules[name] = Rule(name, pattern, target, **options)
+        types = pattern.get("detail-type")
+        if types and all(isinstance(t, str) for t in types):
+            for detail_type in types:
+                self.by_type.setdefault(detail_type, []).append(rule)
+        else:
+            self.wildcard.append(rule)
+        return rule
+
+    def subscribe(self, detail_type, handler, concurrency=LAMBDA_CONCURRENCY):
+        """Deliver each event's detail to handler(detail), one event per call."""
+        async def target(events):
+            return [await handler(event["detail"]) for event in events]
+
+        name = f"{detail_type}-{getattr(handler, '__name__', 'handler')}-{len(self.rules)}"
+        return self.put_rule(name, {"detail-type": [detail_type]}, target, concurrency=concurrency)
+
+    async def put_event(self, detail_type, detail, source="noggin"):
+        """Publish one event; returns a future per matched rule with its result."""
+        entry = {"source": source, "detail-type": detail_type, "detail": detail}
+        futures = []
+        await self.put_events([entry], futures)
+        return futures
+
+    async def put_events(self, entries, futures=None):
+        """Publish entries; returns how many were accepted (not duplicates).
+
+        If futures is a list, a future per (entry, matched rule) is appended
+        to it and resolves to the target's result for that event.
+        """
+        if self.latency:
+            await self.latency.wait("eventbridge")
+        accepted = 0
+        loop = asyncio.get_running_loop()
+        for entry in entries:
+            event_id = entry.get("id") or f"{self.instance}-{next(self.counter)}"
+            if event_id in self.seen:
+                self.duplicates += 1
+                continue
+            self.seen[event_id] = None
+            if len(self.seen) > DEDUPE_WINDOW:
+                self.seen.popitem(last=False)
+            event = {"time": time.time(), **entry, "id": event_id}
+            accepted += 1
+            for rule in self.by_type.get(event.get("detail-type"), []) + self.wildcard:
+                if not rule.matches(event):
+                    continue
+                future = loop.create_future() if futures is not None else None
+                if future is not None:
+                    futures.append(future)
+                if rule.worker is None:
+                    rule.worker = asyncio.ensure_future(self._deliver(rule))
+                # Waits while the rule's queue is full
+                await rule.queue.put((event, future))
+        return accepted
+
+    async def _deliver(self, rule):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await rule.queue.get()]
+            deadline = loop.time() + rule.max_wait
+            while len(items) < rule.batch_size:
+                try:
+                    items.append(rule.queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(rule.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            if rule.concurrency == 1:
+                await self._attempt(rule, items)
+                self._done(rule, len(items))
+                continue
+            await rule.slots.acquire()
+            task = asyncio.ensure_future(self._attempt(rule, items))
+            task.add_done_callback(lambda _, count=len(items): self._done(rule, count))
+
+    @staticmethod
+    def _done(rule, count):
+        if rule.concurrency != 1:
+            rule.slots.release()
+        for _ in range(count):
+            rule.queue.task_done()
+
+    async def _attempt(self, rule, items):
+        events = [event for event, _ in items]
+        for attempt in range(rule.max_attempts):
+            try:
+                results = await rule.target(events)
+            except Exception as error:
+                if attempt + 1 == rule.max_attempts:
+                    if len(items) > 1:
+                        # Bisect: one poison event shouldn't take its batch
+                        # mates to the dead-letter queue with it
+                        half = len(items) // 2
+                        await self._attempt(rule, items[:half])
+                        await self._attempt(rule, items[half:])
+                        return
+                    self.dead_letters.append({"rule": rule.name, "events": events, "error": repr(error)})
+                    for _, future in items:
+                        if future is not None and not future.done():
+                            future.set_exception(error)
+                    return
+                rule.retries += 1
+                # Full jitter so retrying rules don't synchronise
+                await asyncio.sleep(self.rng.uniform(0, RETRY_DELAY * 2 ** attempt))
+                continue
+            rule.batches += 1
+            rule.delivered += len(items)
+            for i, (_, future) in enumerate(items):
+                if future is not None and not future.done():
+                    future.set_result(results[i] if results is not None else None)
+            return
+
+    async def drain(self):
+        """Wait until every queued event has been delivered or dead-lettered."""
+        for rule in self.rules.values():
+            await rule.queue.join()
+
+    def close(self):
+        for rule in self.rules.values():
+            if rule.worker is not None:
+                rule.worker.cancel()
+                rule.worker = None
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def benchmark(events=200_000, batch_size=1, max_wait=0.0, failure_rate=0.0,
+                    duplicate_rate=0.0, rate=None, seed=0):
+    """One rule, one worker, a no-op target; events/s and put-to-delivery latency.
+
+    Without a rate the publisher runs flat out, so latency is mostly time
+    spent queued behind the backlog; with one it offers rate events/s.
+    """
+    rng = random.Random(seed)
+    bus = EventBus(seed=seed)
+    latencies = []
+    poison = set()
+
+    async def target(batch):
+        if any(event["id"] in poison for event in batch) or rng.random() < failure_rate:
+            raise RuntimeError("target unavailable")
+        now = time.perf_counter()
+        latencies.extend(now - event["detail"]["sent"] for event in batch)
+
+    bus.put_rule("checkins", {"source": ["noggin"], "detail-type": ["checkin-recorded"],
+                              "detail": {"severity": [{"numeric": [">=", 0]}]}},
+                 target, batch_size=batch_size, max_wait=max_wait)
+    # Never matched, so the benchmark also pays for rule evaluation
+    bus.put_rule("anomalies", {"detail-type": [{"prefix": "symptom-"}]}, target)
+
+    started = time.perf_counter()
+    for i in range(events):
+        if rate and i % 100 == 0:
+            ahead = started + i / rate - time.perf_counter()
+            await asyncio.sleep(max(ahead, 0))
+        event_id = f"e{i}"
+        if duplicate_rate and rng.random() < duplicate_rate and i:
+            event_id = f"e{i - 1}"
+        elif failure_rate and rng.random() < failure_rate / 10:
+            poison.add(event_id)
+        await bus.put_events([{
+            "id": event_id,
+            "source": "noggin",
+            "detail-type": "checkin-recorded",
+            "detail": {"patient_id": f"p{i % 1000:07d}", "severity": i % 60,
+                       "sent": time.perf_counter()},
+        }])
+    await bus.drain()
+    seconds = time.perf_counter() - started
+    bus.close()
+    rule = bus.rules["checkins"]
+    return {
+        "events": events,
+        "seconds": seconds,
+        "delivered": rule.delivered,
+        "batches": rule.batches,
+        "retries": rule.retries,
+        "dead_lettered": sum(len(d["events"]) for d in bus.dead_letters),
+        "duplicates": bus.duplicates,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": _percentile(latencies, 0.99) * 1000 if latencies else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.events",
+                                     description="Benchmark single-worker event delivery.")
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--batch-sizes", default="1,10,100")
+    parser.add_argument("--failure-rate", type=float, default=0.01,
+                        help="share of target calls that fail in the retry run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'batch':>6} {'events/s':>10} {'p50 ms':>8} {'p99 ms':>8}   at half load: {'p50 ms':>8} {'p99 ms':>8}")
+    for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+        max_wait = 0.005 if batch_size > 1 else 0.0
+        report = asyncio.run(benchmark(args.events, batch_size, max_wait, seed=args.seed))
+        throughput = report["events"] / report["seconds"]
+        paced = asyncio.run(benchmark(args.events // 4, batch_size, max_wait,
+                                      rate=throughput / 2, seed=args.seed))
+        print(f"{batch_size:>6} {throughput:>10,.0f} {report['p50_ms']:>8.2f} {report['p99_ms']:>8.2f}"
+              f"   {'':>13} {paced['p50_ms']:>8.2f} {paced['p99_ms']:>8.2f}")
+
+    report = asyncio.run(benchmark(args.events, 10, 0.005, args.failure_rate, 0.02, seed=args.seed))
+    print(f"with {args.failure_rate:.0%} failing deliveries and 2% duplicate puts (batch 10): "
+          f"{report['events'] / report['seconds']:,.0f} events/s, {report['delivered']} delivered, "
+          f"{report['retries']} retries, {report['dead_lettered']} dead-lettered, "
+          f"{report['duplicates']} duplicates dropped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
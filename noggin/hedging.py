@@ -0,0 +1,273 @@
+# Hedged model calls for the patient-facing replies (steps 4 and 10).
+#
+# The intake reply (step 4) and the intervention advice delivered at step 10
+# sit on the critical path of a WhatsApp or voice conversation, and the
+# slowest few percent of model calls (a stalled replica, a cold container, a
+# noisy neighbour) are what the patient notices. HedgedBedrock wraps the
+# agent -> model client:
+#
+#   1. the call goes to the primary client as usual
+#   2. if it hasn't answered after the route's observed HEDGE_QUANTILE
+#      latency (or it failed), the same call goes to the secondary client
+#      (another region, or another model)
+#   3. the first good answer wins and the other call is cancelled
+#
+# Hedges are paid for out of a HedgeBudget per agent: each call earns
+# HEDGE_RATIO of a hedge and the bucket starts empty, so an agent's
+# duplicate calls never exceed that share of its traffic however slow the
+# primary gets. Agents outside HEDGED_AGENTS are passed straight through.
+#
+#   python -m noggin.hedging --requests 4000
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+from collections import deque
+
+from .router import MODELS, ModelStandIn, ROUTES, Router, nearest_rank
+
+HEDGED_AGENTS = {"intake_agent", "intervention_agent"}
+HEDGE_QUANTILE = 0.95
+# Extra calls allowed, as a share of hedged-agent calls, and the burst
+HEDGE_RATIO = 0.05
+HEDGE_BURST = 10
+# Latency samples kept per agent, and needed before hedging starts
+WINDOW = 1000
+MIN_SAMPLES = 50
+# New samples before the hedge delay is recomputed from the window
+REFRESH = 50
+# Stand-in tail: share of calls that stall, and for how long (ms)
+STALL_RATE = 0.03
+STALL_MS = (4000, 16000)
+
+
+class HedgeBudget:
+    """Token bucket of hedges: each call earns ratio of one, up to burst.
+
+    It starts empty: a full bucket would let the first burst of hedges
+    through on top of the ratio.
+    """
+
+    def __init__(self, ratio=HEDGE_RATIO, burst=HEDGE_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self.credit = 0.0
+
+    def earn(self):
+        self.credit = min(self.burst, self.credit + self.ratio)
+
+    def spend(self):
+        if self.credit < 1:
+            return False
+        self.credit -= 1
+        return True
+
+
+class HedgeStats:
+    def __init__(self):
+        self.calls = 0
+        self.hedged = 0
+        self.denied = 0
+        self.secondary_wins = 0
+        self.cancelled = 0
+
+
+class HedgedBedrock:
+    """A Bedrock client whose patient-facing invoke_agent calls are hedged."""
+
+    def __init__(self, primary, secondary, agents=HEDGED_AGENTS, quantile=HEDGE_QUANTILE,
+                 ratio=HEDGE_RATIO, window=WINDOW, min_samples=MIN_SAMPLES, refresh=REFRESH):
+        self.primary = primary
+        self.secondary = secondary
+        self.agents = agents
+        self.quantile = quantile
+        self.ratio = ratio
+        # agent -> HedgeBudget; one shared bucket would let one agent spend
+        # what another earned
+        self.budgets = {}
+        self.window = window
+        self.min_samples = min_samples
+        self.refresh = refresh
+        # agent -> recent primary latencies, seconds
+        self.observed = {}
+        # agent -> [delay, samples recorded since it was computed]
+        self.thresholds = {}
+        self.stats = {}
+
+    @property
+    def calls(self):
+        return self.primary.calls + self.secondary.calls
+
+    def delay(self, agent):
+        """Seconds to wait for the primary before hedging, or None while warming up."""
+        samples = self.observed.get(agent)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        threshold = self.thresholds.setdefault(agent, [None, 0])
+        if threshold[0] is None or threshold[1] >= self.refresh:
+            threshold[:] = [nearest_rank(sorted(samples), self.quantile), 0]
+        return threshold[0]
+
+    def _observe(self, agent, seconds):
+        self.observed[agent].append(seconds)
+        if agent in self.thresholds:
+            self.thresholds[agent][1] += 1
+
+    async def invoke_agent(self, agent, payload):
+        if agent not in self.agents:
+            return await self.primary.invoke_agent(agent, payload)
+        stats = self.stats.setdefault(agent, HedgeStats())
+        stats.calls += 1
+        budget = self.budgets.setdefault(agent, HedgeBudget(self.ratio))
+        budget.earn()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.observed.setdefault(agent, deque(maxlen=self.window))
+
+        def record(task):
+            # A primary cancelled because the hedge won took at least this
+            # long, so it counts as a lower bound; dropping it would leave
+            # only the calls that beat the delay. A failed primary's time
+            # says nothing about how long an answer takes.
+            if task.cancelled() or task.exception() is None:
+                self._observe(agent, loop.time() - started)
+
+        primary = asyncio.ensure_future(self.primary.invoke_agent(agent, payload))
+        primary.add_done_callback(record)
+        tasks = [primary]
+        try:
+            await asyncio.wait(tasks, timeout=self.delay(agent))
+            if not primary.done() or primary.exception() is not None:
+                if budget.spend():
+                    stats.hedged += 1
+                    tasks.append(asyncio.ensure_future(self.secondary.invoke_agent(agent, payload)))
+                else:
+                    stats.denied += 1
+            while True:
+                for task in tasks:
+                    if task.done() and task.exception() is None:
+                        if task is not primary:
+                            stats.secondary_wins += 1
+                        return task.result()
+                pending = [task for task in tasks if not task.done()]
+                if not pending:
+                    raise primary.exception()
+                await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    stats.cancelled += 1
+
+    def report(self):
+        return {
+            agent: {
+                "calls": stats.calls,
+                "hedged": stats.hedged,
+                "denied": stats.denied,
+                "secondary_wins": stats.secondary_wins,
+                "cancelled": stats.cancelled,
+                "extra_calls": stats.hedged / stats.calls if stats.calls else 0.0,
+            }
+            for agent, stats in sorted(self.stats.items())
+        }
+
+
+class StallingStandIn(ModelStandIn):
+    """A model endpoint where a few calls stall before being served."""
+
+    def __init__(self, model, scale=1.0, seed=0, stall_rate=STALL_RATE):
+        super().__init__(model, scale, seed)
+        self.stall_rate = stall_rate
+        self.stalls = random.Random(f"{seed}:{model.name}:stall")
+
+    async def invoke(self, agent, payload, output_tokens):
+        if self.stalls.random() < self.stall_rate:
+            await asyncio.sleep(self.stalls.uniform(*STALL_MS) * self.scale / 1000)
+        return await super().invoke(agent, payload, output_tokens)
+
+
+def region(scale, seed, stall_rate=STALL_RATE):
+    """A static-routed client on one region's model endpoints."""
+    backends = {name: StallingStandIn(model, scale, seed, stall_rate) for name, model in MODELS.items()}
+    return Router(backends, adaptive=False)
+
+
+def conversations(requests, seed=0):
+    rng = random.Random(seed)
+    for _ in range(requests):
+        if rng.random() < 0.5:
+            yield "intake_agent", {"message": "I took a knock to the head at rugby practice",
+                                   "scores": {"risk": "moderate"}}
+        else:
+            yield "intervention_agent", {"severity": rng.randint(0, 60), "risk": "moderate",
+                                         "trend": rng.choice(("improving", "persisting", "worsening"))}
+
+
+async def replay(client, requests, rate, scale, seed=0):
+    """Poisson arrivals at rate per (model) second; latencies per agent in model ms."""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed)
+    latencies = {}
+
+    async def one(agent, payload):
+        started = loop.time()
+        await client.invoke_agent(agent, payload)
+        latencies.setdefault(agent, []).append((loop.time() - started) * 1000 / scale)
+
+    tasks = []
+    for agent, payload in conversations(requests, seed):
+        await asyncio.sleep(rng.expovariate(rate) * scale)
+        tasks.append(asyncio.ensure_future(one(agent, payload)))
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+def _quantile(values, q):
+    return nearest_rank(sorted(values), q)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.hedging",
+                                     description="Tail latency of patient-facing model calls, with and without hedging.")
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--rate", type=float, default=2.0, help="requests per second")
+    parser.add_argument("--ratio", type=float, default=HEDGE_RATIO, help="hedge budget, share of calls")
+    parser.add_argument("--scale", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    policies = [("no hedging", None)] + [(f"hedge at p{round(q * 100)}", q) for q in (0.95, 0.9)]
+    rows = []
+    for label, quantile in policies:
+        primary = region(args.scale, args.seed)
+        if quantile is None:
+            client = primary
+        else:
+            client = HedgedBedrock(primary, region(args.scale, args.seed + 1), quantile=quantile,
+                                   ratio=args.ratio)
+        latencies = asyncio.run(replay(client, args.requests, args.rate, args.scale, args.seed))
+        rows.append((label, client, latencies))
+
+    print(f"{args.requests} patient-facing calls at {args.rate}/s, {STALL_RATE:.0%} of calls stall "
+          f"{STALL_MS[0] / 1000:.0f}-{STALL_MS[1] / 1000:.0f} s; hedge budget {args.ratio:.0%}")
+    baseline = {agent: _quantile(values, 0.99) for agent, values in rows[0][2].items()}
+    for agent in sorted(HEDGED_AGENTS):
+        print(f"\n{agent} ({ROUTES[agent]})")
+        print(f"{'':<14} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'p99.9 ms':>9} {'p99 vs off':>11} "
+              f"{'hedged':>7} {'won':>5} {'denied':>7} {'extra calls':>12}")
+        for label, client, latencies in rows:
+            values = latencies[agent]
+            p99 = _quantile(values, 0.99)
+            hedges = client.report()[agent] if isinstance(client, HedgedBedrock) else None
+            print(f"{label:<14} {statistics.median(values):>8.0f} {_quantile(values, 0.95):>8.0f} "
+                  f"{p99:>8.0f} {_quantile(values, 0.999):>9.0f} {p99 / baseline[agent] - 1:>+11.0%} "
+                  + (f"{hedges['hedged']:>7} {hedges['secondary_wins']:>5} {hedges['denied']:>7} "
+                     f"{hedges['extra_calls']:>12.1%}" if hedges else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
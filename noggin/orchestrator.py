@@ -0,0 +1,309 @@
+# Orchestrator Service: each interaction as a DAG of agent and service calls.
+#
+# The numbered flow reads as a chain, but many of its hops only depend on
+# one earlier result: the intake reply doesn't wait for the assessment write
+# (6), escalation (11) only needs the monitoring status, and Polly (10a), the
+# mobile update (10c) and the transcript write are independent of each
+# other. execute() runs a list of Nodes, starting each one as soon as the
+# nodes it comes after have finished:
+#
+#   timeout    per node, in seconds; a required node that runs past it (or
+#              raises) fails the run and cancels what is still running,
+#              an optional one is recorded and its dependents skipped.
+#              Time spent inside queued() (waiting for a shared concurrency
+#              slot, e.g. the Bedrock quota) doesn't count
+#   when       a predicate on the results so far; when false the node and
+#              everything after it is skipped (e.g. 12-15 without escalation);
+#              a predicate that raises fails the node like its run would
+#
+# Every run keeps a span per node, and Run.critical_path() walks back from
+# the last node to finish through whichever dependency finished last, so
+# each run says which hops bounded its end-to-end latency.
+#
+#   python -m noggin.orchestrator --patients 300
+
+import argparse
+import asyncio
+import contextvars
+import sys
+import time
+from contextlib import contextmanager
+
+
+class NodeTimeout(Exception):
+    """A required node ran past its timeout."""
+
+
+# The running node's Timer, for queued()
+_timer = contextvars.ContextVar("node_timer", default=None)
+
+
+class Timer:
+    """A node's timeout that can be paused while the node waits in a queue."""
+
+    def __init__(self, loop, timeout, callback):
+        self.loop = loop
+        self.callback = callback
+        self.deadline = loop.time() + timeout
+        self.remaining = timeout
+        self.paused = 0
+        self.handle = loop.call_at(self.deadline, self._fire)
+
+    def _fire(self):
+        self.handle = None
+        self.remaining = None
+        self.callback()
+
+    def pause(self):
+        self.paused += 1
+        if self.paused == 1 and self.handle:
+            self.handle.cancel()
+            self.handle = None
+            self.remaining = self.deadline - self.loop.time()
+
+    def resume(self):
+        self.paused -= 1
+        if not self.paused and self.remaining is not None:
+            self.deadline = self.loop.time() + self.remaining
+            self.handle = self.loop.call_at(self.deadline, self._fire)
+
+    def cancel(self):
+        if self.handle:
+            self.handle.cancel()
+        self.handle = None
+        self.remaining = None
+
+
+@contextmanager
+def queued():
+    """Don't count the time spent in this block against the node's timeout.
+
+    For waits on a limit shared by every patient: a node should time out
+    for being slow, not for queueing behind other patients' calls.
+    """
+    timer = _timer.get()
+    if timer is None:
+        yield
+        return
+    timer.pause()
+    try:
+        yield
+    finally:
+        timer.resume()
+
+
+class Node:
+    def __init__(self, name, run, after=(), timeout=None, when=None, optional=False):
+        self.name = name
+        # Coroutine function of the results so far: await run(results)
+        self.run = run
+        self.after = tuple(after)
+        self.timeout = timeout
+        self.when = when
+        self.optional = optional
+
+
+class Span:
+    def __init__(self, name):
+        self.name = name
+        self.started = 0.0
+        self.finished = 0.0
+        # pending, ok, skipped, timeout or failed
+        self.status = "pending"
+        # The dependency that finished last, i.e. the one this node waited for
+        self.gate = None
+
+
+def order(nodes):
+    """Nodes in dependency order; ValueError for duplicates, unknown names or cycles."""
+    by_name = {}
+    for node in nodes:
+        if node.name in by_name:
+            raise ValueError(f"duplicate node {node.name!r}")
+        by_name[node.name] = node
+    for node in nodes:
+        for name in node.after:
+            if name not in by_name:
+                raise ValueError(f"{node.name!r} comes after unknown node {name!r}")
+    ordered, placed = [], set()
+    remaining = list(nodes)
+    while remaining:
+        ready = [node for node in remaining if placed.issuperset(node.after)]
+        if not ready:
+            raise ValueError("cycle between " + ", ".join(node.name for node in remaining))
+        ordered += ready
+        placed.update(node.name for node in ready)
+        remaining = [node for node in remaining if node.name not in placed]
+    return ordered
+
+
+class Run:
+    def __init__(self, spans, results, started, finished):
+        self.spans = spans
+        self.results = results
+        self.started = started
+        self.finished = finished
+
+    @property
+    def ms(self):
+        return (self.finished - self.started) * 1000
+
+    def critical_path(self):
+        """[(node, wait_ms, run_ms)] from the first node to the last one to finish.
+
+        wait_ms is the time between the node's gating dependency finishing
+        and the node starting (scheduling overhead).
+        """
+        ran = [span for span in self.spans.values() if span.status != "skipped"]
+        if not ran:
+            return []
+        path = []
+        span = max(ran, key=lambda span: span.finished)
+        while span is not None:
+            gate = self.spans[span.gate] if span.gate else None
+            ready = gate.finished if gate else self.started
+            path.append((span.name, (span.started - ready) * 1000, (span.finished - span.started) * 1000))
+            span = gate
+        return path[::-1]
+
+
+async def execute(nodes, clock=time.perf_counter):
+    """Run a DAG of nodes; returns a Run, or raises the first required node's error."""
+    nodes = order(nodes)
+    spans = {node.name: Span(node.name) for node in nodes}
+    dependents = {node.name: [] for node in nodes}
+    waiting = {}
+    for node in nodes:
+        waiting[node.name] = len(node.after)
+        for name in node.after:
+            dependents[name].append(node)
+    results = {}
+    running = set()
+    loop = asyncio.get_running_loop()
+    finished = loop.create_future()
+    remaining = [len(nodes)]
+
+    def fail(error):
+        if not finished.done():
+            finished.set_exception(error)
+
+    def spawn(node):
+        task = loop.create_task(run(node))
+        running.add(task)
+        task.add_done_callback(running.discard)
+
+    def start(node, inline):
+        """Start a ready node; returns the node to run inline instead, if allowed."""
+        span = spans[node.name]
+        span.started = clock()
+        if node.after:
+            span.gate = max(node.after, key=lambda name: spans[name].finished)
+        if any(spans[name].status != "ok" for name in node.after):
+            span.status = "skipped"
+            span.finished = span.started
+            node = settle(node)
+        if node is not None and not inline:
+            spawn(node)
+            return None
+        return node
+
+    def settle(node):
+        """Release what comes after a done (ran, failed or skipped) node.
+
+        Returns one ready dependent for the caller to run inline, so a chain
+        of nodes runs in one task; other ready dependents get a task each.
+        """
+        if finished.done():
+            return None
+        remaining[0] -= 1
+        inline = None
+        for child in dependents[node.name]:
+            waiting[child.name] -= 1
+            if not waiting[child.name]:
+                inline = start(child, inline is None) or inline
+        if not remaining[0] and not finished.done():
+            finished.set_result(None)
+        return inline
+
+    def expire(span, task):
+        span.status = "timeout"
+        task.cancel()
+
+    async def run(node):
+        task = asyncio.current_task()
+        while node is not None:
+            span = spans[node.name]
+            timer = None
+            try:
+                # In here so a predicate that raises fails this node instead
+                # of escaping settle() and leaving execute() waiting
+                if node.when and not node.when(results):
+                    span.status = "skipped"
+                else:
+                    if node.timeout:
+                        timer = Timer(loop, node.timeout, lambda span=span: expire(span, task))
+                    _timer.set(timer)
+                    results[node.name] = await node.run(results)
+                    span.status = "ok"
+            except asyncio.CancelledError:
+                if span.status != "timeout":
+                    raise
+                if not node.optional:
+                    fail(NodeTimeout(f"{node.name} ran past {node.timeout:g}s"))
+            except Exception as error:
+                span.status = "failed"
+                if not node.optional:
+                    fail(error)
+            finally:
+                if timer:
+                    timer.cancel()
+                span.finished = clock()
+            node = settle(node)
+
+    started = clock()
+    try:
+        for node in nodes:
+            if not node.after:
+                start(node, False)
+        if not nodes:
+            finished.set_result(None)
+        await finished
+    finally:
+        # A required node failed, or the caller gave up: stop the rest
+        for task in list(running):
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+    return Run(spans, results, started, clock())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.orchestrator",
+                                     description="Compare the sequential flow with DAG orchestration.")
+    parser.add_argument("--patients", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=50)
+    # Large enough that service latency, not the event loop, dominates
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from .pipeline import benchmark
+
+    print(f"{args.patients} patients, concurrency {args.concurrency}, latency x{args.scale}")
+    print(f"{'':<12} {'patients/s':>11} {'e2e p50 ms':>11} {'e2e p95 ms':>11}")
+    reports = []
+    for label, dag in (("sequential", False), ("dag", True)):
+        report = benchmark(args.patients, args.concurrency, args.scale, args.seed, dag=dag)
+        reports.append(report)
+        e2e = report["end_to_end"]
+        print(f"{label:<12} {report['patients_per_second']:>11.1f} {e2e['p50']:>11.2f} {e2e['p95']:>11.2f}")
+    for interaction, nodes in reports[1]["critical_path"].items():
+        print(f"\ncritical path, {interaction}")
+        print(f"{'node':<12} {'on path':>8} {'mean ms':>8} {'share':>6}")
+        for node, stats in nodes.items():
+            print(f"{node:<12} {stats['on_path']:>8.0%} {stats['mean_ms']:>8.2f} {stats['share']:>6.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,491 @@
+# Reference implementation of the Noggin patient flow.
+#
+# One coroutine per component in the architecture diagram, chained exactly
+# as the numbered flow in Utils/diagram_spec.py:
+#
+#   patients -> messaging/mobile (1) -> api (2) -> intake_lambda (3)
+#     -> transcribe (5a/5b, voice only) -> bedrock intake_agent (4)
+#     -> dynamodb (6) -> event_bridge (7) -> monitoring_lambda
+#     -> monitoring_agent (8) -> intervention_lambda (9) -> polly/messaging/mobile (10a-c)
+#     -> escalation_lambda (11) -> notification_lambda (12)
+#     -> clinician dashboard (13) -> api (14) -> dynamodb (15)
+#
+# The services come from noggin.services (in-process stand-ins by default).
+# Every step is timed; the benchmark pushes N synthetic patients through
+# concurrently and reports per-step latency and end-to-end throughput. The
+# --trace output is the span format Utils/diagram_traces.py reads, so a run
+# can be drawn onto the architecture diagram:
+#
+#   python -m noggin.pipeline --patients 500 --concurrency 100 --trace spans.jsonl
+#   python Utils/noggin_diagrams.py latency spans.jsonl
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+from .cache import CachedBedrock, ResponseCache
+from .hedging import HedgedBedrock
+from .orchestrator import Node, execute
+from .scoring import score
+from .services import Bedrock, Latency, standins
+from .synthetic import cohort
+
+
+class Recorder:
+    """Per-step timings, optionally streamed to a JSONL trace file."""
+
+    def __init__(self, trace=None):
+        self.durations = {}
+        self.trace = trace
+        # interaction -> [runs, {node: [times on path, run ms on path]}]
+        self.critical = {}
+
+    @contextmanager
+    def step(self, step, patient_id):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(step, patient_id, (time.perf_counter() - started) * 1000)
+
+    def record(self, step, patient_id, ms):
+        self.durations.setdefault(step, []).append(ms)
+        if self.trace:
+            self.trace.write(json.dumps({"step": step, "duration_ms": round(ms, 3),
+                                         "patient": patient_id}) + "\n")
+
+    def summary(self):
+        """{step: {"count", "p50", "p95"}} in milliseconds."""
+        return {step: _percentiles(values) for step, values in self.durations.items()}
+
+    def critical_path(self, interaction, path):
+        runs = self.critical.setdefault(interaction, [0, {}])
+        runs[0] += 1
+        for node, _, ms in path:
+            stats = runs[1].setdefault(node, [0, 0.0])
+            stats[0] += 1
+            stats[1] += ms
+
+    def critical_summary(self):
+        """{interaction: {node: {"on_path", "mean_ms", "share"}}} over every run.
+
+        on_path is the share of runs the node bounded, mean_ms its mean
+        duration when it did, share its part of all critical-path time.
+        """
+        summary = {}
+        for interaction, (runs, nodes) in self.critical.items():
+            total = sum(ms for _, ms in nodes.values()) or 1.0
+            summary[interaction] = {
+                node: {"on_path": count / runs, "mean_ms": ms / count, "share": ms / total}
+                for node, (count, ms) in sorted(nodes.items(), key=lambda item: -item[1][1])
+            }
+        return summary
+
+
+def _percentiles(values):
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {"count": len(values), "p50": value, "p95": value}
+    cuts = statistics.quantiles(values, n=20, method="inclusive")
+    return {"count": len(values), "p50": statistics.median(values), "p95": cuts[18]}
+
+
+class Pipeline:
+    def __init__(self, services, recorder=None):
+        self.services = services
+        self.recorder = recorder or Recorder()
+        services.eventbridge.subscribe("assessment-complete", self.monitoring_lambda)
+
+    def step(self, step, patient_id):
+        return self.recorder.step(step, patient_id)
+
+    async def hop(self):
+        # Network hop between clients, API Gateway and Lambdas
+        await self.services.latency.wait("network")
+
+    async def handle(self, patient):
+        """Run one patient through the whole flow; returns its outcome."""
+        pid = patient["patient_id"]
+        with self.step("1", pid):
+            # Initial contact over WhatsApp/SMS/voice, or the mobile app
+            await self.hop()
+        with self.step("2", pid):
+            request = await self.api_gateway(patient)
+        with self.step("3", pid):
+            await self.hop()
+        handlers = await self.intake_lambda(request)
+        outcomes = await asyncio.gather(*handlers)
+        return outcomes[0] if outcomes else None
+
+    async def api_gateway(self, patient):
+        await self.hop()
+        if not patient.get("patient_id") or patient.get("channel") is None:
+            raise ValueError("request is missing patient_id or channel")
+        return {**patient, "session_id": uuid.uuid4().hex}
+
+    async def intake_lambda(self, request):
+        pid = request["patient_id"]
+        message = request["message"]
+        if request["channel"] == "voice":
+            with self.step("5a", pid):
+                result = await self.services.transcribe.transcribe({"utterance": message})
+            with self.step("5b", pid):
+                await self.hop()
+                message = result["transcript"]
+
+        with self.step("4", pid):
+            # SCAT5/GCS scoring is deterministic; the agent interprets free text only
+            assessment = score(request)
+            assessment.update(await self.services.bedrock.invoke_agent("intake_agent", {
+                "message": message,
+                "scores": assessment,
+            }))
+
+        with self.step("6", pid):
+            # Assessment plus the symptom baseline for later check-ins
+            await self.services.dynamodb.put_item(pid, "assessment", {
+                **assessment,
+                "symptoms": request["symptoms"],
+                "channel": request["channel"],
+            })
+
+        with self.step("7", pid):
+            return await self.services.eventbridge.put_event("assessment-complete", {
+                "patient_id": pid,
+                "channel": request["channel"],
+                "checkin": request["checkin"],
+            })
+
+    async def monitoring_lambda(self, event):
+        pid = event["patient_id"]
+        baseline = await self.services.dynamodb.get_item(pid, "assessment")
+        with self.step("8", pid):
+            status = await self.services.bedrock.invoke_agent("monitoring_agent", {
+                "checkin": event["checkin"],
+                "baseline": baseline,
+            })
+        status["risk"] = baseline["risk"]
+
+        with self.step("9", pid):
+            await self.hop()
+            plan = await self.intervention_lambda(pid, status)
+        await self.respond(pid, event["channel"], plan["plan"])
+
+        escalated = False
+        with self.step("11", pid):
+            await self.hop()
+            decision = await self.escalation_lambda(pid, status)
+        if decision["escalate"]:
+            escalated = True
+            with self.step("12", pid):
+                await self.notification_lambda(pid, status)
+            await self.clinician_dashboard(pid)
+        return {"patient_id": pid, "trend": status["trend"], "escalated": escalated}
+
+    async def intervention_lambda(self, pid, status):
+        return await self.services.bedrock.invoke_agent("intervention_agent", status)
+
+    async def respond(self, pid, channel, text):
+        if channel == "voice":
+            with self.step("10a", pid):
+                await self.services.polly.synthesize(text)
+            with self.step("10b", pid):
+                await self.hop()
+        elif channel in ("whatsapp", "sms"):
+            # Text reply back through the messaging channel
+            with self.step("10b", pid):
+                await self.hop()
+        with self.step("10c", pid):
+            # Recovery tracking in the mobile app for every patient
+            await self.hop()
+        await self.write_transcript(pid, channel, text)
+
+    async def write_transcript(self, pid, channel, text):
+        await self.services.dynamodb.put_item(pid, "transcript", {"channel": channel, "reply": text})
+
+    async def escalation_lambda(self, pid, status):
+        return await self.services.bedrock.invoke_agent("escalation_agent", status)
+
+    async def notification_lambda(self, pid, status):
+        await self.hop()
+        await self.services.dynamodb.put_item(pid, "alert", status)
+
+    async def clinician_dashboard(self, pid):
+        with self.step("13", pid):
+            await self.hop()
+        with self.step("14", pid):
+            await self.hop()
+        with self.step("15", pid):
+            return await self.services.dynamodb.query(pid)
+
+
+# Per-node timeouts for the orchestrated flow, in unscaled ms
+NODE_TIMEOUT_MS = {
+    "4": 8000,
+    "5a": 5000,
+    "8": 8000,
+    "9": 8000,
+    "10a": 3000,
+    "11": 8000,
+}
+HOP_TIMEOUT_MS = 5000
+# Scaled timeouts never go below this many seconds: event-loop scheduling
+# delay doesn't shrink with the latency scale
+MIN_TIMEOUT = 0.25
+
+
+class OrchestratedPipeline(Pipeline):
+    """The same flow with each interaction run as a DAG (noggin.orchestrator).
+
+    Intake: the reply to the patient goes out alongside the assessment write
+    (6). Check-in: intervention (9) and escalation (11) both start from the
+    monitoring status (8); 10a-c and the transcript write start from the
+    plan; 12-15 only run when the patient is escalated.
+    """
+
+    def node(self, name, run, after=(), **options):
+        scale = self.services.latency.scale
+        timeout = None
+        if scale > 0:
+            timeout = max(NODE_TIMEOUT_MS.get(name, HOP_TIMEOUT_MS) * scale / 1000, MIN_TIMEOUT)
+        return Node(name, run, after, timeout, **options)
+
+    async def orchestrate(self, interaction, pid, nodes):
+        run = await execute(nodes)
+        # Numbered nodes are the flow's steps
+        for span in run.spans.values():
+            if span.status == "ok" and span.name[0].isdigit():
+                self.recorder.record(span.name, pid, (span.finished - span.started) * 1000)
+        self.recorder.critical_path(interaction, run.critical_path())
+        return run.results
+
+    async def intake_lambda(self, request):
+        pid = request["patient_id"]
+        nodes = []
+        heard = ()
+        if request["channel"] == "voice":
+            async def transcribe(results):
+                return await self.services.transcribe.transcribe({"utterance": request["message"]})
+
+            async def deliver_transcript(results):
+                await self.hop()
+                return results["5a"]["transcript"]
+
+            nodes += [self.node("5a", transcribe), self.node("5b", deliver_transcript, ("5a",))]
+            heard = ("5b",)
+
+        async def assess(results):
+            assessment = score(request)
+            assessment.update(await self.services.bedrock.invoke_agent("intake_agent", {
+                "message": results["5b"] if heard else request["message"],
+                "scores": assessment,
+            }))
+            return assessment
+
+        async def reply(results):
+            # The intake reply back over the patient's channel
+            await self.hop()
+
+        async def store(results):
+            await self.services.dynamodb.put_item(pid, "assessment", {
+                **results["4"],
+                "symptoms": request["symptoms"],
+                "channel": request["channel"],
+            })
+
+        async def publish(results):
+            return await self.services.eventbridge.put_event("assessment-complete", {
+                "patient_id": pid,
+                "channel": request["channel"],
+                "checkin": request["checkin"],
+            })
+
+        nodes += [
+            self.node("4", assess, heard),
+            self.node("reply", reply, ("4",), optional=True),
+            self.node("6", store, ("4",)),
+            # The monitoring Lambda reads the assessment, so 7 follows 6
+            self.node("7", publish, ("6",)),
+        ]
+        return (await self.orchestrate("intake", pid, nodes))["7"]
+
+    async def monitoring_lambda(self, event):
+        pid = event["patient_id"]
+        channel = event["channel"]
+
+        async def baseline(results):
+            return await self.services.dynamodb.get_item(pid, "assessment")
+
+        async def monitor(results):
+            status = await self.services.bedrock.invoke_agent("monitoring_agent", {
+                "checkin": event["checkin"],
+                "baseline": results["baseline"],
+            })
+            status["risk"] = results["baseline"]["risk"]
+            return status
+
+        async def intervene(results):
+            await self.hop()
+            return await self.intervention_lambda(pid, results["8"])
+
+        async def escalate(results):
+            await self.hop()
+            return await self.escalation_lambda(pid, results["8"])
+
+        async def synthesize(results):
+            return await self.services.polly.synthesize(results["9"]["plan"])
+
+        async def hop(results):
+            await self.hop()
+
+        async def transcript(results):
+            await self.write_transcript(pid, channel, results["9"]["plan"])
+
+        async def notify(results):
+            await self.notification_lambda(pid, results["8"])
+
+        async def dashboard(results):
+            return await self.services.dynamodb.query(pid)
+
+        nodes = [
+            self.node("baseline", baseline),
+            self.node("8", monitor, ("baseline",)),
+            self.node("9", intervene, ("8",)),
+            self.node("11", escalate, ("8",)),
+            self.node("10c", hop, ("9",), optional=True),
+            self.node("transcript", transcript, ("9",), optional=True),
+        ]
+        if channel == "voice":
+            nodes += [self.node("10a", synthesize, ("9",)), self.node("10b", hop, ("10a",))]
+        elif channel in ("whatsapp", "sms"):
+            nodes.append(self.node("10b", hop, ("9",)))
+        escalated = lambda results: results["11"]["escalate"]
+        nodes += [
+            self.node("12", notify, ("11",), when=escalated),
+            self.node("13", hop, ("12",)),
+            self.node("14", hop, ("13",)),
+            self.node("15", dashboard, ("14",)),
+        ]
+        results = await self.orchestrate("checkin", pid, nodes)
+        return {"patient_id": pid, "trend": results["8"]["trend"], "escalated": results["11"]["escalate"]}
+
+
+async def run(patients, concurrency, services, recorder, orchestrated=False):
+    """Push patients through a pipeline, at most concurrency at a time."""
+    pipeline = (OrchestratedPipeline if orchestrated else Pipeline)(services, recorder)
+    limit = asyncio.Semaphore(concurrency)
+    end_to_end = []
+
+    async def one(patient):
+        async with limit:
+            started = time.perf_counter()
+            try:
+                outcome = await pipeline.handle(patient)
+            except Exception as error:
+                # One patient's failed interaction (e.g. a required node's
+                # NodeTimeout) is recorded, not allowed to stop the run
+                return {"patient_id": patient["patient_id"], "escalated": False, "failed": repr(error)}
+            end_to_end.append((time.perf_counter() - started) * 1000)
+            return outcome
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(one(patient) for patient in patients))
+    return outcomes, end_to_end, time.perf_counter() - started
+
+
+def benchmark(size=200, concurrency=50, scale=0.02, seed=0, trace=None, bedrock_concurrency=None,
+              cache=None, hedge=False, dag=False):
+    services = standins(scale, seed, bedrock_concurrency)
+    hedged = None
+    if hedge:
+        # A second region with its own latency draws
+        second = Bedrock(Latency(scale, seed + 1), bedrock_concurrency)
+        services.bedrock = hedged = HedgedBedrock(services.bedrock, second)
+    if cache:
+        services.bedrock = CachedBedrock(services.bedrock, cache)
+    recorder = Recorder(trace)
+    outcomes, end_to_end, wall = asyncio.run(
+        run(list(cohort(size, seed)), concurrency, services, recorder, dag)
+    )
+    return {
+        "patients": size,
+        "concurrency": concurrency,
+        "latency_scale": scale,
+        "seconds": wall,
+        "patients_per_second": size / wall,
+        "escalated": sum(outcome["escalated"] for outcome in outcomes),
+        "failed": sum("failed" in outcome for outcome in outcomes),
+        "bedrock_calls": services.bedrock.calls,
+        "end_to_end": _percentiles(end_to_end),
+        "steps": recorder.summary(),
+        "cache": cache.report() if cache else None,
+        "hedging": hedged.report() if hedged else None,
+        "critical_path": recorder.critical_summary() if dag else None,
+    }
+
+
+def _step_order(step):
+    number = int("".join(c for c in step if c.isdigit()))
+    return number, step
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.pipeline",
+                                     description="Benchmark the patient flow against the stand-ins.")
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--scale", type=float, default=0.02,
+                        help="multiplier on simulated service latency (1.0 = real time)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bedrock-concurrency", type=int,
+                        help="cap on concurrent Bedrock invocations")
+    parser.add_argument("--cache", action="store_true",
+                        help="put the response cache in front of Bedrock")
+    parser.add_argument("--hedge", action="store_true",
+                        help="hedge intake and intervention calls to a second Bedrock region")
+    parser.add_argument("--dag", action="store_true",
+                        help="run each interaction as a concurrent DAG (noggin.orchestrator)")
+    parser.add_argument("--trace", help="write per-step spans as JSONL")
+    parser.add_argument("--json", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    trace = open(args.trace, "w", encoding="utf-8") if args.trace else None
+    try:
+        report = benchmark(args.patients, args.concurrency, args.scale, args.seed,
+                           trace, args.bedrock_concurrency, ResponseCache() if args.cache else None, args.hedge, args.dag)
+    finally:
+        if trace:
+            trace.close()
+
+    print(f"{report['patients']} patients, concurrency {report['concurrency']}, "
+          f"latency x{report['latency_scale']}: {report['seconds']:.2f}s, "
+          f"{report['patients_per_second']:.1f} patients/s, "
+          f"{report['bedrock_calls']} Bedrock calls, {report['escalated']} escalated, "
+          f"{report['failed']} failed")
+    print(f"{'step':<12} {'count':>7} {'p50 ms':>9} {'p95 ms':>9}")
+    for step in sorted(report["steps"], key=_step_order):
+        stats = report["steps"][step]
+        print(f"{step:<12} {stats['count']:>7} {stats['p50']:>9.2f} {stats['p95']:>9.2f}")
+    e2e = report["end_to_end"]
+    print(f"{'end-to-end':<12} {e2e['count']:>7} {e2e['p50']:>9.2f} {e2e['p95']:>9.2f}")
+    for agent, stats in (report["cache"] or {}).items():
+        print(f"cache {agent}: {stats['hit_rate']:.1%} hit rate, {stats['misses']} misses")
+    for agent, stats in (report["hedging"] or {}).items():
+        print(f"hedging {agent}: {stats['hedged']} hedged ({stats['extra_calls']:.1%} extra calls), "
+              f"{stats['secondary_wins']} won by the second region")
+    for interaction, nodes in (report["critical_path"] or {}).items():
+        print(f"critical path, {interaction}: " + ", ".join(
+            f"{node} {stats['share']:.0%}" for node, stats in nodes.items()))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as out:
+            json.dump(report, out, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+# Compiled questionnaires for the SCAT5 evaluation and daily check-ins.
+#
+# Most check-in turns are answers like "headache 3/10", "2" or "no", which
+# don't need a language model. Each questionnaire is compiled once: the
+# question prompts are rendered, one regex recognises every symptom alias,
+# and the fallback prompt for the monitoring agent has a fixed prefix (so
+# Bedrock prompt caching can reuse it). A Session then parses answers
+# locally, takes several answers from one message ("headache 3, dizzy 2,
+# no nausea"), and calls the model once whenever the message has text it
+# didn't use, asking it to fill in every question still open.
+#
+#   python -m noggin.questionnaire --checkins 2000
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+
+from .synthetic import SCAT5_SYMPTOMS
+
+# Spoken severity words -> fraction of the scale
+SEVERITY_WORDS = {
+    "none": 0.0, "nothing": 0.0, "gone": 0.0, "fine": 0.0,
+    "slight": 0.2, "mild": 0.3, "bit": 0.3, "little": 0.3,
+    "moderate": 0.5, "medium": 0.5, "some": 0.5,
+    "bad": 0.7, "strong": 0.8, "severe": 1.0, "awful": 1.0, "terrible": 1.0, "worst": 1.0,
+}
+YES = {"yes", "y", "yeah", "yep", "yup", "sure", "definitely", "correct", "i have", "i did"}
+NO = {"no", "n", "nope", "nah", "not really", "none", "never", "i haven't", "i didn't"}
+
+NUMBER = r"(\d+(?:\.\d+)?)(?:\s*(?:/|out of)\s*(\d+))?"
+RATING = re.compile(rf"^\s*{NUMBER}\s*$")
+# "down 2 days" is a duration, not a rating
+NOT_A_RATING = r"(?![\d.]|\s*(?:days?|nights?|hours?|hrs?|weeks?|minutes?|mins?|times?)\b)"
+# Words left over after the local parse that don't need the model
+FILLER = {"and", "but", "also", "a", "the", "is", "my", "i", "i'm", "im", "its", "it's",
+          "today", "now", "still", "feel", "feeling", "pretty", "very", "really", "quite", "just"}
+
+
+# Extra ways patients name the symptoms
+ALIASES = {
+    "headache": {"head ache", "head hurts", "head"},
+    "dizziness": {"dizzy", "lightheaded", "light headed", "spinning"},
+    "nausea_or_vomiting": {"nausea", "nauseous", "sick", "vomiting", "vomit"},
+    "balance_problems": {"balance", "unsteady", "wobbly"},
+    "sensitivity_to_light": {"light", "bright light"},
+    "sensitivity_to_noise": {"noise", "loud"},
+    "fatigue_or_low_energy": {"tired", "fatigue", "fatigued", "exhausted", "energy"},
+    "trouble_falling_asleep": {"sleep", "sleeping", "insomnia"},
+    "difficulty_concentrating": {"concentrating", "concentration", "focus"},
+    "difficulty_remembering": {"memory", "remembering", "forgetful"},
+    "feeling_in_a_fog": {"fog", "foggy"},
+    "nervous_or_anxious": {"anxious", "nervous", "worried"},
+    "neck_pain": {"neck"},
+    "blurred_vision": {"blurry", "blurred", "vision"},
+    "irritability": {"irritable", "irritated", "snappy"},
+    "more_emotional": {"emotional", "teary"},
+    "sadness": {"sad", "low mood", "down"},
+    "confusion": {"confused"},
+    "drowsiness": {"drowsy", "sleepy"},
+}
+# Aliases naming the ability rather than the symptom: "no energy" or "no
+# focus" means the symptom is bad, and a rating is ambiguous, so these are
+# left to the model
+INVERSE_ALIASES = {"energy", "focus", "concentration", "balance", "sleep", "sleeping",
+                   "memory", "vision"}
+
+
+class Question:
+    def __init__(self, key, prompt, kind="rating", scale=6):
+        self.key = key
+        self.prompt = prompt
+        # "rating" (0..scale) or "yesno"
+        self.kind = kind
+        self.scale = scale
+
+
+class Questionnaire:
+    """A compiled questionnaire: rendered prompts and answer parsers."""
+
+    def __init__(self, name, questions, intro):
+        self.name = name
+        self.questions = list(questions)
+        self.by_key = {q.key: q for q in self.questions}
+        self.intro = intro
+        # Rendered once; sessions only index into these
+        self.prompts = {
+            q.key: f"{q.prompt} ({'yes or no' if q.kind == 'yesno' else f'0-{q.scale}'})"
+            for q in self.questions
+        }
+        # Symptom names a patient may rate in passing; yes/no questions
+        # need a direct answer
+        aliases = {}
+        for q in self.questions:
+            if q.kind == "rating":
+                for alias in {q.key.replace("_or_", " or ").replace("_", " ")} | ALIASES.get(q.key, set()):
+                    aliases.setdefault(alias, q.key)
+        self.aliases = aliases
+        # Longest alias first so "head ache" wins over "head"
+        names = "|".join(re.escape(a) for a in sorted(aliases, key=len, reverse=True))
+        words = "|".join(SEVERITY_WORDS)
+        self.mention = re.compile(
+            rf"\b(no\s+)?({names})\b"
+            rf"(?:[\s:=-]*(?:(?:is|at|about|around)\s+)*(?:{NUMBER}{NOT_A_RATING}|({words})\b))?",
+            re.IGNORECASE,
+        )
+        # Static prefix of the fallback prompt, identical for every call
+        self.fallback_prefix = (
+            f"You are the Noggin monitoring agent running the {name}. Extract answers from "
+            "the patient's message. Reply with JSON mapping question keys to numbers "
+            "(ratings) or booleans (yes/no); omit questions the message doesn't answer.\n"
+            "Questions:\n" + "\n".join(f"- {q.key}: {self.prompts[q.key]}" for q in self.questions)
+        )
+
+    def fallback_prompt(self, pending, text):
+        return (f"{self.fallback_prefix}\nStill open: {', '.join(pending)}\n"
+                f"Patient: {json.dumps(text)}")
+
+    def parse_direct(self, question, text):
+        """Answer to the question just asked, or None if it needs the model."""
+        text = text.strip().lower().rstrip(".!")
+        if question.kind == "yesno":
+            if text in YES:
+                return True
+            if text in NO:
+                return False
+            return None
+        match = RATING.match(text)
+        if match:
+            return _rating(question, match.group(1), match.group(2))
+        if text in SEVERITY_WORDS:
+            return round(SEVERITY_WORDS[text] * question.scale)
+        if text in NO:
+            return 0
+        return None
+
+    def parse_mentions(self, text):
+        """Every "<symptom> <rating>" in a message, e.g. "headache 3/10, no nausea".
+
+        Returns (answers, unparsed) where unparsed is what's left of the
+        message once the mentions that gave an answer are taken out.
+        """
+        answers = {}
+        unparsed, end = [], 0
+        for match in self.mention.finditer(text):
+            negated, alias, value, out_of, word = match.groups()
+            if alias.lower() in INVERSE_ALIASES:
+                continue
+            question = self.by_key[self.aliases[alias.lower()]]
+            if negated:
+                answers[question.key] = 0
+            elif value is not None:
+                answers[question.key] = _rating(question, value, out_of)
+            elif word:
+                answers[question.key] = round(SEVERITY_WORDS[word.lower()] * question.scale)
+            else:
+                continue
+            unparsed.append(text[end:match.start()])
+            end = match.end()
+        unparsed.append(text[end:])
+        return answers, " ".join(unparsed)
+
+
+def needs_model(unparsed):
+    """Whether text left over after the local parse could still say something."""
+    words = re.findall(r"[a-z']+", unparsed.lower())
+    return any(word not in FILLER for word in words)
+
+
+def _rating(question, value, out_of):
+    value = float(value)
+    if out_of:
+        # "3/10" on a 0-6 question
+        value = value * question.scale / float(out_of)
+    return max(0, min(question.scale, round(value)))
+
+
+class Session:
+    """One patient working through a questionnaire.
+
+    llm is an async callable (prompt, pending_keys) -> {key: answer}; it is
+    only awaited for messages with text the local parsers didn't use.
+    """
+
+    def __init__(self, questionnaire, llm):
+        self.questionnaire = questionnaire
+        self.llm = llm
+        self.answers = {}
+        self.llm_calls = 0
+        self.turns = 0
+
+    def pending(self):
+        return [q.key for q in self.questionnaire.questions if q.key not in self.answers]
+
+    def done(self):
+        return not self.pending()
+
+    def next_prompt(self):
+        pending = self.pending()
+        return self.questionnaire.prompts[pending[0]] if pending else None
+
+    async def reply(self, text):
+        """Take the patient's message; returns the next prompt or None when done."""
+        self.turns += 1
+        pending = self.pending()
+        if not pending:
+            return None
+        current = self.questionnaire.by_key[pending[0]]
+        answer = self.questionnaire.parse_direct(current, text)
+        if answer is not None:
+            self.answers[current.key] = answer
+            return self.next_prompt()
+        found, unparsed = self.questionnaire.parse_mentions(text)
+        found = {k: v for k, v in found.items() if k not in self.answers}
+        self.answers.update(found)
+        if needs_model(unparsed):
+            # Anything the parser didn't use ("... and I had a seizure") goes
+            # to the model, even when some mentions were read locally
+            pending = self.pending()
+            self.llm_calls += 1
+            prompt = self.questionnaire.fallback_prompt(pending, text)
+            reply = await self.llm(prompt, pending)
+            self.answers.update({k: v for k, v in reply.items() if k in pending})
+            if not found and current.key not in self.answers:
+                # The model couldn't place it either; don't ask forever
+                self.answers[current.key] = None
+        elif not found:
+            self.answers[current.key] = None
+        return self.next_prompt()
+
+
+SCAT5 = Questionnaire(
+    "SCAT5 symptom evaluation",
+    [Question(name, f"How much {name.replace('_', ' ')} do you have right now?")
+     for name in SCAT5_SYMPTOMS],
+    intro="I'll ask about 22 symptoms. Rate each from 0 (none) to 6 (severe).",
+)
+
+DAILY_CHECKIN = Questionnaire(
+    "daily check-in",
+    [
+        Question("headache", "How is your headache today?", scale=10),
+        Question("dizziness", "Any dizziness today?", scale=10),
+        Question("nausea_or_vomiting", "Any nausea?", scale=10),
+        Question("fatigue_or_low_energy", "How tired do you feel?", scale=10),
+        Question("difficulty_concentrating", "How is your concentration?", scale=10),
+        Question("sensitivity_to_light", "Is light bothering you?", scale=10),
+        Question("trouble_falling_asleep", "How much trouble did you have sleeping?", scale=10),
+        Question("irritability", "How irritable do you feel?", scale=10),
+        Question("vomited", "Have you vomited since yesterday?", kind="yesno"),
+        Question("new_symptoms", "Any new symptoms since yesterday?", kind="yesno"),
+        Question("screen_time", "Did you keep screen time down yesterday?", kind="yesno"),
+        Question("activity", "Did you do any exercise or sport?", kind="yesno"),
+    ],
+    intro="Morning! A few quick questions about how you're doing today.",
+)
+
+QUESTIONNAIRES = {"scat5": SCAT5, "checkin": DAILY_CHECKIN}
+
+
+# Benchmark
+
+FREE_TEXT = (
+    "honestly it's kind of throbbing behind my eyes since lunch",
+    "I guess a bit better than yesterday but hard to say",
+    "my flatmate says I seem off",
+    "only when I stand up quickly",
+)
+
+
+def simulated_reply(rng, question, free_text_rate):
+    """A patient's answer: usually short and structured, sometimes free text."""
+    if rng.random() < free_text_rate:
+        return rng.choice(FREE_TEXT)
+    if question.kind == "yesno":
+        return rng.choice(("yes", "no", "nope", "yeah"))
+    value = rng.randint(0, question.scale)
+    name = question.key.replace("_or_", " or ").replace("_", " ")
+    return rng.choice((f"{value}", f"{name} {value}/{question.scale}",
+                       f"{value} out of {question.scale}"))
+
+
+def benchmark(checkins=2000, questionnaire=DAILY_CHECKIN, free_text_rate=0.1, llm_ms=0.0, seed=0):
+    rng = random.Random(seed)
+    llm_calls = 0
+
+    async def llm(prompt, pending):
+        nonlocal llm_calls
+        llm_calls += 1
+        if llm_ms:
+            await asyncio.sleep(llm_ms / 1000)
+        # Stand-in model: answers the question that was asked
+        question = questionnaire.by_key[pending[0]]
+        return {pending[0]: False if question.kind == "yesno" else question.scale // 2}
+
+    async def one():
+        session = Session(questionnaire, llm)
+        while not session.done():
+            question = questionnaire.by_key[session.pending()[0]]
+            await session.reply(simulated_reply(rng, question, free_text_rate))
+        return session
+
+    async def run_all():
+        return [await one() for _ in range(checkins)]
+
+    started = time.perf_counter()
+    sessions = asyncio.run(run_all())
+    seconds = time.perf_counter() - started
+    turns = sum(s.turns for s in sessions)
+    return {
+        "checkins": checkins,
+        "questions": len(questionnaire.questions),
+        "turns": turns,
+        "llm_calls": llm_calls,
+        "llm_calls_per_checkin": llm_calls / checkins,
+        # Before: every turn was a model round-trip
+        "baseline_llm_calls_per_checkin": turns / checkins,
+        "local_parse_us": seconds / turns * 1e6,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.questionnaire",
+                                     description="Benchmark local answer parsing for check-ins.")
+    parser.add_argument("--checkins", type=int, default=2000)
+    parser.add_argument("--questionnaire", choices=sorted(QUESTIONNAIRES), default="checkin")
+    parser.add_argument("--free-text-rate", type=float, default=0.1,
+                        help="share of answers that are free text")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = benchmark(args.checkins, QUESTIONNAIRES[args.questionnaire],
+                       args.free_text_rate, seed=args.seed)
+    print(f"{report['checkins']} check-ins x {report['questions']} questions, "
+          f"{args.free_text_rate:.0%} free text")
+    print(f"model round-trips per check-in: {report['llm_calls_per_checkin']:.2f} "
+          f"(was {report['baseline_llm_calls_per_checkin']:.1f})")
+    print(f"local handling per turn:        {report['local_parse_us']:.1f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
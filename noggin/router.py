@@ -0,0 +1,272 @@
+# Model router between the agents and the model backends.
+#
+# The README assigns a model per agent (Sonnet for intake and escalation,
+# Haiku for routine monitoring, fine-tuned Titan for intervention) while
+# the diagrams wire every agent to one model. Router sits where
+# services.bedrock does and picks the model for each request:
+#
+#   1. the agent's primary model (ROUTES)
+#   2. upgraded to UPGRADE_MODEL when the input doesn't fit the model's
+#      context window, or when the patient's risk is high and the upgrade
+#      model has headroom
+#   3. under load (the model's in-flight calls at capacity, or its p95
+#      over the last HORIZON seconds above the agent's SLO), the next model
+#      in FALLBACK that isn't loaded itself (or the least loaded one);
+#      agents in NO_DOWNGRADE and patients at HIGH_RISK are never moved to
+#      a smaller model, and RESERVED slots keep room for those agents on
+#      their model
+#
+# Per route (agent -> model) the router records calls, cost units and
+# latency.
+#
+#   python -m noggin.router --requests 4000
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import sys
+import time
+from collections import deque
+
+from .context import tokens
+from .services import AGENTS
+
+
+class Model:
+    def __init__(self, name, input_cost, output_cost, ttft_ms, ms_per_output_token,
+                 context, capacity):
+        self.name = name
+        # Cost units per 1k tokens
+        self.input_cost = input_cost
+        self.output_cost = output_cost
+        self.ttft_ms = ttft_ms
+        self.ms_per_output_token = ms_per_output_token
+        self.context = context
+        # Concurrent requests before calls queue (quota/provisioned throughput)
+        self.capacity = capacity
+
+
+MODELS = {
+    "sonnet": Model("anthropic.claude-3-sonnet", 3.0, 15.0, 800, 14, 200_000, 32),
+    "haiku": Model("anthropic.claude-3-haiku", 0.25, 1.25, 350, 6, 200_000, 64),
+    "titan-intervention": Model("amazon.titan-text-g1-ft-intervention", 0.8, 1.6, 500, 9, 8_000, 16),
+}
+ROUTES = {
+    "intake_agent": "sonnet",
+    "monitoring_agent": "haiku",
+    "intervention_agent": "titan-intervention",
+    "escalation_agent": "sonnet",
+}
+UPGRADE_MODEL = "sonnet"
+FALLBACK = {
+    "sonnet": ("haiku",),
+    "titan-intervention": ("haiku",),
+    "haiku": (),
+}
+NO_DOWNGRADE = {"escalation_agent"}
+# Risk levels that are upgraded when possible and never downgraded
+HIGH_RISK = ("high", "emergency")
+# Concurrency kept free for NO_DOWNGRADE agents: other agents treat the
+# model as loaded this many slots early
+RESERVED = {"sonnet": 8}
+# p95 latency objective per agent, ms
+SLO_MS = {
+    "intake_agent": 8000,
+    "monitoring_agent": 3000,
+    "intervention_agent": 6000,
+    "escalation_agent": 6000,
+}
+# Typical reply length per agent, tokens
+OUTPUT_TOKENS = {
+    "intake_agent": 400,
+    "monitoring_agent": 150,
+    "intervention_agent": 500,
+    "escalation_agent": 200,
+}
+# Latency samples older than this (seconds, unscaled) stop counting
+HORIZON = 60
+
+
+def risk_of(payload):
+    return payload.get("risk") or payload.get("scores", {}).get("risk")
+
+
+def nearest_rank(values, q):
+    """The q quantile of sorted values by the nearest-rank method."""
+    return values[max(math.ceil(q * len(values)) - 1, 0)]
+
+
+class ModelStandIn:
+    """A model endpoint: queues past capacity, then answers after TTFT plus decode time."""
+
+    def __init__(self, model, scale=1.0, seed=0):
+        self.model = model
+        self.scale = scale
+        self.rng = random.Random(f"{seed}:{model.name}")
+        self.slots = asyncio.Semaphore(model.capacity)
+
+    async def invoke(self, agent, payload, output_tokens):
+        async with self.slots:
+            ms = self.model.ttft_ms + self.model.ms_per_output_token * output_tokens
+            await asyncio.sleep(max(0.0, self.rng.gauss(ms, ms * 0.15)) * self.scale / 1000)
+        return AGENTS[agent](payload)
+
+
+class RouteStats:
+    def __init__(self):
+        self.calls = 0
+        self.cost = 0.0
+        self.latency_ms = []
+
+
+class Router:
+    def __init__(self, backends, models=MODELS, routes=ROUTES, adaptive=True):
+        self.backends = backends
+        self.models = models
+        self.routes = routes
+        self.adaptive = adaptive
+        self.inflight = {name: 0 for name in models}
+        # model -> (monotonic time, unscaled ms) samples within HORIZON
+        self.observed = {name: deque() for name in models}
+        self.stats = {}
+        self.calls = 0
+
+    def p95(self, model):
+        window = self.observed[model]
+        horizon = HORIZON * getattr(self.backends[model], "scale", 1.0)
+        while window and window[0][0] < time.monotonic() - horizon:
+            window.popleft()
+        if len(window) < 20:
+            return 0.0
+        return nearest_rank(sorted(ms for _, ms in window), 0.95)
+
+    def loaded(self, model, agent):
+        capacity = self.models[model].capacity
+        if agent not in NO_DOWNGRADE:
+            capacity -= RESERVED.get(model, 0)
+        return self.inflight[model] >= capacity or self.p95(model) > SLO_MS[agent]
+
+    def choose(self, agent, payload, input_tokens):
+        """(model, reason) for one request."""
+        model = self.routes[agent]
+        if not self.adaptive:
+            return model, "static"
+        if input_tokens + OUTPUT_TOKENS[agent] > self.models[model].context:
+            return UPGRADE_MODEL, "size"
+        high_risk = risk_of(payload) in HIGH_RISK
+        if model != UPGRADE_MODEL and high_risk and not self.loaded(UPGRADE_MODEL, agent):
+            return UPGRADE_MODEL, "risk"
+        if (agent not in NO_DOWNGRADE and not high_risk
+                and self.loaded(model, agent) and FALLBACK[model]):
+            for candidate in FALLBACK[model]:
+                if not self.loaded(candidate, agent):
+                    return candidate, "load"
+            # Everything is busy: the least loaded relative to capacity
+            best = min((model,) + FALLBACK[model],
+                       key=lambda name: self.inflight[name] / self.models[name].capacity)
+            return best, "load" if best != model else "primary"
+        return model, "primary"
+
+    async def invoke_agent(self, agent, payload):
+        self.calls += 1
+        input_tokens = tokens(json.dumps(payload, default=str))
+        model, reason = self.choose(agent, payload, input_tokens)
+        output_tokens = OUTPUT_TOKENS[agent]
+        self.inflight[model] += 1
+        started = time.perf_counter()
+        try:
+            reply = await self.backends[model].invoke(agent, payload, output_tokens)
+        finally:
+            self.inflight[model] -= 1
+        # Observed latency in unscaled milliseconds, comparable with SLO_MS
+        ms = (time.perf_counter() - started) * 1000 / getattr(self.backends[model], "scale", 1.0)
+        self.observed[model].append((time.monotonic(), ms))
+        spec = self.models[model]
+        stats = self.stats.setdefault((agent, model), RouteStats())
+        stats.calls += 1
+        stats.cost += (input_tokens * spec.input_cost + output_tokens * spec.output_cost) / 1000
+        stats.latency_ms.append(ms)
+        return reply
+
+    def report(self):
+        rows = {}
+        for (agent, model), stats in sorted(self.stats.items()):
+            latencies = sorted(stats.latency_ms)
+            rows[f"{agent} -> {model}"] = {
+                "calls": stats.calls,
+                "cost": stats.cost,
+                "p50_ms": statistics.median(latencies),
+                "p95_ms": nearest_rank(latencies, 0.95),
+                "slo_ms": SLO_MS[agent],
+            }
+        return rows
+
+
+def standins(scale=0.01, seed=0):
+    return {name: ModelStandIn(model, scale, seed) for name, model in MODELS.items()}
+
+
+def workload(requests, seed=0):
+    """A check-in wave: mostly monitoring and intervention, some intake, few escalations."""
+    rng = random.Random(seed)
+    mix = (("monitoring_agent", 0.45), ("intervention_agent", 0.3),
+           ("intake_agent", 0.15), ("escalation_agent", 0.1))
+    agents, weights = zip(*mix)
+    for _ in range(requests):
+        agent = rng.choices(agents, weights)[0]
+        trend = rng.choice(("improving", "persisting", "persisting", "worsening"))
+        risk = rng.choices(("low", "moderate", "high"), (0.5, 0.4, 0.1))[0]
+        if agent == "intake_agent":
+            yield agent, {"message": "I took a knock to the head at rugby practice",
+                          "scores": {"risk": risk}}
+        elif agent == "monitoring_agent":
+            yield agent, {"checkin": {"headache": rng.randint(0, 6)}, "baseline": {"severity": 3}}
+        else:
+            yield agent, {"severity": rng.randint(0, 60), "trend": trend, "risk": risk}
+
+
+async def replay(router, requests, concurrency, seed=0):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(agent, payload):
+        async with limit:
+            await router.invoke_agent(agent, payload)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(agent, payload) for agent, payload in workload(requests, seed)))
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.router",
+                                     description="Compare model routing policies on local model stand-ins.")
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=150)
+    parser.add_argument("--scale", type=float, default=0.01,
+                        help="multiplier on simulated model latency")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    policies = (
+        ("single model", Router(standins(args.scale, args.seed),
+                                routes={agent: "sonnet" for agent in ROUTES}, adaptive=False)),
+        ("README routes", Router(standins(args.scale, args.seed), adaptive=False)),
+        ("adaptive", Router(standins(args.scale, args.seed))),
+    )
+    for label, router in policies:
+        seconds = asyncio.run(replay(router, args.requests, args.concurrency, args.seed))
+        report = router.report()
+        total = sum(row["cost"] for row in report.values())
+        print(f"\n{label}: {args.requests} requests in {seconds:.2f}s, {total:,.0f} cost units")
+        print(f"{'route':<42} {'calls':>6} {'cost':>8} {'p50 ms':>8} {'p95 ms':>8} {'SLO':>6}")
+        for route, row in report.items():
+            print(f"{route:<42} {row['calls']:>6} {row['cost']:>8.1f} {row['p50_ms']:>8.0f} "
+                  f"{row['p95_ms']:>8.0f} {row['slo_ms']:>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
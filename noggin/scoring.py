@@ -0,0 +1,171 @@
+# Deterministic intake scoring: SCAT5 symptoms, Glasgow Coma Scale, risk.
+#
+# Scores whole batches of assessments as NumPy arrays, so a multi-site
+# cohort is scored in one pass instead of one LLM conversation per
+# patient. The intake agent is left with what needs a model: interpreting
+# the patient's free text.
+#
+#   python -m noggin.scoring --assessments 1000000
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from .synthetic import SCAT5_SYMPTOMS
+
+GCS_COMPONENTS = ("eye", "verbal", "motor")
+GCS_MIN = np.array([1, 1, 1])
+GCS_MAX = np.array([4, 5, 6])
+SYMPTOM_MAX = 6
+
+RISK_LEVELS = ("low", "moderate", "high", "emergency")
+# GCS 13-15 is mild TBI; 12 or below is moderate/severe and goes straight
+# to the emergency department
+EMERGENCY_GCS = 12
+# SCAT5 symptom severity (0-132) thresholds: a severity above the cut point
+# is in the band
+HIGH_SEVERITY = 60
+MODERATE_SEVERITY = 20
+
+
+def severity_band(severity):
+    """low, moderate or high for a SCAT5 severity, by the risk thresholds."""
+    if severity > HIGH_SEVERITY:
+        return "high"
+    return "moderate" if severity > MODERATE_SEVERITY else "low"
+
+
+def as_arrays(assessments):
+    """Stack assessment dicts into (symptoms, gcs) arrays."""
+    assessments = list(assessments)
+    symptoms = np.array(
+        [[a["symptoms"][name] for name in SCAT5_SYMPTOMS] for a in assessments],
+        dtype=np.int16,
+    ).reshape(len(assessments), len(SCAT5_SYMPTOMS))
+    gcs = np.array(
+        [[a["gcs"][name] for name in GCS_COMPONENTS] for a in assessments],
+        dtype=np.int16,
+    ).reshape(len(assessments), len(GCS_COMPONENTS))
+    return symptoms, gcs
+
+
+def score_batch(symptoms, gcs):
+    """Score n assessments at once.
+
+    symptoms is an (n, 22) array of SCAT5 ratings 0-6 in SCAT5_SYMPTOMS
+    order, gcs an (n, 3) array of eye/verbal/motor responses. Returns
+    arrays of length n: symptom_count (0-22), severity (0-132), gcs (3-15)
+    and risk, an index into RISK_LEVELS.
+    """
+    symptoms = np.asarray(symptoms)
+    gcs = np.asarray(gcs)
+    if symptoms.ndim != 2 or symptoms.shape[1] != len(SCAT5_SYMPTOMS):
+        raise ValueError(f"symptoms must be (n, {len(SCAT5_SYMPTOMS)}), got {symptoms.shape}")
+    if gcs.shape != (symptoms.shape[0], len(GCS_COMPONENTS)):
+        raise ValueError(f"gcs must be ({symptoms.shape[0]}, 3), got {gcs.shape}")
+    if symptoms.size and (symptoms.min() < 0 or symptoms.max() > SYMPTOM_MAX):
+        raise ValueError(f"symptom ratings must be 0-{SYMPTOM_MAX}")
+    if ((gcs < GCS_MIN) | (gcs > GCS_MAX)).any():
+        raise ValueError("GCS components out of range (eye 1-4, verbal 1-5, motor 1-6)")
+
+    symptom_count = np.count_nonzero(symptoms, axis=1)
+    severity = symptoms.sum(axis=1, dtype=np.int32)
+    gcs_total = gcs.sum(axis=1, dtype=np.int32)
+
+    risk = np.zeros(len(severity), dtype=np.int8)
+    risk[severity > MODERATE_SEVERITY] = 1
+    risk[(severity > HIGH_SEVERITY) | (gcs_total < 15)] = 2
+    risk[gcs_total <= EMERGENCY_GCS] = 3
+    return {
+        "symptom_count": symptom_count,
+        "severity": severity,
+        "gcs": gcs_total,
+        "risk": risk,
+    }
+
+
+def score(assessment):
+    """Score a single assessment dict; returns plain Python values."""
+    scores = score_batch(*as_arrays([assessment]))
+    result = {name: int(values[0]) for name, values in scores.items()}
+    result["risk"] = RISK_LEVELS[result["risk"]]
+    return result
+
+
+def score_reference(assessment):
+    """Per-assessment pure-Python scoring, the baseline for the benchmark."""
+    ratings = [assessment["symptoms"][name] for name in SCAT5_SYMPTOMS]
+    severity = sum(ratings)
+    gcs = sum(assessment["gcs"][name] for name in GCS_COMPONENTS)
+    if gcs <= EMERGENCY_GCS:
+        risk = "emergency"
+    elif severity > HIGH_SEVERITY or gcs < 15:
+        risk = "high"
+    elif severity > MODERATE_SEVERITY:
+        risk = "moderate"
+    else:
+        risk = "low"
+    return {
+        "symptom_count": sum(1 for r in ratings if r),
+        "severity": severity,
+        "gcs": gcs,
+        "risk": risk,
+    }
+
+
+def random_batch(n, seed=0):
+    """Random but plausible (symptoms, gcs) arrays for benchmarking."""
+    rng = np.random.default_rng(seed)
+    severity = rng.random((n, 1))
+    symptoms = np.minimum(rng.random((n, len(SCAT5_SYMPTOMS))) * 7 * severity, 6).astype(np.int16)
+    gcs = np.tile(GCS_MAX, (n, 1)).astype(np.int16)
+    impaired = rng.random(n) < 0.05
+    gcs[impaired, 0] = rng.integers(2, 5, impaired.sum())
+    gcs[impaired, 1] = rng.integers(3, 6, impaired.sum())
+    return symptoms, gcs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.scoring",
+                                     description="Benchmark batch SCAT5/GCS scoring.")
+    parser.add_argument("--assessments", type=int, default=1_000_000)
+    parser.add_argument("--reference", type=int, default=20_000,
+                        help="assessments to score one at a time for comparison")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    symptoms, gcs = random_batch(args.assessments, args.seed)
+    started = time.perf_counter()
+    scores = score_batch(symptoms, gcs)
+    batch_seconds = time.perf_counter() - started
+
+    sample = [
+        {"symptoms": dict(zip(SCAT5_SYMPTOMS, map(int, row))),
+         "gcs": dict(zip(GCS_COMPONENTS, map(int, g)))}
+        for row, g in zip(symptoms[:args.reference], gcs[:args.reference])
+    ]
+    started = time.perf_counter()
+    reference = [score_reference(a) for a in sample]
+    reference_seconds = time.perf_counter() - started
+
+    for i, expected in enumerate(reference):
+        if (int(scores["severity"][i]) != expected["severity"]
+                or RISK_LEVELS[scores["risk"][i]] != expected["risk"]):
+            print(f"mismatch at {i}: {expected}", file=sys.stderr)
+            return 1
+
+    batch_rate = args.assessments / batch_seconds
+    reference_rate = len(sample) / reference_seconds if sample else float("nan")
+    print(f"batch:     {args.assessments} assessments in {batch_seconds * 1000:.1f} ms "
+          f"({batch_rate:,.0f}/s)")
+    print(f"reference: {len(sample)} assessments in {reference_seconds * 1000:.1f} ms "
+          f"({reference_rate:,.0f}/s); batch is {batch_rate / reference_rate:.0f}x faster")
+    counts = np.bincount(scores["risk"], minlength=len(RISK_LEVELS))
+    print("risk:      " + ", ".join(f"{level} {count}" for level, count in zip(RISK_LEVELS, counts)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
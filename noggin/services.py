@@ -0,0 +1,167 @@
+# In-process stand-ins for the AWS services in the architecture.
+#
+# Each stand-in has the async surface the pipeline calls and simulates the
+# service's latency with asyncio.sleep, so hundreds of concurrent patients
+# can be pushed through on one machine. Replace any of them with a real
+# client exposing the same coroutines (e.g. a thin boto3/aioboto3 wrapper)
+# to measure the deployed services instead.
+
+import asyncio
+import random
+
+from .events import EventBus
+from .orchestrator import queued
+
+# Typical service latency in milliseconds: (median, spread). Scaled by the
+# "scale" argument so a benchmark can run faster than real time.
+LATENCY_MS = {
+    "network": (15, 5),
+    "bedrock": (1200, 400),
+    "dynamodb": (8, 3),
+    "eventbridge": (25, 10),
+    "transcribe": (900, 300),
+    "polly": (300, 100),
+}
+
+
+class Latency:
+    """Simulated service latency, reproducible for a given seed."""
+
+    def __init__(self, scale=1.0, seed=0):
+        self.scale = scale
+        self.rng = random.Random(seed)
+
+    async def wait(self, service):
+        if self.scale <= 0:
+            # Still yield, so scale=0 measures pure pipeline overhead
+            await asyncio.sleep(0)
+            return
+        median, spread = LATENCY_MS[service]
+        ms = max(0.0, self.rng.gauss(median, spread / 2))
+        await asyncio.sleep(ms * self.scale / 1000)
+
+
+class Bedrock:
+    """Bedrock AgentCore agents backed by canned, deterministic replies."""
+
+    def __init__(self, latency, concurrency=None):
+        self.latency = latency
+        self.limit = asyncio.Semaphore(concurrency) if concurrency else None
+        self.calls = 0
+
+    async def invoke_agent(self, agent, payload):
+        self.calls += 1
+        if self.limit:
+            # Queueing for the quota isn't the call being slow
+            with queued():
+                await self.limit.acquire()
+            try:
+                await self.latency.wait("bedrock")
+            finally:
+                self.limit.release()
+        else:
+            await self.latency.wait("bedrock")
+        return AGENTS[agent](payload)
+
+
+def _intake(payload):
+    # Scores come from noggin.scoring; the agent only reads the free text
+    text = payload["message"].lower()
+    mentions = [word for word in ("vomit", "seizure", "worse", "confused") if word in text]
+    return {"interpretation": "reports " + ", ".join(mentions) if mentions else "no red flags"}
+
+
+def _monitoring(payload):
+    change = sum(payload["checkin"].values()) - payload["baseline"]["severity"]
+    trend = "worsening" if change > 0 else "persisting" if change > -5 else "improving"
+    return {"severity": sum(payload["checkin"].values()), "trend": trend}
+
+
+def _intervention(payload):
+    if payload["trend"] == "improving":
+        plan = "Gradual return to activity, stage 2"
+    else:
+        plan = "Relative rest, reduce screen time, headache diary"
+    return {"plan": plan}
+
+
+def _escalation(payload):
+    return {"escalate": payload["trend"] == "worsening" or payload["risk"] in ("high", "emergency")}
+
+
+AGENTS = {
+    "intake_agent": _intake,
+    "monitoring_agent": _monitoring,
+    "intervention_agent": _intervention,
+    "escalation_agent": _escalation,
+}
+
+
+class DynamoDB:
+    """Patient Data table: items keyed by (pk, sk), partitioned by pk."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.partitions = {}
+
+    async def put_item(self, pk, sk, item):
+        await self.latency.wait("dynamodb")
+        self.partitions.setdefault(pk, {})[sk] = dict(item)
+
+    async def get_item(self, pk, sk):
+        await self.latency.wait("dynamodb")
+        return self.partitions.get(pk, {}).get(sk)
+
+    async def query(self, pk):
+        """Every item in a partition, in sort key order."""
+        await self.latency.wait("dynamodb")
+        partition = self.partitions.get(pk, {})
+        return [partition[sk] for sk in sorted(partition)]
+
+
+class Transcribe:
+    """Transcribe Medical: audio in, transcript out."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def transcribe(self, audio):
+        await self.latency.wait("transcribe")
+        return {"transcript": audio.get("utterance", ""), "medical_terms": []}
+
+
+class Polly:
+    """Polly neural TTS: text in, audio out."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def synthesize(self, text):
+        await self.latency.wait("polly")
+        return {"audio": text.encode(), "voice": "Amy", "engine": "neural"}
+
+
+class Services:
+    """The set of services a pipeline runs against."""
+
+    def __init__(self, bedrock, dynamodb, eventbridge, transcribe, polly, latency):
+        self.bedrock = bedrock
+        self.dynamodb = dynamodb
+        self.eventbridge = eventbridge
+        self.transcribe = transcribe
+        self.polly = polly
+        # Network hops between clients, API Gateway and the Lambdas
+        self.latency = latency
+
+
+def standins(scale=1.0, seed=0, bedrock_concurrency=None):
+    """Services backed entirely by the in-process stand-ins."""
+    latency = Latency(scale, seed)
+    return Services(
+        bedrock=Bedrock(latency, bedrock_concurrency),
+        dynamodb=DynamoDB(latency),
+        eventbridge=EventBus(latency),
+        transcribe=Transcribe(latency),
+        polly=Polly(latency),
+        latency=latency,
+    )
@@ -0,0 +1,289 @@
+# Per-patient symptom time series in preallocated arrays.
+#
+# Step 6 stores a symptom baseline and step 8 compares every check-in with
+# it. Instead of re-reading a patient's history on each check-in, every
+# tracked patient owns one row in a set of fixed-shape NumPy arrays:
+#
+#   baseline   the intake SCAT5 vector
+#   history    a ring buffer of the last WINDOW check-ins (uint8 ratings)
+#   stats      running mean and squared deviations (Welford) plus the
+#              sums for a least-squares slope against the day
+#   streak     consecutive check-ins each symptom has been present
+#
+# A check-in touches one row, so updating and scoring it costs the same on
+# day 2 as on day 200. The same arrays are what the escalation sweep
+# (noggin.escalation) reads for the whole cohort at once.
+#
+#   python -m noggin.symptoms --patients 100000 --days 30
+
+import argparse
+import resource
+import sys
+import time
+
+import numpy as np
+
+from .synthetic import SCAT5_SYMPTOMS
+
+SYMPTOMS = len(SCAT5_SYMPTOMS)
+INDEX = {name: i for i, name in enumerate(SCAT5_SYMPTOMS)}
+# Check-ins kept verbatim per patient; statistics cover the full history
+WINDOW = 32
+
+
+class SymptomStore:
+    """Fixed-width symptom vectors and running statistics, one row per patient."""
+
+    # Per-symptom running statistics, stacked so a check-in updates one block
+    MEAN, M2, SY, SXY = range(4)
+    ARRAYS = ("baseline", "severity0", "history", "days", "count", "xsums", "stats", "streak")
+
+    def __init__(self, capacity=1024, window=WINDOW):
+        self.window = window
+        self.rows = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        arrays = {
+            "baseline": np.zeros((capacity, SYMPTOMS), np.uint8),
+            "severity0": np.zeros(capacity, np.int32),
+            "history": np.zeros((capacity, self.window, SYMPTOMS), np.uint8),
+            "days": np.zeros((capacity, self.window), np.int32),
+            "count": np.zeros(capacity, np.int32),
+            # sum of days and of squared days, for the slope
+            "xsums": np.zeros((capacity, 2), np.float64),
+            "stats": np.zeros((capacity, 4, SYMPTOMS), np.float64),
+            "streak": np.zeros((capacity, SYMPTOMS), np.uint16),
+        }
+        if self.rows:
+            # Grow by copying the used rows; amortised O(1) per patient
+            used = len(self.rows)
+            for name, array in arrays.items():
+                array[:used] = getattr(self, name)[:used]
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def admit(self, patient_id, baseline, day=0):
+        """Start tracking a patient from their intake symptoms (step 6)."""
+        if patient_id in self.rows:
+            raise KeyError(f"patient {patient_id!r} is already tracked")
+        if len(self.rows) == self.capacity:
+            self._allocate(self.capacity * 2)
+        row = self.rows[patient_id] = len(self.rows)
+        vector = _vector(baseline)
+        self.baseline[row] = vector
+        self.severity0[row] = int(vector.sum())
+        self.checkin(patient_id, day, vector)
+        return row
+
+    def admit_many(self, patient_ids, baselines, day=0):
+        """admit() for many new patients at once."""
+        patient_ids = list(patient_ids)
+        baselines = np.asarray(baselines, np.uint8).reshape(len(patient_ids), SYMPTOMS)
+        first = len(self.rows)
+        capacity = self.capacity
+        while capacity < first + len(patient_ids):
+            capacity *= 2
+        if capacity != self.capacity:
+            self._allocate(capacity)
+        for offset, patient_id in enumerate(patient_ids):
+            if patient_id in self.rows:
+                raise KeyError(f"patient {patient_id!r} is already tracked")
+            self.rows[patient_id] = first + offset
+        rows = slice(first, first + len(patient_ids))
+        self.baseline[rows] = baselines
+        self.severity0[rows] = baselines.sum(axis=1, dtype=np.int32)
+        self.checkin_many(patient_ids, day, baselines)
+
+    def checkin(self, patient_id, day, symptoms):
+        """Record one check-in and score it against the patient's history.
+
+        symptoms is a dict of SCAT5 ratings or a 22-long vector. Returns the
+        severity, change from baseline, per-symptom z-scores against the
+        running mean, per-symptom slopes (rating per day) and streaks.
+        """
+        row = self.rows[patient_id]
+        vector = _vector(symptoms)
+        n = int(self.count[row]) + 1
+        self.count[row] = n
+        mean, m2, sy, sxy = self.stats[row]
+        # day * a uint8 rating wraps past 255 (a 6 on day 43)
+        values = vector.astype(np.float64)
+
+        # Running mean and variance (Welford), slope sums with x = day
+        delta = values - mean
+        mean += delta / n
+        m2 += delta * (values - mean)
+        sy += values
+        sxy += day * values
+        xsums = self.xsums[row]
+        xsums += (day, day * day)
+
+        slot = (n - 1) % self.window
+        self.history[row, slot] = vector
+        self.days[row, slot] = day
+        streak = self.streak[row]
+        streak += 1
+        streak[vector == 0] = 0
+
+        severity = int(vector.sum())
+        std = np.sqrt(m2 / max(n - 1, 1))
+        std[std == 0] = np.inf
+        return {
+            "severity": severity,
+            "change": severity - int(self.severity0[row]),
+            "zscore": (vector - mean) / std,
+            "slope": self._slopes(n, xsums, sy, sxy),
+            "streak": streak.copy(),
+        }
+
+    def checkin_many(self, patient_ids, day, vectors):
+        """Record one check-in each for many distinct patients on the same day.
+
+        The vectorised form of checkin() for the morning check-in burst;
+        returns arrays of severity, change from baseline and per-symptom
+        slopes, one row per patient.
+        """
+        rows = np.fromiter((self.rows[p] for p in patient_ids), np.intp, len(patient_ids))
+        vectors = np.asarray(vectors, np.uint8).reshape(len(rows), SYMPTOMS)
+        n = self.count[rows] + 1
+        self.count[rows] = n
+
+        stats = self.stats[rows]
+        values = vectors.astype(np.float64)
+        mean = stats[:, self.MEAN]
+        delta = values - mean
+        mean += delta / n[:, None]
+        stats[:, self.M2] += delta * (values - mean)
+        stats[:, self.SY] += values
+        stats[:, self.SXY] += day * values
+        self.stats[rows] = stats
+        xsums = self.xsums[rows] + (day, day * day)
+        self.xsums[rows] = xsums
+
+        slots = (n - 1) % self.window
+        self.history[rows, slots] = vectors
+        self.days[rows, slots] = day
+        streak = self.streak[rows] + 1
+        streak[vectors == 0] = 0
+        self.streak[rows] = streak
+
+        severity = vectors.sum(axis=1, dtype=np.int32)
+        sx, sxx = xsums[:, 0:1], xsums[:, 1:2]
+        denominator = n[:, None] * sxx - sx * sx
+        slope = np.divide(n[:, None] * stats[:, self.SXY] - sx * stats[:, self.SY], denominator,
+                          out=np.zeros((len(rows), SYMPTOMS)), where=denominator > 0)
+        return {"severity": severity, "change": severity - self.severity0[rows], "slope": slope}
+
+    def slopes(self, patient_id):
+        """Per-symptom least-squares slope (rating per day) over the full history."""
+        row = self.rows[patient_id]
+        return self._slopes(int(self.count[row]), self.xsums[row], *self.stats[row, self.SY:])
+
+    @staticmethod
+    def _slopes(n, xsums, sy, sxy):
+        sx, sxx = xsums
+        denominator = n * sxx - sx * sx
+        if denominator <= 0:
+            return np.zeros(SYMPTOMS)
+        return (n * sxy - sx * sy) / denominator
+
+    def recent(self, patient_id):
+        """(days, vectors) for the last WINDOW check-ins, oldest first."""
+        row = self.rows[patient_id]
+        n = min(int(self.count[row]), self.window)
+        order = [(int(self.count[row]) - n + i) % self.window for i in range(n)]
+        return self.days[row, order], self.history[row, order]
+
+
+def _vector(symptoms):
+    if isinstance(symptoms, dict):
+        vector = np.zeros(SYMPTOMS, np.uint8)
+        for name, rating in symptoms.items():
+            vector[INDEX[name]] = rating
+        return vector
+    vector = np.asarray(symptoms, dtype=np.uint8)
+    if vector.shape != (SYMPTOMS,):
+        raise ValueError(f"expected {SYMPTOMS} symptom ratings, got shape {vector.shape}")
+    return vector
+
+
+def _naive_checkin(history, day, vector):
+    # What step 8 costs without the store: re-read and recompute everything
+    history.append((day, vector))
+    days = np.array([d for d, _ in history], np.float64)
+    values = np.array([v for _, v in history], np.float32)
+    mean = values.mean(axis=0)
+    std = values.std(axis=0, ddof=1) if len(history) > 1 else np.zeros(SYMPTOMS)
+    slope = np.polyfit(days, values, 1)[0] if len(history) > 1 else np.zeros(SYMPTOMS)
+    return mean, std, slope
+
+
+def _rss_bytes():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m noggin.symptoms",
+                                     description="Benchmark per-patient symptom tracking.")
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    ids = [f"p{i:07d}" for i in range(args.patients)]
+    vectors = rng.integers(0, 7, (64, SYMPTOMS), dtype=np.uint8)
+
+    rss_before = _rss_bytes()
+    store = SymptomStore(capacity=args.patients)
+    started = time.perf_counter()
+    for i, pid in enumerate(ids):
+        store.admit(pid, vectors[i % 64])
+    admit_seconds = time.perf_counter() - started
+    rss_after = _rss_bytes()
+
+    # Time check-ins early and late in a sample of patients' histories: the
+    # cost must not grow with history length
+    sample = ids[:min(2000, args.patients)]
+    timings = []
+    for day in range(1, args.days + 1):
+        started = time.perf_counter()
+        for j, pid in enumerate(sample):
+            store.checkin(pid, day, vectors[(j + day) % 64])
+        timings.append((time.perf_counter() - started) / len(sample))
+    early, late = np.median(timings[:5]), np.median(timings[-5:])
+
+    batch = np.resize(vectors, (args.patients, SYMPTOMS))
+    started = time.perf_counter()
+    store.checkin_many(ids, args.days + 1, batch)
+    batch_seconds = (time.perf_counter() - started) / args.patients
+
+    naive = {}
+    for days in (2, args.days):
+        history = [(d, vectors[d % 64]) for d in range(days - 1)]
+        started = time.perf_counter()
+        for _ in range(200):
+            _naive_checkin(list(history), days, vectors[0])
+        naive[days] = (time.perf_counter() - started) / 200
+
+    per_patient = store.nbytes() / store.capacity
+    print(f"{args.patients} patients admitted in {admit_seconds:.2f}s")
+    print(f"array memory:   {per_patient:.0f} bytes/patient "
+          f"(+ {(len(store.rows) and sys.getsizeof(store.rows) / len(store.rows)):.0f} index)")
+    print(f"resident (RSS): {max(rss_after - rss_before, 0) / args.patients:.0f} bytes/patient")
+    print(f"check-in:       {early * 1e6:.1f} us in days 1-5, {late * 1e6:.1f} us in the last 5 days")
+    print(f"batch check-in: {batch_seconds * 1e6:.2f} us per patient ({args.patients} at once)")
+    print(f"naive re-read:  {naive[2] * 1e6:.1f} us at 2 check-ins, "
+          f"{naive[args.days] * 1e6:.1f} us at {args.days}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
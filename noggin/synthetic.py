@@ -0,0 +1,67 @@
+# Synthetic patients for benchmarks and stand-ins.
+#
+# Every patient is generated from (seed, index) alone, so a benchmark run is
+# reproducible and any patient can be regenerated without keeping the
+# cohort in memory.
+
+import random
+
+# SCAT5 symptom evaluation: 22 symptoms, each rated 0 (none) to 6 (severe)
+SCAT5_SYMPTOMS = (
+    "headache",
+    "pressure_in_head",
+    "neck_pain",
+    "nausea_or_vomiting",
+    "dizziness",
+    "blurred_vision",
+    "balance_problems",
+    "sensitivity_to_light",
+    "sensitivity_to_noise",
+    "feeling_slowed_down",
+    "feeling_in_a_fog",
+    "dont_feel_right",
+    "difficulty_concentrating",
+    "difficulty_remembering",
+    "fatigue_or_low_energy",
+    "confusion",
+    "drowsiness",
+    "more_emotional",
+    "irritability",
+    "sadness",
+    "nervous_or_anxious",
+    "trouble_falling_asleep",
+)
+
+# Contact channels from step 1 and their share of patients
+CHANNELS = {"whatsapp": 0.5, "sms": 0.15, "voice": 0.15, "app": 0.2}
+
+
+def patient(index, seed=0):
+    """One synthetic patient: intake assessment plus a day-5 check-in."""
+    rng = random.Random(f"{seed}:{index}")
+    severity = rng.random()
+    symptoms = {
+        name: min(6, int(rng.random() * 7 * severity))
+        for name in SCAT5_SYMPTOMS
+    }
+    # Most patients improve by day 5; some don't
+    trend = rng.choice((-2, -1, -1, -1, 0, 0, 1))
+    checkin = {name: max(0, min(6, score + trend)) for name, score in symptoms.items()}
+    return {
+        "patient_id": f"p{seed}-{index:06d}",
+        "channel": rng.choices(list(CHANNELS), weights=list(CHANNELS.values()))[0],
+        "message": "I took a knock to the head at rugby practice",
+        # Glasgow Coma Scale components: eye 1-4, verbal 1-5, motor 1-6
+        "gcs": {
+            "eye": 4 if severity < 0.9 else rng.randint(3, 4),
+            "verbal": 5 if severity < 0.8 else rng.randint(4, 5),
+            "motor": 6,
+        },
+        "symptoms": symptoms,
+        "checkin": checkin,
+    }
+
+
+def cohort(size, seed=0):
+    for index in range(size):
+        yield patient(index, seed)
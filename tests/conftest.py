@@ -0,0 +1,10 @@
+# The noggin package imports from the repo root; the diagram scripts in
+# Utils/ import each other as top-level modules.
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "Utils")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
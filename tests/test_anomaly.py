@@ -0,0 +1,37 @@
+import asyncio
+
+import numpy as np
+
+from noggin.anomaly import AnomalyDetector, AnomalyStream
+from noggin.events import EventBus
+from noggin.symptoms import SYMPTOMS
+
+
+def test_detector_grows_past_capacity():
+    detector = AnomalyDetector(capacity=4)
+    ids = [f"p{i}" for i in range(5)]
+    vectors = np.arange(5)[:, None] * np.ones(SYMPTOMS)
+    detector.update(ids, vectors)
+    detector.update(ids[:4], vectors[:4])
+    assert detector.capacity == 8
+    assert list(detector.count[:6]) == [2, 2, 2, 2, 1, 0]
+    np.testing.assert_allclose(detector.mean[4], 4)
+
+
+def test_drain_waits_for_the_batch_being_scored():
+    class SlowStream(AnomalyStream):
+        async def _score(self, events):
+            await asyncio.sleep(0.1)
+            await super()._score(events)
+
+    async def replay():
+        bus = EventBus()
+        stream = SlowStream(bus, max_delay=0.001)
+        consumer = asyncio.ensure_future(stream.run())
+        for i in range(10):
+            await bus.put_event("checkin-recorded", {"patient_id": f"p{i}", "symptoms": [1] * SYMPTOMS})
+        await stream.drain()
+        consumer.cancel()
+        return stream.processed
+
+    assert asyncio.run(replay()) == 10
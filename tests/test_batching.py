@@ -0,0 +1,55 @@
+import asyncio
+
+from noggin.batching import OUTPUT_TOKENS, MicroBatcher, MonitoringModel, wave
+
+
+class DroppingModel(MonitoringModel):
+    """Drops every batch line; records output tokens and overlapping retries."""
+
+    def __init__(self):
+        super().__init__(scale=0.001, drop_rate=1.0)
+        self.output_tokens = []
+        self.running = 0
+        self.most_running = 0
+
+    async def _generate(self, prompt, output_tokens):
+        self.output_tokens.append(output_tokens)
+        await super()._generate(prompt, output_tokens)
+
+    async def analyze(self, checkin):
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        try:
+            return await super().analyze(checkin)
+        finally:
+            self.running -= 1
+
+
+def test_missing_items_are_retried_concurrently():
+    model = DroppingModel()
+
+    async def replay():
+        batcher = MicroBatcher(model, max_batch=4, max_wait=0.001)
+        return await asyncio.gather(*(batcher.analyze(c) for c in wave(4)))
+
+    results = asyncio.run(replay())
+    assert all("trend" in result for result in results)
+    assert model.most_running == 4
+    # One batch of 4, then 4 single calls: the same tokens per check-in
+    assert model.output_tokens == [4 * OUTPUT_TOKENS] + [OUTPUT_TOKENS] * 4
+
+
+def test_cancelled_caller_does_not_break_the_retry():
+    model = DroppingModel()
+
+    async def replay():
+        batcher = MicroBatcher(model, max_batch=2, max_wait=0.001)
+        first, second = (asyncio.ensure_future(batcher.analyze(c)) for c in wave(2))
+        while not model.running:
+            await asyncio.sleep(0)
+        first.cancel()
+        result = await second
+        await asyncio.gather(*batcher.sending)
+        return result
+
+    assert "trend" in asyncio.run(replay())
@@ -0,0 +1,46 @@
+import asyncio
+
+from noggin.cache import ResponseCache
+from noggin.services import AGENTS
+
+
+def test_intake_is_never_served_from_cache():
+    calls = []
+
+    async def invoke(agent, payload):
+        calls.append(payload["message"])
+        return AGENTS[agent](payload)
+
+    message = "I took a knock to the head at rugby practice"
+    cache = ResponseCache()
+
+    async def replay():
+        scores = {"risk": "moderate"}
+        replies = []
+        for text in (message, message, message + " and had a seizure"):
+            replies.append(await cache.call("intake_agent", {"message": text, "scores": scores}, invoke))
+        return replies
+
+    replies = asyncio.run(replay())
+    assert [reply["interpretation"] for reply in replies] == ["no red flags", "no red flags", "reports seizure"]
+    # Even the exact repeat goes to the model
+    assert len(calls) == 3
+    assert cache.report()["intake_agent"]["uncached"] == 3
+    assert not cache.entries
+
+
+def test_intervention_replies_are_cached_by_band():
+    calls = []
+
+    async def invoke(agent, payload):
+        calls.append(payload)
+        return AGENTS[agent](payload)
+
+    async def replay():
+        cache = ResponseCache()
+        for severity in (25, 40, 61):
+            await cache.call("intervention_agent", {"trend": "persisting", "risk": "moderate",
+                                                    "severity": severity}, invoke)
+
+    asyncio.run(replay())
+    assert [payload["severity"] for payload in calls] == [25, 61]
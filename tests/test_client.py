@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from noggin.client import AIMDLimiter, ModelClient, TokenBudget
+
+
+def test_cancelled_waiter_hands_its_grant_on():
+    async def scenario():
+        limiter = AIMDLimiter(initial=1)
+        await limiter.acquire(0)
+        first = asyncio.ensure_future(limiter.acquire(1))
+        second = asyncio.ensure_future(limiter.acquire(2))
+        await asyncio.sleep(0)
+        # The slot goes to first, which is cancelled before it runs
+        limiter.release(False, 0.01)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        await asyncio.wait_for(second, 1)
+        return limiter.inflight
+
+    assert asyncio.run(scenario()) == 1
+
+
+class HangingModel:
+    tokens_per_minute = 600_000
+    scale = 1.0
+
+    async def invoke(self, connection, agent, payload, input_tokens, output_tokens):
+        await asyncio.sleep(60)
+
+
+def test_cancelled_call_releases_its_slot_without_a_success():
+    async def scenario():
+        client = ModelClient({"sonnet": HangingModel()})
+        limiter = client.limiters["sonnet"]
+        limit = limiter.limit
+        call = asyncio.ensure_future(client.invoke_agent("monitoring_agent", {"checkin": {}}))
+        await asyncio.sleep(0.01)
+        assert limiter.inflight == 1
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        return limiter.inflight, limiter.limit - limit, len(client.pool.idle)
+
+    assert asyncio.run(scenario()) == (0, 0, 0)
+
+
+def test_budget_rejects_more_than_its_burst():
+    budget = TokenBudget(600)
+    with pytest.raises(ValueError):
+        asyncio.run(budget.take(101))
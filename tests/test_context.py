@@ -0,0 +1,59 @@
+import random
+
+from noggin.context import AGENT_LINES, BUDGETS, PATIENT_LINES, Context, render_state, tokens
+
+
+def conversation(context, days, rng):
+    """Yield (message, prompt) for a long monitoring conversation."""
+    for day in range(1, days + 1):
+        for _ in range(8):
+            message = " ".join(rng.choice(PATIENT_LINES) for _ in range(rng.randint(1, 4)))
+            message = message.format(n=rng.randint(1, 6))
+            prompt, _ = context.prompt(message)
+            yield message, prompt
+            context.add("patient", message, day)
+            context.add("agent", " ".join(rng.sample(AGENT_LINES, rng.randint(1, 4))), day)
+
+
+def full_state(budget):
+    # A header that takes up the whole state allowance
+    state = {"risk": "moderate", "trend": "worsening", "red_flags": "repeated vomiting"}
+    state["plan"] = ""
+    state["plan"] = "x" * (4 * budget.state - len(render_state(state)))
+    assert tokens(render_state(state)) == budget.state
+    return state
+
+
+def test_compacted_prompt_fits_the_budget():
+    for agent, budget in BUDGETS.items():
+        for seed in range(5):
+            context = Context(agent)
+            context.update_state(**full_state(budget))
+            for _, prompt in conversation(context, 30, random.Random(seed)):
+                assert tokens(prompt) <= budget.total, agent
+            assert context.compactions
+
+
+def test_recent_turns_are_kept_verbatim():
+    context = Context("monitoring_agent")
+    added = []
+    for message, _ in conversation(context, 20, random.Random(0)):
+        added.append(message)
+    prompt, _ = context.prompt("still a headache")
+    assert context.compactions
+    # The newest turns, unabridged and in order, right before the state header
+    kept = [text for role, text, _ in context.turns if role == "patient"]
+    assert kept and kept == added[-len(kept):]
+    recent = "\n".join(f"{role}: {text}" for role, text, _ in context.turns)
+    assert prompt.index(recent) + len(recent) + 2 == prompt.index(render_state(context.state))
+
+
+def test_red_flags_and_state_header_survive_compaction():
+    context = Context("monitoring_agent")
+    context.update_state(day=1, risk="high", red_flags="worsening headache; repeated vomiting",
+                         severity=41, trend="worsening")
+    for message, prompt in conversation(context, 20, random.Random(2)):
+        assert "red_flags=worsening headache; repeated vomiting" in prompt
+        # Last before the new message, after everything cacheable
+        assert prompt.endswith(render_state(context.state) + f"\n\npatient: {message}")
+    assert context.compactions > 1
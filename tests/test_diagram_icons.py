@@ -0,0 +1,12 @@
+from diagram_icons import ICON_HEIGHT, box_pixels, icon_node_attrs
+
+
+def test_icon_box_uses_variant_width_and_diagrams_height():
+    attrs = icon_node_attrs({"width": "2.2", "height": "1.3"}, {}, "Lambda\nIntake")
+    # diagrams' own icon height (padded for the second label line) beats the variant default
+    assert box_pixels(attrs, {"dpi": "100"}) == (220, round((ICON_HEIGHT + 0.4) * 100))
+
+
+def test_icon_box_honours_node_attrs():
+    attrs = icon_node_attrs({"width": "2.2"}, {"height": "1.0", "width": "1.5"}, "API")
+    assert box_pixels(attrs, {"dpi": "100"}) == (150, 100)
@@ -0,0 +1,16 @@
+import sys
+
+import pytest
+
+import diagram_render
+
+
+def test_node_class_times_lazy_provider_imports(monkeypatch):
+    pytest.importorskip("diagrams")
+    name = next(name for name, module in diagram_render.NODE_CLASSES.items() if module != "diagrams")
+    module = diagram_render.NODE_CLASSES[name]
+    monkeypatch.delitem(sys.modules, module, raising=False)
+    monkeypatch.setattr(diagram_render, "PROVIDER_IMPORT_MS", {})
+    cls = diagram_render.node_class(name)
+    assert cls.__name__ == name
+    assert diagram_render.PROVIDER_IMPORT_MS[module] > 0
@@ -0,0 +1,66 @@
+import itertools
+import json
+import math
+import random
+
+import diagram_traces
+from diagram_traces import GROWTH, Histogram, aggregate, summarize
+
+
+def exact(values, q):
+    values = sorted(values)
+    return values[max(math.ceil(q * len(values)) - 1, 0)]
+
+
+def test_quantile_is_within_half_a_bucket_of_the_exact_value():
+    rng = random.Random(0)
+    values = [rng.lognormvariate(3, 1.5) for _ in range(20000)]
+    histogram = Histogram()
+    for ms in values:
+        histogram.add(ms)
+    # The geometric middle of a bucket is at most sqrt(GROWTH) from anything in it
+    bound = math.sqrt(GROWTH) * (1 + 1e-9)
+    for q in (0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 0.999, 1.0):
+        ratio = histogram.quantile(q) / exact(values, q)
+        assert 1 / bound <= ratio <= bound, q
+    assert histogram.quantile(1.0) <= max(values)
+    assert Histogram().quantile(0.5) is None
+
+
+def test_aggregate_over_several_trace_files(tmp_path):
+    rng = random.Random(1)
+    durations = {"3": [], "10a": []}
+    paths = []
+    for part in range(3):
+        path = tmp_path / f"trace-{part}.jsonl"
+        with open(path, "w", encoding="utf-8") as out:
+            for _ in range(500):
+                step = rng.choice(list(durations))
+                ms = rng.uniform(1, 400)
+                durations[step].append(ms)
+                if part % 2:
+                    start = 1_700_000_000_000_000_000
+                    span = {"attributes": {diagram_traces.STEP_ATTRIBUTE: step},
+                            "start_time_unix_nano": start,
+                            "end_time_unix_nano": start + round(ms * 1e6)}
+                else:
+                    span = {"step": step, "duration_ms": ms}
+                out.write(json.dumps(span) + "\n")
+            out.write("not json\n\n")
+        paths.append(path)
+
+    files = [open(path, encoding="utf-8") for path in paths]
+    try:
+        histograms, skipped = aggregate(itertools.chain.from_iterable(files))
+    finally:
+        for f in files:
+            f.close()
+
+    assert skipped == 6
+    stats = summarize(histograms)
+    bound = math.sqrt(GROWTH) * (1 + 1e-6)
+    for step, values in durations.items():
+        assert stats[step]["count"] == len(values)
+        assert math.isclose(stats[step]["mean"], sum(values) / len(values), rel_tol=1e-6)
+        for q, key in ((0.5, "p50"), (0.95, "p95")):
+            assert 1 / bound <= stats[step][key] / exact(values, q) <= bound
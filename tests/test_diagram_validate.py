@@ -0,0 +1,26 @@
+import time
+
+import diagram_spec
+import diagram_validate
+
+
+def test_real_spec_has_no_errors():
+    started = time.perf_counter()
+    issues = diagram_validate.validate()
+    elapsed = time.perf_counter() - started
+    assert [issue for issue in issues if issue[0] == "error"] == []
+    # Fast enough to run on every test run
+    assert elapsed < 1.0
+
+
+def test_unknown_node_in_flow_is_an_error(monkeypatch):
+    monkeypatch.setattr(diagram_spec, "FLOWS", diagram_spec.FLOWS + [("api", "nowhere", "")])
+    monkeypatch.setattr(diagram_validate, "FLOWS", diagram_spec.FLOWS)
+    issues = diagram_validate.check_spec()
+    assert any("unknown node 'nowhere'" in message for _, _, message in issues)
+
+
+def test_step_of_reads_plain_and_html_labels():
+    assert diagram_validate.step_of("10a. Generate response") == "10a"
+    assert diagram_validate.step_of("<<b>3. Route request</b>>") == "3"
+    assert diagram_validate.step_of("reads") is None
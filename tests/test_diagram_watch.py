@@ -0,0 +1,23 @@
+import diagram_render
+import diagram_watch
+
+
+def test_failed_render_is_retried(monkeypatch):
+    monkeypatch.setattr(diagram_watch, "fingerprint", lambda name: "v1")
+    calls = []
+
+    def render_all(names, **kwargs):
+        calls.append(list(names))
+        if len(calls) == 1:
+            raise RuntimeError("graphviz failed")
+        return {name: {"layout": "fresh"} for name in names}
+
+    monkeypatch.setattr(diagram_render, "render_all", render_all)
+    watcher = diagram_watch.Watcher(["final"])
+    try:
+        watcher._rebuild(set())
+    except RuntimeError:
+        pass
+    watcher._rebuild(set())
+    watcher._rebuild(set())
+    assert calls == [["final"], ["final"]]
@@ -0,0 +1,47 @@
+import asyncio
+
+import numpy as np
+
+from noggin.escalation import (BORDERLINE, WORSENING_SLOPE, _reference, forward_borderline,
+                               sweep, synthetic_store)
+from noggin.scoring import severity_band
+from noggin.symptoms import SYMPTOMS, SymptomStore
+
+
+def test_sweep_matches_reference_past_day_42():
+    store = synthetic_store(300, 60)
+    np.testing.assert_array_equal(sweep(store)["decision"], _reference(store))
+
+
+def test_sweep_slope_matches_polyfit_past_day_42():
+    days = np.arange(60)
+    rng = np.random.default_rng(1)
+    ratings = rng.integers(3, 7, (3, len(days), SYMPTOMS)).astype(np.uint8)
+    store = SymptomStore(capacity=3)
+    store.admit_many(["a", "b", "c"], ratings[:, 0])
+    for day in days[1:]:
+        store.checkin_many(["a", "b", "c"], int(day), ratings[:, day])
+    totals = ratings.sum(axis=2, dtype=np.int64).astype(np.float64)
+    expected = [np.polyfit(days, total, 1)[0] for total in totals]
+    np.testing.assert_allclose(sweep(store)["slope"], expected, atol=1e-6)
+
+
+def test_forwarded_payload_uses_the_sweep_thresholds():
+    store = synthetic_store(500, 12)
+    result = sweep(store)
+    rows = np.flatnonzero(result["decision"] == BORDERLINE)
+    assert len(rows)
+
+    class Bedrock:
+        async def invoke_agent(self, agent, payload):
+            # Echoed back as the decision, so it comes back keyed by patient
+            return {"escalate": payload}
+
+    payloads = asyncio.run(forward_borderline(store, result, Bedrock()))
+    ids = list(store.rows)
+    assert sorted(payloads) == sorted(ids[row] for row in rows)
+    for row in rows:
+        payload = payloads[ids[row]]
+        latest = store.recent(ids[row])[1][-1]
+        assert (payload["trend"] == "worsening") == (result["slope"][row] > WORSENING_SLOPE)
+        assert payload["risk"] == severity_band(int(latest.sum()))
@@ -0,0 +1,28 @@
+import asyncio
+
+from noggin.events import EventBus
+
+
+def test_poison_event_is_dead_lettered_alone():
+    async def replay():
+        bus = EventBus()
+        delivered = []
+
+        async def target(events):
+            if any(event["detail"]["poison"] for event in events):
+                raise RuntimeError("bad event")
+            delivered.extend(event["detail"]["n"] for event in events)
+
+        bus.put_rule("checkins", {"detail-type": ["checkin-recorded"]}, target,
+                     batch_size=10, max_wait=0.01)
+        futures = []
+        await bus.put_events([{"detail-type": "checkin-recorded", "detail": {"n": n, "poison": n == 3}}
+                              for n in range(10)], futures)
+        await bus.drain()
+        bus.close()
+        return bus, delivered, futures
+
+    bus, delivered, futures = asyncio.run(replay())
+    assert sorted(delivered) == [n for n in range(10) if n != 3]
+    assert [[event["detail"]["n"] for event in d["events"]] for d in bus.dead_letters] == [[3]]
+    assert [future.exception() is not None for future in futures] == [n == 3 for n in range(10)]
@@ -0,0 +1,80 @@
+import asyncio
+from collections import deque
+
+from noggin.hedging import HedgedBedrock
+
+
+class Endpoint:
+    def __init__(self, fail=False, seconds=0.0):
+        self.fail = fail
+        self.seconds = seconds
+        self.calls = 0
+
+    async def invoke_agent(self, agent, payload):
+        self.calls += 1
+        await asyncio.sleep(self.seconds)
+        if self.fail:
+            raise RuntimeError("primary down")
+        return {"agent": agent}
+
+
+def test_hedges_stay_within_the_ratio():
+    client = HedgedBedrock(Endpoint(fail=True), Endpoint(), ratio=0.05)
+
+    async def replay():
+        for _ in range(400):
+            try:
+                await client.invoke_agent("intake_agent", {})
+            except RuntimeError:
+                pass
+
+    asyncio.run(replay())
+    report = client.report()["intake_agent"]
+    assert report["hedged"] <= 0.05 * report["calls"]
+    assert report["hedged"] == 20
+
+
+def test_only_answered_primary_calls_are_latency_samples():
+    client = HedgedBedrock(Endpoint(fail=True), Endpoint(), ratio=1.0)
+
+    async def replay():
+        for _ in range(5):
+            await client.invoke_agent("intake_agent", {})
+        client.primary = Endpoint(seconds=0.001)
+        await client.invoke_agent("intake_agent", {})
+        await asyncio.sleep(0)
+
+    asyncio.run(replay())
+    assert len(client.observed["intake_agent"]) == 1
+
+
+def test_a_primary_cancelled_by_the_hedge_is_a_lower_bound_sample():
+    client = HedgedBedrock(Endpoint(seconds=0.001), Endpoint(), ratio=1.0, min_samples=3)
+
+    async def replay():
+        for _ in range(3):
+            await client.invoke_agent("intake_agent", {})
+        delay = client.delay("intake_agent")
+        client.primary = Endpoint(seconds=1.0)
+        await client.invoke_agent("intake_agent", {})
+        await asyncio.sleep(0)
+        return delay
+
+    delay = asyncio.run(replay())
+    observed = client.observed["intake_agent"]
+    assert client.report()["intake_agent"]["secondary_wins"] == 1
+    assert len(observed) == 4
+    assert delay <= observed[-1] < 1.0
+
+
+def test_delay_is_recomputed_every_refresh_samples():
+    client = HedgedBedrock(Endpoint(), Endpoint(), quantile=0.5, min_samples=3, refresh=4)
+    client.observed["intake_agent"] = deque(maxlen=100)
+    for seconds in (0.1, 0.2, 0.3):
+        client._observe("intake_agent", seconds)
+    assert client.delay("intake_agent") == 0.2
+    for _ in range(3):
+        client._observe("intake_agent", 5.0)
+    assert client.delay("intake_agent") == 0.2
+    client._observe("intake_agent", 5.0)
+    assert client.delay("intake_agent") == 5.0
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from noggin.orchestrator import Node, NodeTimeout, execute, queued
+
+
+async def value(results):
+    return 1
+
+
+def broken(results):
+    raise KeyError("escalate")
+
+
+def test_raising_predicate_fails_a_required_node():
+    nodes = [Node("a", value), Node("b", value, after=("a",), when=broken), Node("c", value, after=("b",))]
+    with pytest.raises(KeyError):
+        asyncio.run(asyncio.wait_for(execute(nodes), 1))
+
+
+def test_raising_predicate_on_an_optional_node_skips_its_dependents():
+    nodes = [Node("a", value), Node("b", value, after=("a",), when=broken, optional=True),
+             Node("c", value, after=("b",)), Node("d", value, after=("a",), when=lambda results: False)]
+    run = asyncio.run(asyncio.wait_for(execute(nodes), 1))
+    assert {name: span.status for name, span in run.spans.items()} == {
+        "a": "ok", "b": "failed", "c": "skipped", "d": "skipped"}
+
+
+def test_queueing_for_a_shared_slot_does_not_count_against_the_timeout():
+    async def scenario(work):
+        slot = asyncio.Semaphore(1)
+
+        async def call(results):
+            with queued():
+                await slot.acquire()
+            try:
+                await asyncio.sleep(work)
+            finally:
+                slot.release()
+
+        # Each holds the slot for 0.1 s; the last waits 0.2 s for it
+        patients = [execute([Node("8", call, timeout=0.15)]) for _ in range(3)]
+        return await asyncio.gather(*patients, return_exceptions=True)
+
+    assert not any(isinstance(run, Exception) for run in asyncio.run(scenario(0.1)))
+    assert all(isinstance(run, NodeTimeout) for run in asyncio.run(scenario(0.2)))
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from noggin.pipeline import Recorder, run
+from noggin.services import standins
+from noggin.synthetic import cohort
+
+
+@pytest.mark.parametrize("orchestrated", [False, True])
+def test_a_failed_interaction_is_counted_not_fatal(orchestrated):
+    patients = list(cohort(3))
+    patients[1] = {**patients[1], "channel": None}
+    outcomes, end_to_end, _ = asyncio.run(run(patients, 3, standins(0.001), Recorder(), orchestrated))
+    assert "ValueError" in outcomes[1]["failed"]
+    assert not any("failed" in outcome for outcome in outcomes[:1] + outcomes[2:])
+    assert len(end_to_end) == 2
+
+
+def test_sequential_and_dag_paths_agree_end_to_end():
+    patients = list(cohort(12))
+    results = {}
+    for orchestrated in (False, True):
+        recorder = Recorder()
+        services = standins(0.001)
+        outcomes, end_to_end, _ = asyncio.run(run(patients, 4, services, recorder, orchestrated))
+        counts = {step: stats["count"] for step, stats in recorder.summary().items()}
+        results[orchestrated] = outcomes, counts, services.bedrock.calls
+        assert len(end_to_end) == len(patients)
+        assert not any("failed" in outcome for outcome in outcomes)
+        assert [outcome["patient_id"] for outcome in outcomes] == [p["patient_id"] for p in patients]
+        # Every patient runs the whole flow; only escalations reach 12-15
+        escalated = sum(outcome["escalated"] for outcome in outcomes)
+        assert 0 < escalated < len(patients)
+        for step in ("1", "2", "3", "4", "6", "7", "8", "9", "10c", "11"):
+            assert counts[step] == len(patients), (orchestrated, step)
+        for step in ("12", "13", "14", "15"):
+            assert counts[step] == escalated, (orchestrated, step)
+    assert results[False] == results[True]
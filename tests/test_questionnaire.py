@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from noggin.questionnaire import DAILY_CHECKIN, SCAT5, Session
+
+
+def answer(questionnaire, text, model=None):
+    """Answers after one message, and the prompts the model was sent."""
+    prompts = []
+
+    async def llm(prompt, pending):
+        prompts.append(prompt)
+        return dict(model or {})
+
+    session = Session(questionnaire, llm)
+    asyncio.run(session.reply(text))
+    return session.answers, prompts
+
+
+@pytest.mark.parametrize("text", ["no energy at all", "no focus today", "no balance, keep falling"])
+def test_negated_ability_is_not_read_as_no_symptom(text):
+    answers, prompts = answer(SCAT5, text)
+    assert 0 not in answers.values()
+    assert len(prompts) == 1
+
+
+def test_duration_is_not_a_rating():
+    answers, prompts = answer(SCAT5, "feeling down 2 days")
+    assert "sadness" not in answers
+    assert len(prompts) == 1
+
+
+def test_unparsed_text_goes_to_the_model():
+    answers, prompts = answer(DAILY_CHECKIN, "headache 3, and I vomited twice and had a seizure",
+                              model={"vomited": True, "new_symptoms": True})
+    assert len(prompts) == 1
+    assert answers["headache"] == 3
+    assert answers["vomited"] is True and answers["new_symptoms"] is True
+
+
+def test_fully_parsed_message_skips_the_model():
+    answers, prompts = answer(DAILY_CHECKIN, "headache 3, dizzy 2, no nausea")
+    assert prompts == []
+    assert answers == {"headache": 3, "dizziness": 2, "nausea_or_vomiting": 0}
@@ -0,0 +1,30 @@
+from noggin.router import MODELS, RESERVED, Router, nearest_rank, standins
+
+
+def saturated():
+    router = Router(standins())
+    for name, model in MODELS.items():
+        router.inflight[name] = model.capacity
+    return router
+
+
+def test_high_risk_is_never_downgraded():
+    router = saturated()
+    for risk in ("high", "emergency"):
+        assert router.choose("intake_agent", {"scores": {"risk": risk}}, 100)[0] == "sonnet"
+        assert router.choose("intervention_agent", {"risk": risk}, 100)[0] == "titan-intervention"
+
+
+def test_lower_risk_is_downgraded_under_load():
+    router = saturated()
+    router.inflight["haiku"] = 0
+    assert router.choose("intake_agent", {"scores": {"risk": "moderate"}}, 100) == ("haiku", "load")
+    router.inflight["sonnet"] = MODELS["sonnet"].capacity - RESERVED["sonnet"]
+    assert router.choose("escalation_agent", {"risk": "low"}, 100) == ("sonnet", "primary")
+
+
+def test_nearest_rank():
+    values = list(range(1, 21))
+    assert nearest_rank(values, 0.95) == 19
+    assert nearest_rank(values[:10], 0.95) == 10
+    assert nearest_rank([7], 0.95) == 7
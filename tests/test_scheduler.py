@@ -0,0 +1,63 @@
+import random
+
+from noggin.scheduler import DAY, MODES, Scheduler
+
+
+def brute_force(schedules, steps, scheduler):
+    """What should fire per advance: a sorted list of (due, id), re-armed the same way."""
+    due = dict(schedules)
+    fired = []
+    for now in steps:
+        batch = []
+        while True:
+            ready = sorted((when, pid) for pid, (when, _) in due.items() if when <= now)
+            if not ready:
+                break
+            for when, pid in ready:
+                batch.append(pid)
+                mode = due[pid][1]
+                due[pid] = (scheduler.next_checkin(pid, mode, when), mode)
+        fired.append(sorted(batch))
+    return fired
+
+
+def test_wheel_matches_a_sorted_list():
+    rng = random.Random(0)
+    scheduler = Scheduler(now=0)
+    schedules = {}
+    for i in range(400):
+        kind = rng.random()
+        if kind < 0.25:
+            when = rng.randint(1, 200) * 64
+        elif kind < 0.5:
+            when = rng.randint(1, 40) * 4096
+        else:
+            when = rng.randint(1, 3 * DAY)
+        mode = rng.choice(list(MODES))
+        schedules[f"p{i}"] = (when, mode)
+        scheduler.schedule(f"p{i}", mode, when)
+    steps, now = [], 0
+    while now < 10 * DAY:
+        now += rng.choice((1, 63, 64, 4096, rng.randint(1, DAY)))
+        steps.append(now)
+    expected = brute_force(schedules, steps, scheduler)
+    for now, want in zip(steps, expected):
+        assert sorted(scheduler.advance(now)) == want, now
+
+
+def test_boundary_dues_fire_in_the_same_advance():
+    scheduler = Scheduler(now=0)
+    scheduler.schedule("a", "moderate", due=128)
+    scheduler.schedule("b", "moderate", due=129)
+    assert scheduler.advance(200) == ["a", "b"]
+    scheduler = Scheduler(now=0)
+    scheduler.schedule("a", "moderate", due=4096 * 3)
+    assert scheduler.advance(20000) == ["a"]
+
+
+def test_next_checkin_keeps_three_quarters_of_an_interval():
+    scheduler = Scheduler()
+    for mode, interval in MODES.items():
+        for after in range(0, 3 * DAY, 3607):
+            due = scheduler.next_checkin("p1", mode, after)
+            assert due >= after + interval - interval // 4
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from noggin.cache import severity_band as cache_band
+from noggin.scoring import (GCS_COMPONENTS, HIGH_SEVERITY, MODERATE_SEVERITY, RISK_LEVELS,
+                            score_batch, score_reference, severity_band)
+from noggin.synthetic import SCAT5_SYMPTOMS
+
+
+def assessment(severity):
+    ratings = [0] * len(SCAT5_SYMPTOMS)
+    for i in range(severity):
+        ratings[i % len(ratings)] += 1
+    return {"symptoms": dict(zip(SCAT5_SYMPTOMS, ratings)),
+            "gcs": dict(zip(GCS_COMPONENTS, (4, 5, 6)))}
+
+
+@pytest.mark.parametrize("severity", [MODERATE_SEVERITY, MODERATE_SEVERITY + 1,
+                                      HIGH_SEVERITY, HIGH_SEVERITY + 1])
+def test_bands_agree_on_the_cut_points(severity):
+    case = assessment(severity)
+    reference = score_reference(case)
+    batch = score_batch(np.array([list(case["symptoms"].values())]), np.array([[4, 5, 6]]))
+    assert reference["severity"] == severity
+    assert RISK_LEVELS[batch["risk"][0]] == reference["risk"] == severity_band(severity)
+    assert cache_band(severity) == severity_band(severity)
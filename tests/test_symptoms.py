@@ -0,0 +1,25 @@
+import numpy as np
+
+from noggin.symptoms import SYMPTOMS, SymptomStore
+
+
+def test_slopes_past_day_42_match_polyfit():
+    # day * rating passes 255 from day 43 on a rating of 6
+    days = np.arange(0, 90)
+    rng = np.random.default_rng(0)
+    ratings = np.clip(np.round(days[:, None] / 15 + rng.integers(-1, 2, (len(days), SYMPTOMS))), 0, 6)
+    ratings = ratings.astype(np.uint8)
+    expected = np.polyfit(days.astype(np.float64), ratings.astype(np.float64), 1)[0]
+
+    single = SymptomStore(capacity=1)
+    single.admit("a", ratings[0], day=0)
+    for day in days[1:]:
+        result = single.checkin("a", int(day), ratings[day])
+    np.testing.assert_allclose(result["slope"], expected, atol=1e-9)
+    np.testing.assert_allclose(single.slopes("a"), expected, atol=1e-9)
+
+    batch = SymptomStore(capacity=1)
+    batch.admit_many(["a", "b"], np.stack([ratings[0], ratings[0]]), day=0)
+    for day in days[1:]:
+        result = batch.checkin_many(["a", "b"], int(day), np.stack([ratings[day], ratings[day]]))
+    np.testing.assert_allclose(result["slope"], [expected, expected], atol=1e-9)